@@ -2,11 +2,11 @@
 
 
 a = Analysis(
-    ['ocr_coordinates.py'],
-    pathex=[],
+    ['ocr_coordinates/__main__.py'],
+    pathex=[SPECPATH],
     binaries=[],
-    datas=[],
-    hiddenimports=['pytesseract', 'PIL', 'tkinter', 'PIL._tkinter_finder'],
+    datas=[('ocr_coordinates/data', 'ocr_coordinates/data')],
+    hiddenimports=['pytesseract', 'PIL', 'tkinter', 'ocr_coordinates.gui', 'PIL._tkinter_finder'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
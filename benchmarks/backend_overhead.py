@@ -0,0 +1,49 @@
+"""Measure the per-call cost of each OCR backend and profile
+
+    python benchmarks/backend_overhead.py [--repeat N] [--size WxH] [--profile NAME] [image ...]
+
+Each available backend OCRs the same images with PSM 6. The first call per
+backend is a warm-up (engine start, language data), so the figures are the
+steady-state cost per call. A blank image shows the fixed overhead of a
+call: process spawn and temp-file encoding for pytesseract. Every OCR
+profile is timed unless --profile picks one.
+"""
+import argparse
+import os
+import sys
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_coordinates.backends import BACKENDS, get_backend, time_per_call  # noqa: E402
+from ocr_coordinates.profiles import PROFILES  # noqa: E402
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("images", nargs="*", help="Images to OCR (default: a blank image)")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed calls per image")
+    parser.add_argument("--size", default="1200x200", help="Size of the blank image")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=None, help="Only time this OCR profile")
+    args = parser.parse_args()
+
+    if args.images:
+        images = [(os.path.basename(p), Image.open(p)) for p in args.images]
+    else:
+        width, height = (int(v) for v in args.size.split('x'))
+        images = [(f"blank {args.size}", Image.new('L', (width, height), 255))]
+
+    for name in BACKENDS:
+        backend = get_backend(name)
+        if not backend.available():
+            print(f"{name}: not available")
+            continue
+        for profile in ([PROFILES[args.profile]] if args.profile else PROFILES.values()):
+            for label, image in images:
+                per_call = time_per_call(backend, image, repeat=args.repeat, profile=profile)
+                print(f"{name}, {profile.name} profile: {per_call * 1000:.1f} ms per call ({label})")
+        backend.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""Throughput and accuracy of a whole batch on synthetic GPS-stamped photos
+
+    python benchmarks/batch_benchmark.py [--count N] [--sizes WxH,...] [--formats NAME,...]
+                                         [--workers N] [--backend NAME] [--stages SPEC] [...]
+                                         [--json results.json] [--compare old.json]
+
+A reproducible set of photos is generated from --seed (see synthetic.py:
+Lat/Long, labeled, decimal, DMS and DDM overlays in varied fonts, sizes
+and noise levels), written as JPEGs and run through BatchEngine with the
+OCR cache off. Reported:
+
+- images/sec for the whole batch and per-image latency percentiles
+- Tesseract calls per image and which cascade stage hit
+- precision and recall of the extracted coordinates, overall and per format,
+  and how often the best-scoring coordinate is the right one
+- per-stage latency percentiles (decode, each variant, each OCR pass and the
+  matcher) from a second, sequential pass that runs every stage on every
+  image, so stage costs are comparable between configurations
+
+--json saves everything for later; --compare prints the change of the
+headline numbers against an earlier --json file.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import FORMATS, make_case  # noqa: E402
+
+from ocr_coordinates.cascade import VARIANTS, stage_label  # noqa: E402
+from ocr_coordinates.cli import add_cascade_arguments, build_cascade  # noqa: E402
+from ocr_coordinates.engine import BatchEngine  # noqa: E402
+from ocr_coordinates.manifest import JobManifest  # noqa: E402
+from ocr_coordinates.matcher import find_coordinates  # noqa: E402
+from ocr_coordinates.preprocess import ImageVariants, open_image  # noqa: E402
+
+# A found coordinate counts as correct within this many degrees of the truth
+TOLERANCE = 1e-4
+
+# Headline numbers compared by --compare; True where higher is better
+HEADLINE = {
+    'images_per_second': True,
+    'latency_p50': False,
+    'latency_p90': False,
+    'ocr_calls_per_image': False,
+    'precision': True,
+    'recall': True,
+    'best_accuracy': True,
+}
+
+def percentiles(values):
+    """p50/p90/p99, mean and count of a list of seconds"""
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+
+    def pick(fraction):
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+    return {'count': len(ordered), 'mean': statistics.fmean(ordered),
+            'p50': pick(0.5), 'p90': pick(0.9), 'p99': pick(0.99)}
+
+def generate(folder, args):
+    """Write the synthetic photos; returns a list of case dicts"""
+    sizes = [tuple(int(v) for v in size.split('x')) for size in args.sizes.split(',')]
+    formats = args.formats.split(',')
+    cases = []
+    for i in range(args.count):
+        image, truth, description = make_case(args.seed + i, sizes, formats)
+        path = os.path.join(folder, f"synthetic_{i:04d}.jpg")
+        image.save(path, quality=description['jpeg_quality'])
+        description.update(path=path, truth=list(truth))
+        cases.append(description)
+    return cases
+
+def score(cases, found):
+    """Precision and recall overall and per format; marks each case 'correct' and 'best_correct'"""
+    true_positives = false_positives = hits = best_hits = 0
+    per_format = {}
+    for case in cases:
+        coordinates = found.get(case['path'], [])
+        lat, lon = case['truth']
+        correct = [abs(c.lat - lat) <= TOLERANCE and abs(c.lon - lon) <= TOLERANCE for c in coordinates]
+        true_positives += sum(correct)
+        false_positives += len(correct) - sum(correct)
+        case['correct'] = any(correct)
+        # Coordinates come best first
+        case['best_correct'] = bool(correct) and correct[0]
+        best_hits += case['best_correct']
+        case['found'] = [list(c) for c in coordinates]
+        hits += case['correct']
+        tally = per_format.setdefault(case['format'], {'images': 0, 'recall': 0})
+        tally['images'] += 1
+        tally['recall'] += case['correct']
+    for tally in per_format.values():
+        tally['recall'] /= tally['images']
+    predicted = true_positives + false_positives
+    return {
+        'precision': true_positives / predicted if predicted else 0.0,
+        'recall': hits / len(cases) if cases else 0.0,
+        'best_accuracy': best_hits / len(cases) if cases else 0.0,
+        'per_format': per_format,
+    }
+
+def run_batch(cases, args):
+    """Time the batch through BatchEngine; returns the summary dict"""
+    manifest = JobManifest()
+    engine = BatchEngine(workers=args.workers, use_processes=args.processes, cascade=build_cascade(args),
+                         manifest=manifest)
+    found = {}
+    start = time.perf_counter()
+    for image_path, coordinates, error in engine.run([case['path'] for case in cases]):
+        found[image_path] = coordinates
+    elapsed = time.perf_counter() - start
+
+    latencies = [record.seconds for record in manifest.records() if record.seconds is not None]
+    manifest.close()
+    latency = percentiles(latencies)
+    summary = {
+        'images': len(cases),
+        'seconds': elapsed,
+        'images_per_second': len(cases) / elapsed if elapsed else 0.0,
+        'latency_p50': latency.get('p50'),
+        'latency_p90': latency.get('p90'),
+        'latency_p99': latency.get('p99'),
+        'ocr_calls_per_image': engine.stats.calls_per_image(),
+        'stage_hits': dict(engine.stats.stage_hits),
+        'peak_memory': engine.memory.max_peak(),
+        'metrics': engine.metrics.snapshot(),
+    }
+    summary.update(score(cases, found))
+    return summary
+
+def stage_timings(cases, args):
+    """Latency percentiles of every stage, each stage run on every image"""
+    cascade = build_cascade(args)
+    timings = {}
+
+    def timed(name, function, *function_args):
+        start = time.perf_counter()
+        value = function(*function_args)
+        timings.setdefault(name, []).append(time.perf_counter() - start)
+        return value
+
+    for case in cases[:args.stage_images]:
+        start = time.perf_counter()
+        image = open_image(case['path'])
+        image.load()
+        timings.setdefault("decode", []).append(time.perf_counter() - start)
+        with image:
+            variants = ImageVariants(image, cascade.preprocess)
+            for variant, psm_modes in cascade.stages:
+                img = timed(f"variant {variant}", VARIANTS[variant][1], variants)
+                for psm in psm_modes:
+                    page = timed(f"ocr {stage_label(variant, psm)}", cascade.backend.image_to_data,
+                                 img, psm, cascade.profile)
+                    timed("find_coordinates", find_coordinates, page.text)
+    return {name: percentiles(values) for name, values in timings.items()}
+
+def compare(summary, old_path):
+    """Print the change of the headline numbers against an earlier run"""
+    with open(old_path, encoding='utf-8') as f:
+        old = json.load(f)['summary']
+    print(f"\nCompared with {old_path}:")
+    for key, higher_is_better in HEADLINE.items():
+        before, after = old.get(key), summary.get(key)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        better = (change > 0) == higher_is_better if change else None
+        verdict = "" if better is None else " (better)" if better else " (worse)"
+        print(f"  {key}: {before:.4g} -> {after:.4g} ({change:+.1f}%){verdict}")
+
+def report(results):
+    """Print a readable summary"""
+    summary = results['summary']
+    print(f"{summary['images']} images in {summary['seconds']:.2f}s: {summary['images_per_second']:.2f} images/sec, "
+          f"latency p50 {summary['latency_p50']:.3f}s p90 {summary['latency_p90']:.3f}s "
+          f"p99 {summary['latency_p99']:.3f}s")
+    print(f"{summary['ocr_calls_per_image']:.2f} Tesseract calls per image; "
+          f"precision {summary['precision']:.3f}, recall {summary['recall']:.3f}, "
+          f"best coordinate right {summary['best_accuracy']:.3f}")
+    for name, tally in sorted(summary['per_format'].items()):
+        print(f"  {name}: recall {tally['recall']:.3f} ({tally['images']} images)")
+    print("Stage hits: " + ", ".join(f"{stage} {count}" for stage, count in
+                                     sorted(summary['stage_hits'].items(), key=lambda item: -item[1])))
+    if results['stages']:
+        print("Stage latency (every stage on every image):")
+        for name, stats in results['stages'].items():
+            print(f"  {name:<28} p50 {stats['p50'] * 1000:8.1f} ms  p90 {stats['p90'] * 1000:8.1f} ms  "
+                  f"p99 {stats['p99'] * 1000:8.1f} ms  ({stats['count']})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20, help="Synthetic photos to generate (default: 20)")
+    parser.add_argument("--seed", type=int, default=0, help="First seed; the same seed gives the same photos")
+    parser.add_argument("--sizes", default="4000x3000,1600x1200,1200x900",
+                        help="Comma-separated photo sizes to pick from")
+    parser.add_argument("--formats", default=",".join(FORMATS),
+                        help=f"Comma-separated coordinate formats to pick from ({', '.join(FORMATS)})")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="OCR workers (default: CPU count)")
+    parser.add_argument("--processes", action="store_true", help="Use worker processes instead of threads")
+    parser.add_argument("--stage-images", type=int, default=5,
+                        help="Images to time stage by stage; 0 skips the stage pass (default: 5)")
+    parser.add_argument("--keep", default=None, help="Write the photos to this folder and keep them")
+    parser.add_argument("--json", default=None, help="Save the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="Earlier --json results to compare with")
+    add_cascade_arguments(parser)
+    args = parser.parse_args()
+
+    unknown = set(args.formats.split(',')) - set(FORMATS)
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as temp_folder:
+        folder = args.keep or temp_folder
+        os.makedirs(folder, exist_ok=True)
+        cases = generate(folder, args)
+        summary = run_batch(cases, args)
+        stages = stage_timings(cases, args) if args.stage_images else {}
+    for case in cases:
+        case['path'] = os.path.basename(case['path'])
+
+    results = {
+        'config': {key: value for key, value in vars(args).items() if key not in ('json', 'compare', 'keep')},
+        'cascade': build_cascade(args).describe(),
+        'platform': {'python': platform.python_version(), 'machine': platform.machine(),
+                     'system': platform.system(), 'cpus': os.cpu_count()},
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'summary': summary,
+        'stages': stages,
+        'images': cases,
+    }
+    report(results)
+    if args.compare:
+        compare(summary, args.compare)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""Check find_coordinates against the golden corpus and time it
+
+    python benchmarks/check_matcher.py [--repeat N]
+
+matcher_golden.json holds OCR-like texts with the coordinates the matcher
+returned for them when the corpus was recorded. Any difference in values,
+formats or order is reported and the script exits with status 1.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_coordinates.matcher import find_coordinates  # noqa: E402
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'matcher_golden.json')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Timing repetitions over the corpus")
+    args = parser.parse_args()
+
+    with open(GOLDEN_PATH, encoding='utf-8') as f:
+        cases = json.load(f)
+
+    failures = 0
+    for i, case in enumerate(cases):
+        got = [list(c) for c in find_coordinates(case['text'])]
+        if got != case['expected']:
+            failures += 1
+            print(f"Case {i} differs:\n  text:     {case['text']!r}\n"
+                  f"  expected: {case['expected']}\n  got:      {got}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for case in cases:
+            find_coordinates(case['text'])
+    elapsed = time.perf_counter() - start
+    per_text = elapsed / (args.repeat * len(cases)) * 1e6
+
+    print(f"{len(cases) - failures}/{len(cases)} golden cases match; {per_text:.1f} us per text")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Compare the downscale-first preprocessing with the legacy full-resolution pipeline
+
+    python benchmarks/preprocess_benchmark.py [--count N] [--size WxH] [--backend NAME] [--json]
+
+Synthetic GPS-stamped JPEGs (see synthetic.py) are written to a temporary
+directory. For each one, decode + preprocess is timed for the legacy path
+(Image.open, preprocess_image_legacy), the new one (open_image,
+preprocess_image) and, with numpy installed, the NumPy engine; then the result is OCR'd once with PSM 6 and checked
+against the coordinate drawn on the photo.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_photo  # noqa: E402
+
+from ocr_coordinates.backends import BACKENDS, available_backends, get_backend  # noqa: E402
+from ocr_coordinates.matcher import find_coordinates  # noqa: E402
+from ocr_coordinates.preprocess import (numpy_available, open_image, preprocess_image,  # noqa: E402
+                                        preprocess_image_legacy, preprocess_image_numpy)
+
+PIPELINES = {
+    "legacy": (Image.open, preprocess_image_legacy),
+    "downscale-first": (open_image, preprocess_image),
+}
+if numpy_available():
+    PIPELINES["numpy"] = (open_image, preprocess_image_numpy)
+
+def run_pipeline(path, pipeline, backend, expected):
+    """Time one pipeline on one file; returns a result dict"""
+    opener, preprocess = PIPELINES[pipeline]
+    start = time.perf_counter()
+    with opener(path) as image:
+        image.load()
+        decoded = time.perf_counter()
+        processed = preprocess(image)
+    prepared = time.perf_counter()
+    result = {
+        "pipeline": pipeline,
+        "decode_seconds": decoded - start,
+        "preprocess_seconds": prepared - decoded,
+        "size": list(processed.size),
+    }
+    if backend is not None:
+        text = backend.image_to_string(processed, 6)
+        result["ocr_seconds"] = time.perf_counter() - prepared
+        result["correct"] = any(abs(c.lat - expected[0]) < 1e-6 and abs(c.lon - expected[1]) < 1e-6
+                                for c in find_coordinates(text))
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=3, help="Synthetic photos to generate")
+    parser.add_argument("--size", default="4000x3000", help="Size of the synthetic photos")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=None,
+                        help="OCR backend for the accuracy check (default: the first available one; "
+                             "OCR is skipped if there is none)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    backend_name = args.backend or next(iter(available_backends()), None)
+    backend = get_backend(backend_name) if backend_name else None
+    width, height = (int(v) for v in args.size.split('x'))
+
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for seed in range(args.count):
+            image, expected = make_photo((width, height), seed=seed)
+            path = os.path.join(folder, f"photo_{seed}.jpg")
+            image.save(path, quality=90)
+            for pipeline in PIPELINES:
+                result = run_pipeline(path, pipeline, backend, expected)
+                result["image"] = os.path.basename(path)
+                results.append(result)
+    if backend is not None:
+        backend.close()
+
+    if args.json:
+        print(json.dumps({"backend": backend_name, "size": args.size, "results": results}, indent=2))
+        return 0
+
+    print(f"{args.count} photos at {args.size}, OCR backend: {backend_name or 'none'}")
+    for pipeline in PIPELINES:
+        rows = [r for r in results if r["pipeline"] == pipeline]
+        decode = sum(r["decode_seconds"] for r in rows) / len(rows)
+        prep = sum(r["preprocess_seconds"] for r in rows) / len(rows)
+        line = f"{pipeline:>16}: decode {decode:.3f}s, preprocess {prep:.3f}s"
+        if backend is not None:
+            ocr = sum(r["ocr_seconds"] for r in rows) / len(rows)
+            correct = sum(r["correct"] for r in rows)
+            line += f", OCR {ocr:.3f}s, {correct}/{len(rows)} correct"
+        print(line)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
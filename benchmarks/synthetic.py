@@ -0,0 +1,157 @@
+"""Synthetic GPS-camera photos with a known coordinate, for benchmarks
+
+make_photo() draws a busy background (gradient sky, blocks, noise) and the
+kind of overlay GPS camera apps stamp along the bottom edge: a dark panel
+with an address line, the coordinate line and a timestamp. The coordinate
+can be written in any of the formats the matcher reads (see FORMATS);
+make_case() picks the size, format, font and noise at random for a seed.
+"""
+import random
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+FONT_NAMES = ("DejaVuSans.ttf", "arial.ttf", "Arial.ttf")
+
+# Fonts make_case() picks from; the ones not installed are skipped
+CASE_FONTS = ("DejaVuSans.ttf", "DejaVuSans-Bold.ttf", "DejaVuSansMono.ttf", "DejaVuSerif.ttf",
+              "arial.ttf", "arialbd.ttf", "times.ttf", "cour.ttf", "Arial.ttf", "Courier New.ttf")
+
+def load_font(size, name=None):
+    """A TrueType font at the given pixel size, falling back to Pillow's built-in one"""
+    for font_name in ((name,) if name else ()) + FONT_NAMES:
+        try:
+            return ImageFont.truetype(font_name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+def available_fonts():
+    """Names in CASE_FONTS that can be loaded here"""
+    fonts = []
+    for name in CASE_FONTS:
+        try:
+            ImageFont.truetype(name, 10)
+        except OSError:
+            continue
+        fonts.append(name)
+    return fonts
+
+def random_coordinate(rng):
+    """A (lat, lon) pair with six decimals, like the camera apps print"""
+    return round(rng.uniform(-60, 70), 6), round(rng.uniform(-170, 170), 6)
+
+def _dms(value):
+    """Whole degrees, minutes and seconds of an absolute value"""
+    total = int(round(abs(value) * 3600))
+    return total // 3600, (total // 60) % 60, total % 60
+
+def _ddm(value):
+    """Whole degrees and minutes with three decimals of an absolute value"""
+    total = round(abs(value) * 60, 3)
+    degrees = int(total // 60)
+    return degrees, round(total - degrees * 60, 3)
+
+def format_latlong(lat, lon):
+    """'Lat 30.172773° Long 73.665911°', as GPS Map Camera prints it"""
+    return f"Lat {lat:.6f}° Long {lon:.6f}°", (lat, lon)
+
+def format_labeled(lat, lon):
+    """'Latitude: 30.172773, Longitude: 73.665911'"""
+    return f"Latitude: {lat:.6f}, Longitude: {lon:.6f}", (lat, lon)
+
+def format_decimal(lat, lon):
+    """Bare '30.172773, 73.665911'"""
+    return f"{lat:.6f}, {lon:.6f}", (lat, lon)
+
+def format_dms(lat, lon):
+    """'30°10'22"N 73°39'57"E'; the truth is what the rounded text says"""
+    (lat_d, lat_m, lat_s), (lon_d, lon_m, lon_s) = _dms(lat), _dms(lon)
+    lat_dir, lon_dir = "N" if lat >= 0 else "S", "E" if lon >= 0 else "W"
+    text = f"{lat_d}°{lat_m:02d}'{lat_s:02d}\"{lat_dir} {lon_d}°{lon_m:02d}'{lon_s:02d}\"{lon_dir}"
+    truth_lat = (lat_d + lat_m / 60 + lat_s / 3600) * (1 if lat >= 0 else -1)
+    truth_lon = (lon_d + lon_m / 60 + lon_s / 3600) * (1 if lon >= 0 else -1)
+    return text, (truth_lat, truth_lon)
+
+def format_ddm(lat, lon):
+    """'30°10.366'N 73°39.955'E'; the truth is what the rounded text says"""
+    (lat_d, lat_m), (lon_d, lon_m) = _ddm(lat), _ddm(lon)
+    lat_dir, lon_dir = "N" if lat >= 0 else "S", "E" if lon >= 0 else "W"
+    text = f"{lat_d}°{lat_m:06.3f}'{lat_dir} {lon_d}°{lon_m:06.3f}'{lon_dir}"
+    truth_lat = (lat_d + lat_m / 60) * (1 if lat >= 0 else -1)
+    truth_lon = (lon_d + lon_m / 60) * (1 if lon >= 0 else -1)
+    return text, (truth_lat, truth_lon)
+
+# Coordinate formats: name -> function(lat, lon) returning (text, (lat, lon) as written)
+FORMATS = {
+    "latlong": format_latlong,
+    "labeled": format_labeled,
+    "decimal": format_decimal,
+    "dms": format_dms,
+    "ddm": format_ddm,
+}
+
+def overlay_lines(coordinate_text, rng):
+    """Text lines of the overlay"""
+    return [
+        f"Plot {rng.randint(1, 400)}, Street {rng.randint(1, 90)}, Sector {rng.choice('ABCDEFG')}-{rng.randint(1, 12)}",
+        coordinate_text,
+        f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024 {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d} GMT +05:00",
+    ]
+
+def make_photo(size=(4000, 3000), seed=0, text_height=None, coordinate=None, fmt="latlong", font=None, noise=30):
+    """Return (image, (lat, lon)) for a synthetic GPS-stamped photo
+
+    `text_height` is the overlay font size in pixels; by default it scales
+    with the image like camera apps do (about 2.5% of the height). The
+    returned coordinate is the one written on the photo in format `fmt`.
+    """
+    rng = random.Random(seed)
+    width, height = size
+    lat, lon = coordinate or random_coordinate(rng)
+    coordinate_text, truth = FORMATS[fmt](lat, lon)
+
+    # Background: vertical gradient, some solid blocks, then sensor-like noise
+    image = Image.linear_gradient('L').resize(size).convert('RGB')
+    tint = Image.new('RGB', size, (rng.randint(40, 120), rng.randint(80, 160), rng.randint(60, 200)))
+    image = Image.blend(image, tint, 0.6)
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x0, y0 = rng.randint(0, width), rng.randint(0, height)
+        x1, y1 = x0 + rng.randint(width // 20, width // 3), y0 + rng.randint(height // 20, height // 3)
+        draw.rectangle((x0, y0, x1, y1), fill=tuple(rng.randint(0, 255) for _ in range(3)))
+    noise_layer = Image.effect_noise(size, noise).convert('RGB')
+    image = Image.blend(image, noise_layer, 0.15).filter(ImageFilter.GaussianBlur(1))
+
+    # Overlay panel along the bottom
+    text_height = text_height or max(10, int(height * 0.025))
+    typeface = load_font(text_height, font)
+    lines = overlay_lines(coordinate_text, rng)
+    line_gap = int(text_height * 1.4)
+    panel_top = height - line_gap * len(lines) - text_height
+    panel = Image.new('RGBA', size, (0, 0, 0, 0))
+    panel_draw = ImageDraw.Draw(panel)
+    panel_draw.rectangle((0, panel_top, width, height), fill=(0, 0, 0, 150))
+    for i, line in enumerate(lines):
+        panel_draw.text((text_height, panel_top + text_height // 2 + i * line_gap), line,
+                        font=typeface, fill=(255, 255, 255, 255))
+    image = Image.alpha_composite(image.convert('RGBA'), panel).convert('RGB')
+    return image, truth
+
+def make_case(seed, sizes=((4000, 3000),), formats=tuple(FORMATS), fonts=None):
+    """Return (image, (lat, lon), description) with size, format, font and noise drawn from `seed`"""
+    rng = random.Random(seed)
+    fonts = fonts or available_fonts() or [None]
+    size = rng.choice(list(sizes))
+    description = {
+        'seed': seed,
+        'size': list(size),
+        'format': rng.choice(list(formats)),
+        'font': rng.choice(list(fonts)),
+        # Overlay text between 1.8% and 3.2% of the image height
+        'text_height': max(10, int(size[1] * rng.uniform(0.018, 0.032))),
+        'noise': rng.choice((10, 30, 60)),
+        'jpeg_quality': rng.choice((70, 85, 95)),
+    }
+    image, truth = make_photo(size, seed, description['text_height'], fmt=description['format'],
+                              font=description['font'], noise=description['noise'])
+    return image, truth, description
@@ -32,7 +32,10 @@ py -m PyInstaller ^
     --hidden-import=PIL ^
     --hidden-import=tkinter ^
     --hidden-import=PIL._tkinter_finder ^
-    ocr_coordinates.py
+    --hidden-import=ocr_coordinates.gui ^
+    --paths . ^
+    --add-data "ocr_coordinates\data;ocr_coordinates\data" ^
+    ocr_coordinates\__main__.py
 
 if errorlevel 1 (
     echo.
@@ -3,11 +3,11 @@
 block_cipher = None
 
 a = Analysis(
-    ['ocr_coordinates.py'],
-    pathex=[],
+    ['ocr_coordinates/__main__.py'],
+    pathex=[SPECPATH],
     binaries=[],
-    datas=[],
-    hiddenimports=['pytesseract', 'PIL', 'tkinter'],
+    datas=[('ocr_coordinates/data', 'ocr_coordinates/data')],
+    hiddenimports=['pytesseract', 'PIL', 'tkinter', 'ocr_coordinates.gui'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
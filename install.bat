@@ -29,7 +29,7 @@ echo IMPORTANT: Make sure Tesseract OCR is installed:
 echo Download from: https://github.com/UB-Mannheim/tesseract/wiki
 echo.
 echo After installing Tesseract, you can run the tool using:
-echo   python ocr_coordinates.py
+echo   python -m ocr_coordinates
 echo   OR
 echo   run_ocr_tool.bat
 echo.
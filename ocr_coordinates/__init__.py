@@ -0,0 +1,27 @@
+"""Extract latitude and longitude coordinates from images using OCR
+
+The GUI lives in ocr_coordinates.gui and is the only module that imports
+tkinter, so the library API and the command line work on headless machines.
+"""
+from .matcher import Coordinate, find_coordinates
+from .preprocess import preprocess_image
+from .cache import OcrCache
+from .cascade import OcrCascade, OcrResult
+from .engine import BatchEngine, extract, process_image, run_ocr
+from .manifest import JobManifest
+from .roi import RoiLocator
+
+__all__ = [
+    "BatchEngine",
+    "Coordinate",
+    "extract",
+    "find_coordinates",
+    "JobManifest",
+    "OcrCache",
+    "OcrCascade",
+    "OcrResult",
+    "preprocess_image",
+    "process_image",
+    "RoiLocator",
+    "run_ocr",
+]
@@ -0,0 +1,10 @@
+"""Allow `python -m ocr_coordinates`"""
+import multiprocessing
+import sys
+
+from ocr_coordinates.cli import main
+
+if __name__ == "__main__":
+    # Needed for process-pool workers in the frozen executable
+    multiprocessing.freeze_support()
+    sys.exit(main())
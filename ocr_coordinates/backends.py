@@ -0,0 +1,226 @@
+"""OCR backends: how an image is handed to Tesseract
+
+"pytesseract" (the default) runs the tesseract executable once per call,
+passing the image through a temporary file. "tesserocr" keeps an
+initialized Tesseract engine in-process, one per worker thread, and hands
+it the raw pixel buffer, which saves the process spawn, the image
+encoding and the language data load on every call.
+
+Besides plain text, backends return an OcrPage: the text plus every word
+with its confidence and bounding box, read from Tesseract's TSV output in
+the same call.
+"""
+import collections
+import threading
+import time
+
+import pytesseract
+
+from . import tesseract
+from .profiles import get_profile, init_variables, tesseract_config
+
+# Page segmentation mode Tesseract uses when none is given
+DEFAULT_PSM = 3
+
+# One recognized word: its text, Tesseract's confidence (0-100) and
+# bounding box (left, top, width, height) in pixels
+OcrWord = collections.namedtuple('OcrWord', ['text', 'confidence', 'box'])
+
+# Output of one OCR pass: the text and its words, a list per text line.
+# `lines` is empty when the backend has no word data.
+OcrPage = collections.namedtuple('OcrPage', ['text', 'lines'])
+
+# Word rows of Tesseract's TSV output
+TSV_WORD_LEVEL = 5
+
+def parse_tsv(tsv):
+    """Words of Tesseract TSV output grouped into lines: [[OcrWord, ...], ...]"""
+    lines = collections.OrderedDict()
+    for row in tsv.splitlines():
+        fields = row.split('\t')
+        # Skip the header, the page/block/paragraph/line rows and empty words
+        if len(fields) < 12 or fields[0] != str(TSV_WORD_LEVEL) or not fields[11].strip():
+            continue
+        try:
+            confidence = float(fields[10])
+            box = tuple(int(v) for v in fields[6:10])
+        except ValueError:
+            continue
+        line_key = tuple(fields[1:5])  # page, block, paragraph, line
+        lines.setdefault(line_key, []).append(OcrWord(fields[11], confidence, box))
+    return list(lines.values())
+
+def page_text(lines):
+    """Text of word lines laid out like Tesseract's plain text output"""
+    return "".join(" ".join(word.text for word in line) + "\n" for line in lines)
+
+class OcrBackend:
+    """Interface every backend implements"""
+
+    name = None
+
+    def image_to_string(self, image, psm=None, profile=None):
+        """OCR a PIL image; `psm` of None uses Tesseract's default page segmentation
+
+        `profile` is an OcrProfile (see ocr_coordinates.profiles); None uses
+        the general profile.
+        """
+        raise NotImplementedError
+
+    def image_to_data(self, image, psm=None, profile=None):
+        """OCR a PIL image and return an OcrPage with word confidences
+
+        Backends without word data return the text and no lines.
+        """
+        return OcrPage(self.image_to_string(image, psm, profile), [])
+
+    def available(self):
+        """True if the backend can run on this machine"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any engines held by the backend"""
+
+class PytesseractBackend(OcrBackend):
+    """Spawn the tesseract executable for every call (the historical behaviour)"""
+
+    name = "pytesseract"
+
+    def image_to_string(self, image, psm=None, profile=None):
+        config = tesseract_config(profile or get_profile(), psm)
+        if not config:
+            return pytesseract.image_to_string(image)
+        return pytesseract.image_to_string(image, config=config)
+
+    def image_to_data(self, image, psm=None, profile=None):
+        # One tesseract run writes the TSV; the text is rebuilt from its words
+        config = tesseract_config(profile or get_profile(), psm)
+        lines = parse_tsv(pytesseract.image_to_data(image, config=config))
+        return OcrPage(page_text(lines), lines)
+
+    def available(self):
+        return tesseract.tesseract_available()
+
+def _import_tesserocr():
+    """Import tesserocr now, if installed
+
+    Its first import installs a signal handler, which only works in the
+    main thread, so it must not happen lazily inside a worker thread.
+    """
+    try:
+        import tesserocr  # noqa: F401
+    except ImportError:
+        pass
+
+class TesserocrBackend(OcrBackend):
+    """Call libtesseract in-process through tesserocr
+
+    Each thread lazily creates its own PyTessBaseAPI per OCR profile and
+    reuses it for every image, so the language data is loaded once per
+    worker. Images are passed
+    as raw 8-bit grayscale or RGB pixels with SetImageBytes.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang="eng", tessdata=None):
+        self.lang = lang
+        self.tessdata = tessdata
+        self._local = threading.local()
+        self._apis = []
+        self._lock = threading.Lock()
+        _import_tesserocr()
+
+    def __getstate__(self):
+        # Engines stay in the process that created them; workers start their own
+        state = self.__dict__.copy()
+        state['_local'] = None
+        state['_apis'] = []
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        _import_tesserocr()
+
+    def _api(self, profile):
+        """This thread's engine for a profile, created on first use"""
+        apis = getattr(self._local, 'apis', None)
+        if apis is None:
+            apis = self._local.apis = {}
+        api = apis.get(profile.name)
+        if api is None:
+            import tesserocr
+            path = self.tessdata or tesseract.tessdata_path()
+            kwargs = {'path': path} if path else {}
+            # Dictionary and vocabulary settings only take effect at init
+            api = tesserocr.PyTessBaseAPI(lang=self.lang, oem=tesserocr.OEM.DEFAULT,
+                                          configs=[profile.config] if profile.config else None,
+                                          variables=init_variables(profile), **kwargs)
+            apis[profile.name] = api
+            with self._lock:
+                self._apis.append(api)
+        return api
+
+    def _set_image(self, image, psm, profile):
+        """This thread's engine for a profile, set up to read `image`"""
+        api = self._api(profile or get_profile())
+        api.SetPageSegMode(DEFAULT_PSM if psm is None else psm)
+        if image.mode not in ('L', 'RGB'):
+            image = image.convert('RGB')
+        bytes_per_pixel = 1 if image.mode == 'L' else 3
+        width, height = image.size
+        api.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+        return api
+
+    def image_to_string(self, image, psm=None, profile=None):
+        return self._set_image(image, psm, profile).GetUTF8Text()
+
+    def image_to_data(self, image, psm=None, profile=None):
+        api = self._set_image(image, psm, profile)
+        # Recognized once; the text and the TSV both read the same result
+        api.Recognize()
+        return OcrPage(api.GetUTF8Text(), parse_tsv(api.GetTSVText(0)))
+
+    def available(self):
+        try:
+            import tesserocr
+        except ImportError:
+            return False
+        return bool(tesserocr.tesseract_version())
+
+    def close(self):
+        with self._lock:
+            for api in self._apis:
+                api.End()
+            self._apis = []
+        self._local = threading.local()
+
+BACKENDS = {
+    "pytesseract": PytesseractBackend,
+    "tesserocr": TesserocrBackend,
+}
+
+DEFAULT_BACKEND = "pytesseract"
+
+def get_backend(name=DEFAULT_BACKEND):
+    """Create the backend registered under `name`"""
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown OCR backend '{name}' (expected one of: {', '.join(BACKENDS)})")
+    return backend_class()
+
+def available_backends():
+    """Names of the backends that can run here"""
+    return [name for name, backend_class in BACKENDS.items() if backend_class().available()]
+
+def time_per_call(backend, image, psm=6, repeat=5, profile=None):
+    """Average seconds per image_to_string call, for comparing backend overhead"""
+    backend.image_to_string(image, psm, profile)  # Warm up: engine creation, language data
+    start = time.perf_counter()
+    for _ in range(repeat):
+        backend.image_to_string(image, psm, profile)
+    return (time.perf_counter() - start) / repeat
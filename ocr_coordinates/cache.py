@@ -0,0 +1,155 @@
+"""Persistent OCR result cache keyed by image content and OCR configuration"""
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from .scoring import Candidate
+
+# Bump when the stored format or the matcher output changes incompatibly
+CACHE_VERSION = 2
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Cache modes: "use" reads and writes, "refresh" ignores stored entries but
+# overwrites them with fresh OCR, "off" bypasses the cache entirely
+CACHE_MODES = ("use", "refresh", "off")
+
+# How many writes go by between size checks
+EVICT_CHECK_INTERVAL = 50
+
+def default_cache_path():
+    """Per-user location of the cache database"""
+    if sys.platform == 'win32':
+        base = os.getenv('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ocr_coordinates', 'ocr_cache.sqlite3')
+
+def file_digest(data):
+    """SHA-256 of an image file's bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+def cache_key(digest, config_key):
+    """Combine the image digest and the OCR configuration into one key"""
+    return hashlib.sha256(f"{CACHE_VERSION}\0{digest}\0{config_key}".encode('utf-8')).hexdigest()
+
+class OcrCache:
+    """SQLite-backed store of OCR text and parsed coordinates with LRU eviction
+
+    Safe to share between threads. When pickled for a process pool only the
+    settings travel; each process opens its own connection on first use.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES, mode="use"):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode '{mode}' (expected one of: {', '.join(CACHE_MODES)})")
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self._conn = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """False when the cache is bypassed"""
+        return self.mode != "off"
+
+    def _connect(self):
+        """Open the database on first use"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    texts TEXT NOT NULL,
+                    coordinates TEXT NOT NULL,
+                    hit_stage TEXT,
+                    ocr_calls INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key):
+        """Return (texts, candidates, hit_stage, ocr_calls) or None on a miss"""
+        if self.mode != "use":
+            return None
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT texts, coordinates, hit_stage, ocr_calls FROM results WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+        texts = [tuple(t) for t in json.loads(row[0])]
+        candidates = [Candidate(*c) for c in json.loads(row[1])]
+        return texts, candidates, row[2], row[3]
+
+    def put(self, key, texts, candidates, hit_stage, ocr_calls):
+        """Store one image's OCR output; `candidates` are scoring.Candidate tuples, best first"""
+        if not self.enabled:
+            return
+        texts_json = json.dumps([list(t) for t in texts])
+        coords_json = json.dumps([list(c) for c in candidates])
+        size = len(key) + len(texts_json) + len(coords_json) + len(hit_stage or "")
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, texts_json, coords_json, hit_stage, ocr_calls, size, time.time()))
+            conn.commit()
+            self._writes += 1
+            if self._writes % EVICT_CHECK_INTERVAL == 0:
+                self._evict(conn)
+
+    def _evict(self, conn):
+        """Drop least recently used entries until the cache is under 90% of max_bytes"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        freed = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_used"):
+            if total - freed <= target:
+                break
+            doomed.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+        conn.commit()
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM results")
+            conn.commit()
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
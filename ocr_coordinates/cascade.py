@@ -0,0 +1,360 @@
+"""OCR cascade: try image variants and PSM modes in order, stop once coordinates are found"""
+import collections
+import json
+import threading
+import time
+
+from .backends import DEFAULT_BACKEND, get_backend
+from .dedup import FORMAT_RANK, CoordinateDeduplicator
+from .matcher import find_coordinates
+from .metadata import GPS_POLICIES
+from .metrics import Metrics
+from .preprocess import DEFAULT_ENGINE, PREPROCESS_PARAMS, ImageVariants, check_engine, preprocess_image_legacy
+from .profiles import DEFAULT_PROFILE, get_profile, profile_key
+from .scheduler import PassAttempt
+from .scoring import SCORING_VERSION, Reading, candidate_coordinates, page_readings, rank_candidates
+
+# Formats that come from labels or hemisphere letters; a hit on one of these
+# is trusted enough to stop the cascade. Bare number pairs ("Auto-detected",
+# "Decimal") keep it going in case a later pass reads the labels.
+CONFIDENT_FORMATS = frozenset(f for f, rank in FORMAT_RANK.items() if rank >= 4)
+
+# Tesseract word confidence (0-100) a confident-format hit also needs to
+# stop the cascade; a shaky read of a label keeps it going
+DEFAULT_MIN_CONFIDENCE = 50.0
+
+# Best candidate score (0-1, see ocr_coordinates.scoring) below which the
+# fallback cascade, if any, is run
+DEFAULT_FALLBACK_SCORE = 0.6
+
+# Image variants the cascade can OCR, built lazily from an ImageVariants
+# wrapping the decoded image
+VARIANTS = {
+    "processed": ("Processed", lambda variants: variants.processed()),
+    # The full-resolution pipeline used before preprocessing became size-aware
+    "processed-legacy": ("Processed (legacy)", lambda variants: preprocess_image_legacy(variants.image)),
+    # Binarized from the processed image (need numpy)
+    "otsu": ("Otsu", lambda variants: variants.binarized("otsu")),
+    "sauvola": ("Sauvola", lambda variants: variants.binarized("sauvola")),
+    "original": ("Original RGB", lambda variants: variants.rgb()),
+    "default": ("Default", lambda variants: variants.image),
+}
+
+# Variants built from the cached processed image
+PROCESSED_VARIANTS = frozenset(("processed", "otsu", "sauvola"))
+
+# One cascade stage: a variant and the PSM modes to try on it. A PSM of None
+# runs Tesseract with its default configuration.
+CascadeStage = collections.namedtuple('CascadeStage', ['variant', 'psm_modes'])
+
+DEFAULT_STAGES = (
+    CascadeStage("processed", (6, 11, 3)),
+    CascadeStage("original", (6, 11, 3)),
+)
+
+# Extra pass the single-image tab has always run as a last resort
+DEFAULT_PASS = CascadeStage("default", (None,))
+
+# Outcome of running the cascade over one image; `cached` is set when it
+# came from the OCR cache instead of Tesseract. `candidates` are the scored
+# coordinates (scoring.Candidate), best first; `coordinates` lists the same
+# points as plain Coordinates, so coordinates[0] is the best one and the
+# rest are alternates. With a PassScheduler, `source` is the image source
+# and `attempts` the PassAttempts to record for it.
+OcrResult = collections.namedtuple('OcrResult', ['coordinates', 'texts', 'combined_text', 'hit_stage', 'ocr_calls', 'cached',
+                                                 'candidates', 'source', 'attempts'],
+                                   defaults=(False, (), None, ()))
+
+def stage_label(variant, psm):
+    """Human readable name of one OCR pass, e.g. 'Processed PSM6'"""
+    label = VARIANTS[variant][0]
+    return label if psm is None else f"{label} PSM{psm}"
+
+def parse_stages(spec):
+    """Parse a cascade spec such as 'processed:6,11 original:11' into stages"""
+    stages = []
+    for part in spec.split():
+        variant, _, modes = part.partition(':')
+        variant = variant.strip().lower()
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown image variant '{variant}' (expected one of: {', '.join(VARIANTS)})")
+        psm_modes = tuple(int(m) for m in modes.split(',') if m.strip()) or (None,)
+        stages.append(CascadeStage(variant, psm_modes))
+    if not stages:
+        raise ValueError("Cascade spec is empty")
+    return tuple(stages)
+
+class OcrCascade:
+    """Ordered list of OCR passes with optional early exit
+
+    Within a stage the PSM modes are tried until one returns text, as before.
+    With early_exit on, the matcher runs after every pass and the cascade
+    stops as soon as a coordinate in CONFIDENT_FORMATS turns up whose words
+    Tesseract read with at least `min_confidence`.
+
+    The coordinates found are ranked by OCR confidence, format and how many
+    passes agree (see ocr_coordinates.scoring). When the best one scores
+    below `fallback_score`, or nothing is found, the `fallback` cascade (a
+    slower, more thorough OcrCascade) is run too and ranked together with it.
+
+    With a `scheduler` (ocr_coordinates.scheduler.PassScheduler) the stages
+    and PSM modes are tried in the order that has found coordinates fastest
+    for images from the same source; the caller records the attempts of
+    each OcrResult with it.
+
+    `gps_policy` (see ocr_coordinates.metadata) says what the batch engine
+    does with a GPS position in the image's EXIF or XMP metadata: ignore
+    it ("off"), use it instead of OCR ("skip") or check OCR against it
+    ("cross-check").
+
+    With a RoiLocator, the stages first run on each candidate crop and the
+    full frame is only OCR'd when no crop yields a confident coordinate.
+
+    `backend` is an OcrBackend (see ocr_coordinates.backends); by default
+    every pass spawns the tesseract executable through pytesseract.
+    `profile` is the OcrProfile (see ocr_coordinates.profiles) every pass
+    uses, e.g. the "coordinates" character whitelist.
+    `preprocess` names the preprocessing engine ("pil" or "numpy", see
+    ocr_coordinates.preprocess) that builds the processed variant.
+    """
+
+    def __init__(self, stages=DEFAULT_STAGES, early_exit=True, roi=None, dedupe=None, backend=None, profile=None,
+                 preprocess=DEFAULT_ENGINE, min_confidence=DEFAULT_MIN_CONFIDENCE, fallback=None,
+                 fallback_score=DEFAULT_FALLBACK_SCORE, scheduler=None, gps_policy="off"):
+        self.stages = tuple(stages)
+        self.early_exit = early_exit
+        self.roi = roi
+        self.dedupe = dedupe or CoordinateDeduplicator()
+        self.backend = backend or get_backend()
+        self.profile = profile or get_profile()
+        self.preprocess = check_engine(preprocess)
+        self.min_confidence = min_confidence
+        self.fallback = fallback
+        self.fallback_score = fallback_score
+        self.scheduler = scheduler
+        if gps_policy not in GPS_POLICIES:
+            raise ValueError(f"Unknown GPS policy '{gps_policy}' (expected one of: {', '.join(GPS_POLICIES)})")
+        self.gps_policy = gps_policy
+
+    def config_key(self):
+        """Stable description of everything that affects this cascade's output"""
+        return json.dumps({
+            'stages': [[variant, list(psm_modes)] for variant, psm_modes in self.stages],
+            'early_exit': self.early_exit,
+            'oem': 3,
+            'preprocess': PREPROCESS_PARAMS,
+            'roi': self.roi.config_key() if self.roi is not None else None,
+            'dedupe': self.dedupe.config_key(),
+            'backend': self.backend.name,
+            'profile': profile_key(self.profile),
+            'preprocess_engine': self.preprocess,
+            'scoring': SCORING_VERSION,
+            'min_confidence': self.min_confidence,
+            'fallback': self.fallback.config_key() if self.fallback is not None else None,
+            'fallback_score': self.fallback_score,
+            'scheduler': self.scheduler.mode if self.scheduler is not None else None,
+            # gps_policy is left out: metadata is read around the cache, never stored in it
+        }, sort_keys=True)
+
+    def describe(self):
+        """Short summary of the passes, e.g. 'processed:6,11,3 original:6,11,3 roi=auto'"""
+        parts = [variant + (':' + ','.join(str(m) for m in psm_modes) if psm_modes != (None,) else '')
+                 for variant, psm_modes in self.stages]
+        if not self.early_exit:
+            parts.append("no-early-exit")
+        if self.roi is not None and self.roi.enabled:
+            parts.append(f"roi={self.roi.mode}")
+        if self.profile.name != DEFAULT_PROFILE:
+            parts.append(f"profile={self.profile.name}")
+        if self.backend.name != DEFAULT_BACKEND:
+            parts.append(f"backend={self.backend.name}")
+        if self.preprocess != DEFAULT_ENGINE:
+            parts.append(f"preprocess={self.preprocess}")
+        if self.min_confidence != DEFAULT_MIN_CONFIDENCE:
+            parts.append(f"min-confidence={self.min_confidence:g}")
+        if self.fallback is not None:
+            parts.append(f"fallback=[{self.fallback.describe()}] below {self.fallback_score:g}")
+        if self.scheduler is not None:
+            parts.append(f"adaptive={self.scheduler.mode}")
+        if self.gps_policy != "off":
+            parts.append(f"gps={self.gps_policy}")
+        return " ".join(parts)
+
+    def with_default_pass(self):
+        """Copy of this cascade with the plain default-config pass appended"""
+        return OcrCascade(self.stages + (DEFAULT_PASS,), self.early_exit, self.roi, self.dedupe, self.backend,
+                          self.profile, self.preprocess, self.min_confidence, self.fallback, self.fallback_score,
+                          self.scheduler, self.gps_policy)
+
+    def _confident(self, readings):
+        """Whether any reading is trusted enough to stop the cascade"""
+        return any(reading.coordinate.format_type in CONFIDENT_FORMATS
+                   and (reading.confidence is None or reading.confidence >= self.min_confidence)
+                   for reading in readings)
+
+    def _run_stages(self, image, prefix, metrics, stages, attempts):
+        """Run the stages on one image; return (texts, readings, hit_stage, ocr_calls)
+
+        Every pass run is appended to `attempts` as a PassAttempt.
+        """
+        all_texts = []
+        all_readings = []
+        hit_stage = None
+        ocr_calls = 0
+        variants = ImageVariants(image, self.preprocess)
+        # The processed image is dropped after the last stage that uses it
+        last_processed = max([i for i, (variant, _) in enumerate(stages) if variant in PROCESSED_VARIANTS],
+                             default=None)
+
+        for index, (variant, psm_modes) in enumerate(stages):
+            # Variants are only built once a stage actually needs them;
+            # the first pass on a variant is charged for building it
+            start = time.perf_counter()
+            with metrics.stage("variant " + variant):
+                img = VARIANTS[variant][1](variants)
+
+            for psm in psm_modes:
+                label = stage_label(variant, psm)
+                if psm != psm_modes[0]:
+                    start = time.perf_counter()
+                try:
+                    ocr_calls += 1
+                    with metrics.stage("ocr " + label):
+                        page = self.backend.image_to_data(img, psm, self.profile)
+                except:
+                    attempts.append(PassAttempt(variant, psm, time.perf_counter() - start, False))
+                    continue
+                seconds = time.perf_counter() - start
+
+                text = page.text
+                if text and text.strip():
+                    source = prefix + label
+                    all_texts.append((text, source))
+                    with metrics.stage("match"):
+                        readings = page_readings(page, find_coordinates(text), source, self.dedupe.tolerance)
+                    all_readings.extend(readings)
+                    confident = self._confident(readings)
+                    attempts.append(PassAttempt(variant, psm, seconds, confident))
+                    if hit_stage is None and confident:
+                        hit_stage = source
+                    break  # Use first successful OCR per variant
+                attempts.append(PassAttempt(variant, psm, seconds, False))
+
+            # Free this variant before the next one is built
+            del img
+            if index == last_processed:
+                variants.release()
+
+            if hit_stage and self.early_exit:
+                break
+
+        return all_texts, all_readings, hit_stage, ocr_calls
+
+    def _read(self, image, metrics, stages=None, attempts=None):
+        """Run the stages on the ROI crops, then the full frame; return (texts, readings, hit_stage, ocr_calls)"""
+        stages = self.stages if stages is None else stages
+        attempts = [] if attempts is None else attempts
+        all_texts = []
+        all_readings = []
+        hit_stage = None
+        ocr_calls = 0
+
+        # Candidate crops first; the full frame is the fallback
+        passes = []
+        if self.roi is not None and self.roi.enabled:
+            with metrics.stage("roi"):
+                passes = [(f"ROI {label}: ", box) for label, box in self.roi.regions(image)]
+        passes.append(("", None))
+
+        for prefix, box in passes:
+            target = image.crop(box) if box is not None else image
+            texts, readings, hit, calls = self._run_stages(target, prefix, metrics, stages, attempts)
+            all_texts.extend(texts)
+            all_readings.extend(readings)
+            ocr_calls += calls
+            if hit_stage is None:
+                hit_stage = hit
+            if hit_stage and self.early_exit:
+                break
+        return all_texts, all_readings, hit_stage, ocr_calls
+
+    def _rank(self, readings, metrics):
+        """Scored candidates of a list of readings, best first"""
+        with metrics.stage("rank"):
+            return rank_candidates(readings, self.dedupe.tolerance, self.dedupe.keep)
+
+    def run(self, image, metrics=None, path=None):
+        """OCR an image stage by stage and return an OcrResult
+
+        Time spent per stage goes into `metrics` (a Metrics), if given.
+        `path` is the image file, which the scheduler may group images by.
+        """
+        metrics = metrics if metrics is not None else Metrics()
+        source = None
+        stages = self.stages
+        attempts = []
+        if self.scheduler is not None:
+            source = self.scheduler.source_key(image, path)
+            stages = self.scheduler.order(self.stages, source)
+        all_texts, all_readings, hit_stage, ocr_calls = self._read(image, metrics, stages, attempts)
+
+        if self.fallback is not None:
+            candidates = self._rank(all_readings, metrics)
+            if not candidates or candidates[0].score < self.fallback_score:
+                # Nothing found, or nothing trustworthy: try harder
+                texts, readings, hit, calls = self.fallback._read(image, metrics)
+                all_texts.extend((text, "Fallback " + source) for text, source in texts)
+                all_readings.extend(reading._replace(source="Fallback " + reading.source) for reading in readings)
+                ocr_calls += calls
+                metrics.count("fallback runs")
+                if hit_stage is None and hit is not None:
+                    hit_stage = "Fallback " + hit
+
+        # Combine all OCR results and try the combined text too
+        combined_text = "\n".join([text for text, _ in all_texts])
+        if len(all_texts) > 1:
+            with metrics.stage("match"):
+                all_readings.extend(Reading(coordinate, None, None) for coordinate in find_coordinates(combined_text))
+
+        candidates = self._rank(all_readings, metrics)
+        metrics.count("tesseract calls", ocr_calls)
+        if hit_stage is None and candidates:
+            # Only low-confidence matches; credit the last pass that produced text
+            hit_stage = all_texts[-1][1]
+
+        return OcrResult(candidate_coordinates(candidates), all_texts, combined_text, hit_stage, ocr_calls,
+                         candidates=candidates, source=source, attempts=tuple(attempts))
+
+class CascadeStats:
+    """Thread-safe tally of which cascade stage produced each image's coordinates"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.images = 0
+        self.ocr_calls = 0
+        self.stage_hits = collections.Counter()
+        self.cache_hits = 0
+
+    def record(self, result):
+        """Count one OcrResult"""
+        with self._lock:
+            self.images += 1
+            self.ocr_calls += result.ocr_calls
+            if result.cached:
+                self.cache_hits += 1
+            self.stage_hits[result.hit_stage or "no coordinates"] += 1
+
+    def calls_per_image(self):
+        """Average number of Tesseract calls per image so far"""
+        return self.ocr_calls / self.images if self.images else 0.0
+
+    def summary(self):
+        """Multi-line text report of stage hit rates"""
+        with self._lock:
+            lines = [f"{self.images} image(s), {self.ocr_calls} Tesseract call(s) "
+                     f"({self.calls_per_image():.2f} per image)"]
+            if self.cache_hits:
+                lines.append(f"  served from cache: {self.cache_hits} ({100.0 * self.cache_hits / self.images:.1f}%)")
+            for stage, count in self.stage_hits.most_common():
+                lines.append(f"  {stage}: {count} ({100.0 * count / self.images:.1f}%)")
+        return "\n".join(lines)
@@ -0,0 +1,401 @@
+"""Command line interface: headless batch runs, single images, or the GUI"""
+import argparse
+import itertools
+import os
+import sys
+
+def build_parser():
+    """Create the argument parser for `python -m ocr_coordinates`"""
+    parser = argparse.ArgumentParser(
+        prog="ocr_coordinates",
+        description="Extract latitude and longitude from images using OCR.")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    batch_parser = subparsers.add_parser("batch", help="Process many images and write a coordinates file")
+    batch_parser.add_argument("paths", nargs="+",
+                              help="Image files, folders of images, or glob patterns such as 'photos/**/*.jpg'")
+    batch_parser.add_argument("-r", "--recursive", action="store_true",
+                              help="Also take images from subfolders of the given folders")
+    batch_parser.add_argument("--include", action="append", default=None, metavar="PATTERN",
+                              help="Only take images whose name or path matches this pattern, e.g. "
+                                   "'*GPS*'; may be repeated")
+    batch_parser.add_argument("--exclude", action="append", default=None, metavar="PATTERN",
+                              help="Leave out images whose name or path matches this pattern; may be repeated")
+    batch_parser.add_argument("--pages", choices=("all", "first"), default="all",
+                              help="Multi-page TIFFs and animated GIFs: OCR every page, each as its own "
+                                   "image named 'name#page=N', or only the first (default: all)")
+    batch_parser.add_argument("-o", "--output",
+                              help="Output file, written as rows are produced; .jsonl writes JSON lines "
+                                   "(default: print CSV to stdout)")
+    batch_parser.add_argument("--resume", action="store_true",
+                              help="Keep the rows already in the output file and skip their images")
+    batch_parser.add_argument("--manifest", default=None,
+                              help="Job manifest database recording each image's status, attempts and "
+                                   "time; images already finished in it are skipped")
+    batch_parser.add_argument("--retry", action="append", choices=("no-coords", "error", "duplicate"), default=None,
+                              help="Only re-run images the manifest marks with this status, e.g. with "
+                                   "different --stages; 'duplicate' OCRs the images that took a "
+                                   "near-duplicate's result; may be repeated (requires --manifest)")
+    batch_parser.add_argument("--flush-every", type=int, default=50,
+                              help="Flush the output file to disk every N rows (default: 50)")
+    batch_parser.add_argument("-w", "--workers", type=int, default=None,
+                              help="Number of images to OCR in parallel (default: CPU count)")
+    batch_parser.add_argument("--processes", action="store_true",
+                              help="Use worker processes instead of threads")
+    batch_parser.add_argument("--prefetch", type=int, default=None,
+                              help="Images to read and decode ahead of the OCR workers; 0 reads each "
+                                   "image in its worker (default: one per worker)")
+    batch_parser.add_argument("--prefetch-memory", type=int, default=512,
+                              help="Memory in MB the read-ahead and in-flight images may hold before "
+                                   "reading pauses (default: 512)")
+    batch_parser.add_argument("--readers", type=int, default=2,
+                              help="Threads reading images ahead; more helps on slow network shares "
+                                   "(default: 2)")
+    batch_parser.add_argument("--metrics", default=None, metavar="FILE",
+                              help="Write per-stage timings and event counts to FILE: JSON for a "
+                                   ".json name, else the Prometheus text format (for node_exporter's "
+                                   "textfile collector)")
+    batch_parser.add_argument("--best-only", action="store_true",
+                              help="Write only the best-scoring coordinate of each image, not the alternates")
+    batch_parser.add_argument("--near-duplicates", choices=("off", "overlay", "frame"), default="off",
+                              nargs="?", const="overlay",
+                              help="Give images that look like one earlier in the batch (burst shots, "
+                                   "re-saved copies) its result instead of OCR'ing them, comparing "
+                                   "perceptual hashes of the overlay band (the default when given "
+                                   "without a value) or of the whole frame, then the coordinate "
+                                   "stamps themselves (default: off)")
+    batch_parser.add_argument("--near-duplicate-distance", type=int, default=3,
+                              help="Differing hash bits (of 64) up to which images are compared "
+                                   "as near-duplicates (default: 3)")
+    batch_parser.add_argument("--unique-across-images", action="store_true",
+                              help="Skip rows whose coordinates are within the dedupe tolerance "
+                                   "of a row already written for any image")
+    
+    extract_parser = subparsers.add_parser("extract", help="Print the coordinates found in one image")
+    extract_parser.add_argument("image", help="Image file")
+    
+    for sub in (batch_parser, extract_parser):
+        add_cascade_arguments(sub)
+        add_cache_arguments(sub)
+    
+    schedule_parser = subparsers.add_parser("schedule", help="Show or reset the learned OCR pass order")
+    schedule_parser.add_argument("--adaptive", choices=("global", "folder", "size", "camera"), default="global",
+                                 help="Which statistics to show (default: global)")
+    schedule_parser.add_argument("--schedule-path", default=None,
+                                 help="Statistics file (default: next to the OCR cache)")
+    schedule_parser.add_argument("--reset", action="store_true", help="Forget the statistics of this mode")
+    
+    subparsers.add_parser("gui", help="Launch the desktop application (default)")
+    return parser
+
+def add_cascade_arguments(parser):
+    """Options controlling the order and early exit of OCR passes"""
+    parser.add_argument("--stages", default=None,
+                        help="OCR passes to try in order, e.g. 'processed:6,11,3 original:6,11,3' "
+                             "(variants: processed, processed-legacy, otsu, sauvola, original, default; "
+                             "otsu and sauvola need numpy)")
+    parser.add_argument("--backend", choices=("pytesseract", "tesserocr"), default="pytesseract",
+                        help="How Tesseract is called: spawn the executable per pass (pytesseract) or "
+                             "keep an in-process engine per worker (tesserocr, must be installed) "
+                             "(default: pytesseract)")
+    parser.add_argument("--profile", choices=("general", "coordinates"), default="general",
+                        help="OCR profile: Tesseract's stock settings (general) or coordinate mode, "
+                             "which only recognizes digits, degree/minute signs, NSEW and the "
+                             "Lat/Long labels, with dictionaries off (default: general)")
+    parser.add_argument("--preprocess", choices=("pil", "numpy"), default="pil",
+                        help="Preprocessing engine: Pillow filters (pil) or the same chain on one "
+                             "NumPy array (numpy, must be installed) (default: pil)")
+    parser.add_argument("--no-early-exit", action="store_true",
+                        help="Run every stage even after coordinates are found")
+    parser.add_argument("--min-confidence", type=float, default=50.0,
+                        help="Tesseract word confidence (0-100) a labeled coordinate needs to stop "
+                             "the cascade early (default: 50)")
+    parser.add_argument("--fallback-stages", default=None,
+                        help="Slower passes to run when no coordinate scores --fallback-score, "
+                             "e.g. 'sauvola:6,11 processed-legacy:6,11,3' (default: none)")
+    parser.add_argument("--fallback-profile", choices=("general", "coordinates"), default=None,
+                        help="OCR profile of the fallback passes (default: same as --profile)")
+    parser.add_argument("--fallback-score", type=float, default=0.6,
+                        help="Best coordinate score (0-1) below which the fallback passes run "
+                             "(default: 0.6)")
+    parser.add_argument("--adaptive", choices=("off", "global", "folder", "size", "camera"), default="off",
+                        help="Learn which passes find coordinates first and try those first, over all "
+                             "images or per folder, image size or EXIF camera model; the statistics are "
+                             "kept between runs (default: off)")
+    parser.add_argument("--schedule-path", default=None,
+                        help="File the --adaptive statistics are kept in (default: next to the OCR cache)")
+    parser.add_argument("--gps-metadata", choices=("off", "skip", "cross-check"), default="off",
+                        help="GPS position in the EXIF or XMP metadata: ignore it (off), use it and skip "
+                             "OCR for images that have one (skip), or OCR them too and check the "
+                             "readings against it (cross-check) (default: off)")
+    parser.add_argument("--dedupe-tolerance", type=float, default=0.0001,
+                        help="Coordinates closer than this (degrees) count as duplicates (default: 0.0001)")
+    parser.add_argument("--dedupe-keep", choices=("first", "best"), default="first",
+                        help="Which duplicate to keep within an image: the first found or the "
+                             "most trusted format (default: first)")
+    parser.add_argument("--roi", choices=("off", "templates", "auto"), default="off",
+                        help="OCR likely overlay regions before the full frame: fixed crop "
+                             "templates or automatic text-band detection (default: off)")
+    parser.add_argument("--roi-template", action="append", default=None, metavar="TEMPLATE",
+                        help="Crop template for --roi templates: a built-in name (bottom, "
+                             "bottom-left, bottom-right, top) or name=left,top,right,bottom in "
+                             "fractions of the image size; may be repeated (default: bottom)")
+
+def add_cache_arguments(parser):
+    """Options for the persistent OCR result cache"""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--no-cache", action="store_true",
+                       help="Do not read or write the OCR cache")
+    group.add_argument("--refresh-cache", action="store_true",
+                       help="Ignore cached results but store the fresh ones")
+    parser.add_argument("--cache-path", default=None,
+                        help="Cache database file (default: per-user cache folder)")
+    parser.add_argument("--cache-size", type=int, default=256,
+                        help="Maximum cache size in MB before old entries are evicted (default: 256)")
+
+def build_cache(args):
+    """Create the OcrCache described by the command line options"""
+    from .cache import OcrCache
+    
+    mode = "off" if args.no_cache else "refresh" if args.refresh_cache else "use"
+    return OcrCache(args.cache_path, max_bytes=args.cache_size * 1024 * 1024, mode=mode)
+
+def build_cascade(args):
+    """Create the OcrCascade described by the command line options"""
+    from .backends import get_backend
+    from .cascade import DEFAULT_STAGES, OcrCascade, parse_stages
+    from .dedup import CoordinateDeduplicator
+    from .preprocess import BINARIZE_METHODS, numpy_available
+    from .profiles import get_profile
+    from .roi import RoiLocator, parse_template
+    from .scheduler import PassScheduler, default_schedule_path
+    
+    stages = parse_stages(args.stages) if args.stages else DEFAULT_STAGES
+    fallback_stages = parse_stages(args.fallback_stages) if args.fallback_stages else ()
+    if args.fallback_profile and not fallback_stages:
+        fallback_stages = DEFAULT_STAGES
+    if ((args.preprocess == "numpy" or any(s.variant in BINARIZE_METHODS for s in stages + fallback_stages))
+            and not numpy_available()):
+        raise ValueError("NumPy preprocessing and the otsu/sauvola variants need the numpy package: pip install numpy")
+    templates = [parse_template(t) for t in args.roi_template] if args.roi_template else None
+    roi = RoiLocator(args.roi, templates) if args.roi != "off" else None
+    dedupe = CoordinateDeduplicator(args.dedupe_tolerance, args.dedupe_keep)
+    backend = get_backend(args.backend)
+    scheduler = None
+    if args.adaptive != "off":
+        scheduler = PassScheduler(args.adaptive, args.schedule_path or default_schedule_path())
+    fallback = None
+    if fallback_stages:
+        # Full frame only: the fallback is for images the regular passes could not read
+        fallback = OcrCascade(fallback_stages, early_exit=not args.no_early_exit, dedupe=dedupe, backend=backend,
+                              profile=get_profile(args.fallback_profile or args.profile),
+                              preprocess=args.preprocess, min_confidence=args.min_confidence)
+    return OcrCascade(stages, early_exit=not args.no_early_exit, roi=roi, dedupe=dedupe,
+                      backend=backend, profile=get_profile(args.profile),
+                      preprocess=args.preprocess, min_confidence=args.min_confidence,
+                      fallback=fallback, fallback_score=args.fallback_score, scheduler=scheduler,
+                      gps_policy=args.gps_metadata)
+
+def run_batch(args):
+    """Process every image and write rows in the usual `serial no, Img name, lat, long` format"""
+    from .dedup import SpatialIndex
+    from .engine import BatchEngine
+    from .ingest import image_name, iter_frames, iter_image_paths
+    from .manifest import JobManifest
+    from .metadata import METADATA_FORMATS
+    from .near_duplicates import NearDuplicateIndex
+    from .results import CSV_HEADER, ResultSink, format_row
+    
+    if args.retry and not args.manifest:
+        raise ValueError("--retry needs the --manifest of the earlier run")
+    
+    # Paths are produced lazily, so OCR starts while a large folder is still being walked
+    image_paths = iter_image_paths(args.paths, args.recursive, args.include, args.exclude)
+    if args.pages == "all":
+        image_paths = iter_frames(image_paths)
+    first = next(image_paths, None)
+    if first is None:
+        print("No images found.", file=sys.stderr)
+        return 1
+    counts = {'scanned': 0}
+    image_paths = _counted(itertools.chain([first], image_paths), counts, 'scanned')
+    
+    manifest = None
+    resume = args.resume or bool(args.retry)
+    if args.manifest:
+        manifest = JobManifest(args.manifest)
+        # A manifest with finished images means the output file belongs to that run
+        resume = resume or any(status != "pending" for status in manifest.counts())
+        image_paths = manifest.select(image_paths, args.retry or ("pending",))
+    
+    sink = None
+    if args.output:
+        # Rows are appended as they come in; a crashed run can be resumed
+        sink = ResultSink(args.output, resume=resume, flush_every=args.flush_every).open()
+        if sink.has_rows() and not args.retry:
+            image_paths = _unwritten(image_paths, sink, manifest)
+    else:
+        sys.stdout.write(CSV_HEADER)
+    
+    serial_no = sink.last_serial + 1 if sink else 1
+    found = 0
+    processed = 0
+    # Rows written so far, for --unique-across-images
+    written = SpatialIndex(args.dedupe_tolerance) if args.unique_across_images else None
+    if written is not None and sink is not None:
+        for result in sink.existing_results:
+            written.add(result['lat'], result['lon'], result['img_name'])
+    completed = False
+    try:
+        cascade = build_cascade(args)
+        near_duplicates = None
+        # Re-running the duplicates means OCR'ing them for real
+        if args.near_duplicates != "off" and "duplicate" not in (args.retry or ()):
+            near_duplicates = NearDuplicateIndex(args.near_duplicates, args.near_duplicate_distance, cascade.roi)
+        engine = BatchEngine(workers=args.workers, use_processes=args.processes,
+                             cascade=cascade, cache=build_cache(args), manifest=manifest,
+                             prefetch=args.prefetch, prefetch_memory=args.prefetch_memory * 1024 * 1024,
+                             readers=args.readers, near_duplicates=near_duplicates,
+                             # Images are marked done once their rows are on disk
+                             defer_record=sink.after_flush if sink else None)
+        for image_path, coordinates, error in engine.run(image_paths):
+            processed += 1
+            img_name = image_name(image_path)
+            if error is not None:
+                status = f"error: {error}"
+            elif coordinates:
+                status = f"{len(coordinates)} coordinate(s)"
+                if coordinates[0].format_type in METADATA_FORMATS:
+                    status += f", best from {coordinates[0].format_type}"
+            else:
+                status = "no coordinates"
+            duplicate_of = engine.duplicates.get(image_path)
+            if duplicate_of is not None:
+                status += (f", copied from near-duplicate {os.path.basename(duplicate_of[0])} "
+                           f"(distance {duplicate_of[1]})")
+                duplicate_of = duplicate_of[0]
+            rows = 0
+            # Coordinates come best first; the rest are alternates
+            for format_type, lat, lon in (coordinates[:1] if args.best_only else coordinates):
+                if written is not None:
+                    if written.find(lat, lon) is not None:
+                        continue
+                    written.add(lat, lon, img_name)
+                if sink:
+                    sink.write_result(serial_no, img_name, lat, lon, image_path, format_type, duplicate_of)
+                else:
+                    sys.stdout.write(format_row(serial_no, img_name, lat, lon))
+                serial_no += 1
+                found += 1
+                rows += 1
+            if sink and not rows:
+                sink.write_status(img_name, status, image_path, duplicate_of)
+            print(f"[{processed}] {os.path.basename(image_path)}: {status}", file=sys.stderr)
+        completed = True
+    finally:
+        if sink:
+            # An error or Ctrl-C leaves the rows in the .partial file for --resume
+            sink.close(commit=completed)
+        if manifest:
+            summary = manifest.summary()
+            manifest.close()
+    
+    skipped = counts['scanned'] - processed
+    print(f"Found {found} coordinate(s) in {processed} image(s)"
+          + (f"; skipped {skipped} already finished." if skipped else "."), file=sys.stderr)
+    if manifest:
+        print(f"Manifest {args.manifest}: {summary}", file=sys.stderr)
+    print("Cascade stage hits:\n" + engine.stats.summary(), file=sys.stderr)
+    print(engine.memory.summary(), file=sys.stderr)
+    print("Stage timings:\n" + engine.metrics.summary(), file=sys.stderr)
+    if args.metrics:
+        engine.metrics.write(args.metrics)
+    scheduler = engine.cascade.scheduler
+    if scheduler is not None:
+        scheduler.save()
+        print("Learned pass order:\n" + scheduler.summary(engine.cascade.stages), file=sys.stderr)
+    return 0
+
+def _unwritten(image_paths, sink, manifest):
+    """Pass on the images the output has no rows for
+
+    Without a manifest, CSV rows are matched by image name. With one, its
+    per-path status has already picked the images, and only rows stored
+    under the full path (JSONL) are matched: those of images whose rows
+    reached the file just before a crash, ahead of their manifest record.
+    Such images are recorded as finished in the manifest.
+    """
+    for path in image_paths:
+        if not sink.is_done(path, by_name=manifest is None):
+            yield path
+        elif manifest is not None:
+            manifest.record(path, sink.done_status(path))
+
+def _counted(iterable, counts, key):
+    """Pass items through, counting them in counts[key]"""
+    for item in iterable:
+        counts[key] += 1
+        yield item
+
+def run_extract(args):
+    """Print each coordinate found in a single image"""
+    from .engine import ocr_file
+    
+    cascade = build_cascade(args)
+    result = ocr_file(args.image, cascade, build_cache(args))
+    if cascade.scheduler is not None:
+        cascade.scheduler.record(result.source, result.attempts)
+        cascade.scheduler.save()
+    candidates = result.candidates
+    if not candidates:
+        print("No coordinates found.", file=sys.stderr)
+        return 1
+    for rank, candidate in enumerate(candidates):
+        confidence = f", OCR confidence {candidate.confidence:.0f}" if candidate.confidence is not None else ""
+        print(f"{candidate.lat:.6f}, {candidate.lon:.6f}  ({candidate.format_type}, score {candidate.score:.2f}"
+              f"{confidence}{', alternate' if rank else ''})")
+    return 0
+
+def run_schedule(args):
+    """Print or reset the statistics behind --adaptive"""
+    from .cascade import DEFAULT_STAGES
+    from .scheduler import PassScheduler, default_schedule_path
+    
+    scheduler = PassScheduler(args.adaptive, args.schedule_path or default_schedule_path())
+    if args.reset:
+        scheduler.reset()
+        scheduler.save()
+        print(f"Forgot the {args.adaptive} pass statistics in {scheduler.path}", file=sys.stderr)
+        return 0
+    print(f"Pass statistics ({args.adaptive}) in {scheduler.path}:")
+    print(scheduler.summary(DEFAULT_STAGES))
+    return 0
+
+def main(argv=None):
+    """Entry point for `python -m ocr_coordinates`"""
+    args = build_parser().parse_args(argv)
+    
+    if args.command in (None, "gui"):
+        # Tkinter is only imported when the GUI is actually launched
+        from .gui import main as gui_main
+        gui_main()
+        return 0
+    if args.command == "schedule":
+        return run_schedule(args)
+    
+    from .backends import get_backend
+    if not get_backend(args.backend).available():
+        if args.backend == "tesserocr":
+            print("The tesserocr backend needs the tesserocr package: pip install tesserocr", file=sys.stderr)
+        else:
+            print("Tesseract OCR is not installed or not in PATH.\n"
+                  "Download from: https://github.com/UB-Mannheim/tesseract/wiki", file=sys.stderr)
+        return 1
+    
+    try:
+        if args.command == "batch":
+            return run_batch(args)
+        return run_extract(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
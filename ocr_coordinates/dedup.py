@@ -0,0 +1,169 @@
+"""Near-duplicate detection for coordinates using a grid hash"""
+import collections
+import math
+
+# Coordinates closer than this in both latitude and longitude are the same point
+DEFAULT_TOLERANCE = 0.0001
+
+DEDUPE_KEEP = ("first", "best")
+
+# Below this many items a plain scan beats building the grid
+LINEAR_SCAN_LIMIT = 32
+
+# How much a format can be trusted; used to pick a winner among duplicates.
+# Labeled and hemisphere-lettered formats beat bare number pairs.
+FORMAT_RANK = {
+    "Lat/Long": 5,
+    "Labeled": 5,
+    "Lat/Long (multi-line)": 4,
+    "Lat/Long (normalized)": 4,
+    "DMS": 4,
+    "DDM": 4,
+    "Decimal": 2,
+    "Auto-detected": 1,
+}
+
+def format_rank(format_type):
+    """Trust rank of a coordinate format (unknown formats rank lowest)"""
+    return FORMAT_RANK.get(format_type, 0)
+
+def _coordinate_key(item):
+    """(lat, lon) of a Coordinate-like (format_type, lat, lon) tuple"""
+    return (item[1], item[2])
+
+def _coordinate_rank(item):
+    """Format rank of a Coordinate-like tuple"""
+    return format_rank(item[0])
+
+class SpatialIndex:
+    """Points bucketed into a grid so neighbours are found without a full scan
+
+    Cells are a hair wider than the tolerance, so any point within tolerance
+    of another is in the same cell or one of the eight around it.
+    """
+
+    def __init__(self, tolerance=DEFAULT_TOLERANCE):
+        self.tolerance = tolerance
+        self._cell_size = tolerance * (1 + 1e-9)
+        self._cells = collections.defaultdict(list)
+        self._size = 0
+
+    def _cell(self, lat, lon):
+        """Grid cell of a point"""
+        return (math.floor(lat / self._cell_size), math.floor(lon / self._cell_size))
+
+    def find(self, lat, lon):
+        """Return the earliest stored entry [lat, lon, value, order] within tolerance, or None"""
+        cell_lat, cell_lon = self._cell(lat, lon)
+        best = None
+        for d_lat in (-1, 0, 1):
+            for d_lon in (-1, 0, 1):
+                for entry in self._cells.get((cell_lat + d_lat, cell_lon + d_lon), ()):
+                    if abs(lat - entry[0]) < self.tolerance and abs(lon - entry[1]) < self.tolerance:
+                        # Earliest insertion wins, as with a linear scan
+                        if best is None or entry[3] < best[3]:
+                            best = entry
+        return best
+
+    def add(self, lat, lon, value):
+        """Store a point and return its entry"""
+        entry = [lat, lon, value, self._size]
+        self._cells[self._cell(lat, lon)].append(entry)
+        self._size += 1
+        return entry
+
+    def move(self, entry, lat, lon):
+        """Update a stored entry's position"""
+        self._cells[self._cell(entry[0], entry[1])].remove(entry)
+        entry[0], entry[1] = lat, lon
+        self._cells[self._cell(lat, lon)].append(entry)
+
+    def __len__(self):
+        return self._size
+
+class CoordinateDeduplicator:
+    """Drop coordinates within `tolerance` of one already kept
+
+    keep="first" keeps the first occurrence (the historical behaviour);
+    keep="best" keeps the occurrence with the most trusted format, in the
+    position of the first one.
+    """
+
+    def __init__(self, tolerance=DEFAULT_TOLERANCE, keep="first"):
+        if keep not in DEDUPE_KEEP:
+            raise ValueError(f"Unknown dedupe choice '{keep}' (expected one of: {', '.join(DEDUPE_KEEP)})")
+        self.tolerance = tolerance
+        self.keep = keep
+
+    def dedupe(self, items, key=None, rank=None):
+        """Return the unique items in input order
+
+        `key` maps an item to (lat, lon); by default items are Coordinate-like
+        (format_type, lat, lon) tuples. `rank` scores an item for keep="best";
+        by default the format rank is used.
+        """
+        key = key or _coordinate_key
+        rank = rank or _coordinate_rank
+        items = list(items)
+        if len(items) <= LINEAR_SCAN_LIMIT:
+            return self._dedupe_linear(items, key, rank)
+        
+        index = SpatialIndex(self.tolerance)
+        unique = []
+        for item in items:
+            lat, lon = key(item)
+            entry = index.find(lat, lon)
+            if entry is None:
+                index.add(lat, lon, len(unique))
+                unique.append(item)
+            elif self.keep == "best" and rank(item) > rank(unique[entry[2]]):
+                unique[entry[2]] = item
+                index.move(entry, lat, lon)
+        return unique
+
+    def _dedupe_linear(self, items, key, rank):
+        """Same result as dedupe() by comparing against every kept item"""
+        tolerance = self.tolerance
+        unique = []
+        kept_points = []
+        for item in items:
+            lat, lon = key(item)
+            for i, (kept_lat, kept_lon) in enumerate(kept_points):
+                if abs(lat - kept_lat) < tolerance and abs(lon - kept_lon) < tolerance:
+                    if self.keep == "best" and rank(item) > rank(unique[i]):
+                        unique[i] = item
+                        kept_points[i] = (lat, lon)
+                    break
+            else:
+                unique.append(item)
+                kept_points.append((lat, lon))
+        return unique
+
+    def duplicates(self, items, key=None):
+        """Split items into (unique, duplicates), keeping the first occurrence"""
+        key = key or _coordinate_key
+        index = SpatialIndex(self.tolerance)
+        unique = []
+        duplicates = []
+        for item in items:
+            lat, lon = key(item)
+            if index.find(lat, lon) is None:
+                index.add(lat, lon, len(unique))
+                unique.append(item)
+            else:
+                duplicates.append(item)
+        return unique, duplicates
+
+    def config_key(self):
+        """Stable description of the settings, for the OCR cache key"""
+        return f"{self.tolerance!r}:{self.keep}"
+
+_default_deduplicator = CoordinateDeduplicator()
+
+def dedupe_coordinates(coordinates, tolerance=DEFAULT_TOLERANCE, keep="first"):
+    """Drop coordinates within `tolerance` of one already kept"""
+    if tolerance == DEFAULT_TOLERANCE and keep == "first":
+        deduplicator = _default_deduplicator
+    else:
+        deduplicator = CoordinateDeduplicator(tolerance, keep)
+    return deduplicator.dedupe(coordinates)
@@ -0,0 +1,510 @@
+"""OCR pipeline shared by the GUI, the command line and library callers"""
+import io
+import os
+import time
+import collections
+import concurrent.futures
+import functools
+
+from PIL import Image, UnidentifiedImageError
+
+from . import tesseract  # noqa: F401  (configures the Tesseract path on Windows)
+from .cache import cache_key, file_digest
+from .cascade import CascadeStats, OcrCascade, OcrResult
+from .ingest import split_frame_item
+from .manifest import job_status
+from .memory import MemoryStats, worker_peak_rss
+from .metadata import metadata_candidate, read_gps
+from .metrics import Metrics
+from .prefetch import DEFAULT_MEMORY_BUDGET, NOT_READY, Prefetcher
+from .scoring import candidate_coordinates
+from .preprocess import close_frame_readers, open_frame, open_image
+
+# An input read by the prefetch stage. `key` is its cache key (None without
+# a cache), `cached` a finished OcrResult (a cache hit, or the GPS metadata
+# when OCR is skipped), `data` the file bytes when it is decoded by the
+# worker, `image` the decoded image, `seconds` the time spent loading it,
+# `gps` the metadata position to cross-check OCR against and `phash` the
+# perceptual hash for near-duplicate lookups.
+PrefetchedImage = collections.namedtuple('PrefetchedImage', ['path', 'key', 'cached', 'data', 'image', 'seconds', 'gps',
+                                                             'phash'],
+                                         defaults=(None, None))
+
+def run_ocr(image, default_pass=False, cascade=None, metrics=None, path=None):
+    """OCR an image with the cascade and return an OcrResult
+    
+    `default_pass` appends the plain default-config pass used by the
+    single-image tab. Stage timings go into `metrics`, if given.
+    """
+    cascade = cascade or OcrCascade()
+    if default_pass:
+        cascade = cascade.with_default_pass()
+    return cascade.run(image, metrics, path)
+
+def ocr_file(image_path, cascade=None, cache=None, metrics=None):
+    """Open an image file and run the OCR cascade on it, going through `cache` if given"""
+    cascade = cascade or OcrCascade()
+    metrics = metrics if metrics is not None else Metrics()
+    path, page = split_frame_item(image_path)
+    if page is not None:
+        return _ocr_frame(path, page, cascade, cache, metrics)
+    if cache is None or not cache.enabled:
+        gps = _gps_lookup(image_path, cascade, metrics)
+        if gps is not None and cascade.gps_policy == "skip":
+            return _gps_result(gps)
+        with metrics.stage("decode"):
+            image = open_image(image_path)
+            image.load()
+        with image:
+            result = run_ocr(image, cascade=cascade, metrics=metrics, path=image_path)
+        return _cross_check(gps, result, cascade, metrics)
+    
+    # Hash the bytes we are about to decode anyway, so a hit costs one read
+    with metrics.stage("read"):
+        with open(image_path, 'rb') as f:
+            data = f.read()
+    gps = _gps_lookup(io.BytesIO(data), cascade, metrics)
+    if gps is not None and cascade.gps_policy == "skip":
+        return _gps_result(gps)
+    key, cached = _cache_lookup(data, cascade, cache, metrics)
+    if cached is not None:
+        return _cross_check(gps, cached, cascade, metrics)
+    
+    with metrics.stage("decode"):
+        image = _decode(data, image_path)
+        image.load()
+    with image:
+        result = run_ocr(image, cascade=cascade, metrics=metrics, path=image_path)
+    with metrics.stage("cache store"):
+        cache.put(key, result.texts, result.candidates, result.hit_stage, result.ocr_calls)
+    return _cross_check(gps, result, cascade, metrics)
+
+def _ocr_frame(path, page, cascade, cache, metrics):
+    """ocr_file() for one page of a multi-page file
+    
+    The page comes from the file's FrameReader, so pages OCR'd in order
+    are each decoded once. The cache key is taken from the page's pixels
+    rather than the file's bytes, which would read the whole file once
+    per page. Pages are not checked for GPS metadata: it describes the
+    whole file, while each page of a survey scan has its own position.
+    """
+    with metrics.stage("decode"):
+        image = open_frame(path, page)
+        image.load()
+    with image:
+        key = None
+        if cache is not None and cache.enabled:
+            pixels = f"{image.mode} {image.size}\0".encode('utf-8') + image.tobytes()
+            key, cached = _cache_lookup(pixels, cascade, cache, metrics)
+            del pixels
+            if cached is not None:
+                return cached
+        result = run_ocr(image, cascade=cascade, metrics=metrics, path=path)
+    if key is not None:
+        with metrics.stage("cache store"):
+            cache.put(key, result.texts, result.candidates, result.hit_stage, result.ocr_calls)
+    return result
+
+def _gps_lookup(fp, cascade, metrics):
+    """GPS position in an image file's metadata, read without decoding it; None when the policy is off"""
+    if cascade.gps_policy == "off":
+        return None
+    with metrics.stage("metadata"):
+        try:
+            with Image.open(fp) as image:
+                gps = read_gps(image)
+        except (OSError, SyntaxError, ValueError):
+            # Unreadable files fail again, with the usual error, when decoded
+            gps = None
+    metrics.count("gps metadata found" if gps is not None else "gps metadata missing")
+    return gps
+
+def _gps_result(gps):
+    """OcrResult for an image whose coordinates come from its metadata alone"""
+    return OcrResult([gps], [], "", gps.format_type, 0, candidates=[metadata_candidate(gps)])
+
+def _cross_check(gps, result, cascade, metrics):
+    """Put the metadata position first in an OcrResult, counting agreeing OCR readings as its votes
+    
+    OCR points within the dedupe tolerance of it are merged into it; the
+    others stay as alternates.
+    """
+    if gps is None:
+        return result
+    tolerance = cascade.dedupe.tolerance
+    agreeing = [c for c in result.candidates
+                if abs(c.lat - gps.lat) < tolerance and abs(c.lon - gps.lon) < tolerance]
+    others = [c for c in result.candidates if c not in agreeing]
+    if agreeing:
+        metrics.count("gps agrees with ocr")
+    elif others:
+        metrics.count("gps differs from ocr")
+    candidates = [metadata_candidate(gps, 1 + sum(c.votes for c in agreeing))] + others
+    return result._replace(coordinates=candidate_coordinates(candidates), candidates=candidates,
+                           hit_stage=result.hit_stage or gps.format_type)
+
+def _cache_lookup(data, cascade, cache, metrics):
+    """Return (cache key, cached OcrResult or None) for an image file's bytes"""
+    with metrics.stage("cache lookup"):
+        key = cache_key(file_digest(data), cascade.config_key())
+        cached = cache.get(key)
+    if cached is None:
+        metrics.count("cache misses")
+        return key, None
+    metrics.count("cache hits")
+    texts, candidates, hit_stage, _ = cached
+    combined_text = "\n".join([text for text, _ in texts])
+    return key, OcrResult(candidate_coordinates(candidates), texts, combined_text, hit_stage, 0, cached=True,
+                          candidates=candidates)
+
+def _decode(data, image_path):
+    """Open an image from file bytes already read, naming the file in errors"""
+    try:
+        return open_image(io.BytesIO(data))
+    except UnidentifiedImageError:
+        raise UnidentifiedImageError(f"cannot identify image file {image_path!r}")
+
+def _image_nbytes(image):
+    """Approximate memory held by a decoded image"""
+    width, height = image.size
+    return width * height * len(image.getbands())
+
+def prefetch_image(image_path, cascade, cache=None, decode=True, metrics=None, hasher=None):
+    """Load one image for the OCR workers; returns (PrefetchedImage, bytes held)
+    
+    The file is read once: its bytes are hashed for the cache lookup and, on
+    a miss, decoded right away (`decode`) or handed over as they are, for
+    workers in another process. With a NearDuplicateIndex as `hasher`, the
+    perceptual hash of images that still need OCR is taken too.
+    """
+    metrics = metrics if metrics is not None else Metrics()
+    if split_frame_item(image_path)[1] is not None:
+        # A page of a multi-page file: the worker decodes just that page, through the
+        # file's FrameReader; it is not hashed for near-duplicates either
+        return PrefetchedImage(image_path, None, None, None, None, 0.0), 0
+    start = time.perf_counter()
+    with metrics.stage("read"):
+        with open(image_path, 'rb') as f:
+            data = f.read()
+    gps = _gps_lookup(io.BytesIO(data), cascade, metrics)
+    if gps is not None and cascade.gps_policy == "skip":
+        return PrefetchedImage(image_path, None, _gps_result(gps), None, None, time.perf_counter() - start), 0
+    key = None
+    if cache is not None and cache.enabled:
+        key, cached = _cache_lookup(data, cascade, cache, metrics)
+        if cached is not None:
+            cached = _cross_check(gps, cached, cascade, metrics)
+            return PrefetchedImage(image_path, key, cached, None, None, time.perf_counter() - start), 0
+    if not decode:
+        phash = None
+        if hasher is not None:
+            with metrics.stage("phash"):
+                phash = hasher.file_hash(io.BytesIO(data))
+        return PrefetchedImage(image_path, key, None, data, None, time.perf_counter() - start, gps, phash), len(data)
+    with metrics.stage("decode"):
+        image = _decode(data, image_path)
+        image.load()
+    phash = None
+    if hasher is not None:
+        with metrics.stage("phash"):
+            phash = hasher.image_hash(image)
+    return (PrefetchedImage(image_path, key, None, None, image, time.perf_counter() - start, gps, phash),
+            _image_nbytes(image))
+
+def ocr_prefetched(item, cascade=None, cache=None, metrics=None):
+    """Run the OCR cascade on a PrefetchedImage, storing the result in `cache`"""
+    if item.cached is not None:
+        return item.cached
+    cascade = cascade or OcrCascade()
+    metrics = metrics if metrics is not None else Metrics()
+    if item.image is None and item.data is None:
+        # Pages of multi-page files are loaded here rather than by the prefetcher
+        return ocr_file(item.path, cascade, cache, metrics)
+    if item.image is not None:
+        image = item.image
+    else:
+        with metrics.stage("decode"):
+            image = _decode(item.data, item.path)
+            image.load()
+    with image:
+        result = run_ocr(image, cascade=cascade, metrics=metrics, path=item.path)
+    if item.key is not None:
+        with metrics.stage("cache store"):
+            cache.put(item.key, result.texts, result.candidates, result.hit_stage, result.ocr_calls)
+    return _cross_check(item.gps, result, cascade, metrics)
+
+def _timed_ocr_file(image_path, cascade, cache):
+    """ocr_file() for the worker pool; returns (result, seconds, (worker pid, peak RSS), Metrics)"""
+    start = time.perf_counter()
+    metrics = Metrics()
+    try:
+        result = ocr_file(image_path, cascade, cache, metrics)
+    except Exception as e:
+        # Carry the time, memory and stage timings of failed images too
+        e.seconds = time.perf_counter() - start
+        e.worker_peak = worker_peak_rss()
+        e.metrics = metrics
+        raise
+    return result, time.perf_counter() - start, worker_peak_rss(), metrics
+
+def _timed_ocr_prefetched(item, cascade, cache):
+    """ocr_prefetched() for the worker pool; like _timed_ocr_file, loading time included"""
+    start = time.perf_counter() - item.seconds
+    metrics = Metrics()
+    try:
+        result = ocr_prefetched(item, cascade, cache, metrics)
+    except Exception as e:
+        e.seconds = time.perf_counter() - start
+        e.worker_peak = worker_peak_rss()
+        e.metrics = metrics
+        raise
+    return result, time.perf_counter() - start, worker_peak_rss(), metrics
+
+def process_image(image_path, cascade=None):
+    """Run the OCR pipeline on one image file and return its unique coordinates"""
+    return ocr_file(image_path, cascade).coordinates
+
+def extract(image_path, cascade=None):
+    """Extract coordinates from an image file as a list of Coordinate tuples"""
+    return process_image(image_path, cascade)
+
+def default_worker_count():
+    """Number of OCR workers to use when none is configured"""
+    return max(1, os.cpu_count() or 1)
+
+class BatchEngine:
+    """Run the OCR cascade over many images with a pool of workers
+    
+    Up to `queue_depth` images are kept in flight, but results are yielded
+    strictly in input order so callers can hand out serial numbers that do
+    not depend on which image finished first.
+    
+    With a JobManifest, every image's status, attempt count and time are
+    recorded once the caller has handled its result. With `defer_record`
+    (e.g. ResultSink.after_flush) the record is handed to it instead, so an
+    image is only marked done once its rows are on disk. The peak memory
+    of every worker process is tracked in `memory`.
+    
+    With `prefetch` above 0, a Prefetcher reads (and, for thread workers,
+    decodes) the next images on `readers` threads while OCR runs, so disk
+    or network latency overlaps with OCR instead of adding to it.
+    
+    With a NearDuplicateIndex as `near_duplicates`, an image that looks
+    like one earlier in the batch, coordinate stamp included, is not
+    OCR'd: it gets that image's result, even while it is still in flight,
+    and is listed in `duplicates` and recorded as "duplicate" in the
+    manifest. If the earlier image fails, the duplicate is OCR'd after all.
+    """
+    
+    def __init__(self, workers=None, use_processes=False, queue_depth=None, cascade=None, cache=None, manifest=None,
+                 prefetch=None, prefetch_memory=DEFAULT_MEMORY_BUDGET, readers=2, near_duplicates=None,
+                 defer_record=None):
+        self.workers = max(1, int(workers or default_worker_count()))
+        self.use_processes = use_processes
+        self.cascade = cascade or OcrCascade()
+        self.cache = cache
+        self.manifest = manifest
+        self.defer_record = defer_record
+        # Which cascade stage hit, so the stage order can be tuned
+        self.stats = CascadeStats()
+        self.memory = MemoryStats()
+        # Time per pipeline stage, merged from every image's own Metrics
+        self.metrics = Metrics()
+        # Keep a few extra images queued so a slow image at the head does not
+        # leave the other workers idle
+        self.queue_depth = queue_depth or self.workers * 2
+        # Images read and decoded ahead of the workers (0 reads them in the
+        # workers), the memory they may hold and the reader thread count
+        self.prefetch = self.workers if prefetch is None else max(0, int(prefetch))
+        self.prefetch_memory = prefetch_memory
+        self.readers = readers
+        self.near_duplicates = near_duplicates
+        # Images that took an earlier image's result: path -> (earlier path, hash distance)
+        self.duplicates = {}
+    
+    def _create_executor(self):
+        """Create the process or thread pool that runs the OCR work"""
+        if self.use_processes:
+            return concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+        # Threads are enough here: the heavy lifting happens in the tesseract
+        # subprocess, one per in-flight image
+        return concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+    
+    def _prefetch_load(self, image_path):
+        """Load function for the Prefetcher"""
+        # Process workers get the file bytes; decoded pixels are too big to pickle
+        return prefetch_image(image_path, self.cascade, self.cache, decode=not self.use_processes,
+                              metrics=self.metrics, hasher=self.near_duplicates)
+    
+    def _submit_next(self, executor, source, block):
+        """Submit the next image; returns (image_path, future, bytes held, duplicate_of), None at the end or NOT_READY
+        
+        `duplicate_of` is (earlier path, hash distance) for a near-duplicate,
+        whose future is the earlier image's.
+        """
+        if not isinstance(source, Prefetcher):
+            try:
+                image_path = next(source)
+            except StopIteration:
+                return None
+            phash = None
+            # Pages of multi-page files are not hashed, as that would decode every
+            # page a second time, here in the submitting thread
+            if self.near_duplicates is not None and split_frame_item(image_path)[1] is None:
+                with self.metrics.stage("phash"):
+                    phash = self.near_duplicates.file_hash(image_path)
+            duplicate = self._find_duplicate(image_path, phash)
+            if duplicate is not None:
+                future, duplicate_of = duplicate
+                return image_path, future, 0, duplicate_of
+            future = executor.submit(_timed_ocr_file, image_path, self.cascade, self.cache)
+            self._add_hash(image_path, phash, future)
+            return image_path, future, 0, None
+        
+        item = source.get(block)
+        if item is None or item is NOT_READY:
+            return item
+        image_path, payload, nbytes, error = item
+        if error is not None:
+            # Unreadable file: reported in order, like any other failed image
+            future = concurrent.futures.Future()
+            future.set_exception(error)
+            return image_path, future, nbytes, None
+        duplicate = self._find_duplicate(image_path, payload.phash)
+        if duplicate is not None:
+            if payload.image is not None:
+                payload.image.close()
+            future, duplicate_of = duplicate
+            return image_path, future, nbytes, duplicate_of
+        future = executor.submit(_timed_ocr_prefetched, payload, self.cascade, self.cache)
+        self._add_hash(image_path, payload.phash, future)
+        return image_path, future, nbytes, None
+    
+    def _find_duplicate(self, image_path, phash):
+        """(earlier image's future, (earlier path, distance)) for a near-duplicate, else None
+        
+        A hash match only counts once the two coordinate stamps compare equal.
+        """
+        if phash is None:
+            return None
+        match = self.near_duplicates.find(phash)
+        if match is None:
+            return None
+        distance, (earlier_path, future) = match
+        with self.metrics.stage("stamp check"):
+            same = self.near_duplicates.same_stamp(image_path, earlier_path)
+        if not same:
+            self.metrics.count("near duplicates with a different stamp")
+            return None
+        return future, (earlier_path, distance)
+    
+    def _add_hash(self, image_path, phash, future):
+        """Index an image being OCR'd, so later near-duplicates can take its result"""
+        if phash is not None:
+            self.near_duplicates.add(phash, (image_path, future))
+    
+    def _record_job(self, image_path, coordinates, error, seconds, duplicate_of):
+        """Record an image's outcome in the manifest, or hand the record to `defer_record`"""
+        if duplicate_of is not None:
+            status, profile = "duplicate", "near-duplicate of {} (distance {})".format(*duplicate_of)
+        else:
+            status, profile = job_status(coordinates, error), self.cascade.describe()
+        record = functools.partial(self.manifest.record, image_path, status, seconds, len(coordinates), error, profile)
+        if self.defer_record is not None:
+            self.defer_record(record)
+        else:
+            record()
+    
+    def run(self, image_paths, is_paused=None, is_cancelled=None):
+        """Yield (image_path, coordinates, error) for every image, in input order
+        
+        `is_paused` and `is_cancelled` are polled before new work is submitted.
+        While paused no new images are started; once cancelled, queued images
+        are dropped and the generator stops.
+        """
+        is_paused = is_paused or (lambda: False)
+        is_cancelled = is_cancelled or (lambda: False)
+        
+        if self.prefetch:
+            source = Prefetcher(image_paths, self._prefetch_load, self.prefetch, self.prefetch_memory, self.readers)
+        else:
+            source = iter(image_paths)
+        exhausted = False
+        pending = collections.deque()
+        executor = self._create_executor()
+        
+        try:
+            while True:
+                if is_cancelled():
+                    break
+                
+                # Top up the pool unless paused; only wait for the readers when nothing is in flight
+                while not exhausted and not is_paused() and len(pending) < self.queue_depth:
+                    work = self._submit_next(executor, source, block=not pending)
+                    if work is NOT_READY:
+                        break
+                    if work is None:
+                        exhausted = True
+                        break
+                    pending.append(work)
+                
+                if not pending:
+                    if exhausted:
+                        break
+                    # Paused with nothing in flight
+                    time.sleep(0.1)
+                    continue
+                
+                image_path, future, nbytes, duplicate_of = pending[0]
+                if self.prefetch and not exhausted and not future.done():
+                    # Come back soon to hand images the readers finish meanwhile to idle workers
+                    concurrent.futures.wait([future], timeout=0.05)
+                    if not future.done():
+                        continue
+                pending.popleft()
+                if duplicate_of is not None and future.exception() is not None:
+                    # The image it looks like failed; OCR this one after all
+                    future = executor.submit(_timed_ocr_file, image_path, self.cascade, self.cache)
+                    duplicate_of = None
+                try:
+                    result, seconds, worker_peak, metrics = future.result()
+                    if duplicate_of is not None:
+                        # The earlier image's OCR calls, timings and memory are counted already
+                        seconds, worker_peak, metrics = 0.0, (None, None), None
+                        result = result._replace(ocr_calls=0, cached=False, hit_stage="near-duplicate", attempts=())
+                        self.duplicates[image_path] = duplicate_of
+                        self.metrics.count("near duplicates")
+                    self.stats.record(result)
+                    if self.cascade.scheduler is not None:
+                        # Workers may be other processes; the pass order is learned here
+                        self.cascade.scheduler.record(result.source, result.attempts)
+                    coordinates = result.coordinates
+                    error = None
+                except Exception as e:
+                    coordinates = []
+                    error = e
+                    seconds = getattr(e, 'seconds', None)
+                    worker_peak = getattr(e, 'worker_peak', (None, None))
+                    metrics = getattr(e, 'metrics', None)
+                    self.metrics.count("errors")
+                self.memory.record(*worker_peak)
+                if metrics is not None:
+                    self.metrics.merge(metrics)
+                self.metrics.count("images")
+                if self.prefetch:
+                    source.release(nbytes)
+                
+                yield image_path, coordinates, error
+                
+                # The caller has written the image's rows by now; if it stops
+                # early instead, the image stays pending
+                if self.manifest is not None:
+                    self._record_job(image_path, coordinates, error, seconds, duplicate_of)
+        finally:
+            for _, future, _, _ in pending:
+                future.cancel()
+            if self.prefetch:
+                source.close()
+            executor.shutdown(wait=False)
+            if not self.use_processes:
+                close_frame_readers()
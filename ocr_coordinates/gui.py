@@ -0,0 +1,1472 @@
+"""Tkinter desktop application"""
+import tkinter as tk
+from tkinter import filedialog, messagebox, scrolledtext, ttk
+from PIL import Image, ImageTk
+import itertools
+import os
+import queue
+import time
+from datetime import datetime
+import threading
+
+from .backends import DEFAULT_BACKEND, available_backends, get_backend
+from .cache import OcrCache
+from .cascade import OcrCascade
+from .dedup import CoordinateDeduplicator
+from .engine import BatchEngine, default_worker_count, run_ocr
+from .ingest import IMAGE_FILETYPES, ImageIndex, image_name, iter_frames, iter_image_paths, split_frame_item
+from .manifest import RETRY_STATUSES, JobManifest, manifest_path_for
+from .matcher import find_coordinates
+from .memory import format_bytes
+from .metadata import METADATA_FORMATS
+from .metrics import Metrics
+from .near_duplicates import DEFAULT_MAX_DISTANCE, NearDuplicateIndex
+from .preprocess import DEFAULT_ENGINE, available_engines, open_frame, open_image, preprocess_image
+from .profiles import get_profile
+from .result_store import COLUMNS as RESULT_COLUMNS, ResultStore
+from .results import CSV_HEADER, ResultSink, format_row, write_results
+from .roi import BUILTIN_TEMPLATES, RoiLocator
+from .tesseract import tesseract_available
+
+# Choices for the batch tab's "OCR region" option
+ROI_CHOICES = [
+    ("Full frame", None),
+    ("Auto-detect text bands", RoiLocator("auto")),
+    ("Bottom strip", RoiLocator("templates", [BUILTIN_TEMPLATES["bottom"]])),
+    ("Top strip", RoiLocator("templates", [BUILTIN_TEMPLATES["top"]])),
+]
+
+# What to do with a GPS position in the image metadata (see ocr_coordinates.metadata)
+GPS_CHOICES = [
+    ("Ignore, OCR only", "off"),
+    ("Use it, skip OCR", "skip"),
+    ("Cross-check with OCR", "cross-check"),
+]
+
+# What the near-duplicate hash covers (see ocr_coordinates.near_duplicates)
+NEAR_DUPLICATE_CHOICES = [
+    ("Overlay band", "overlay"),
+    ("Whole frame", "frame"),
+]
+
+# How often the Tk thread applies the batch worker's queued updates
+UI_UPDATE_MS = 100
+
+# Most result rows inserted per tick, so a large backlog cannot freeze the window
+UI_ROWS_PER_TICK = 2000
+
+class ResultsTable:
+    """A ttk.Treeview over a ResultStore that only holds the rows on screen
+    
+    The tree keeps one item per visible line; scrolling, sorting, filtering
+    and replacing the store just rewrite those items, so the cost of every
+    change is the same for ten rows as for a few hundred thousand.
+    """
+    
+    ROW_HEIGHT = 22
+    
+    def __init__(self, parent, store, columns, height=20):
+        self.store = store
+        self.columns = columns  # Headings of the store's values, then a constant "View Image" column
+        self.top = 0  # View position of the first line shown
+        self.selected = None  # Row number selected, kept while it scrolls out of sight
+        self.lines = height
+        self.items = []
+        self._refresh_pending = False
+        
+        ttk.Style(parent).configure("Results.Treeview", rowheight=self.ROW_HEIGHT)
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings", height=height,
+                                 selectmode="browse", style="Results.Treeview")
+        for col, column in zip(columns, RESULT_COLUMNS):
+            self.tree.heading(col, text=col, command=lambda column=column: self.toggle_sort(column))
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self._on_scrollbar)
+        
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll(-3 if event.delta > 0 else 3))
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Up>", lambda event: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self.move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self.move_selection(-self.lines))
+        self.tree.bind("<Next>", lambda event: self.move_selection(self.lines))
+        self.tree.bind("<Home>", lambda event: self.move_selection(-self.store.visible_count()))
+        self.tree.bind("<End>", lambda event: self.move_selection(self.store.visible_count()))
+    
+    def refresh_later(self):
+        """Refresh once the event loop is idle; several changes cost one refresh"""
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.tree.after_idle(self.refresh)
+    
+    def refresh(self):
+        """Show the view's rows from `top` in the tree items"""
+        self._refresh_pending = False
+        count = self.store.visible_count()
+        self.top = max(0, min(self.top, count - self.lines))
+        while len(self.items) < self.lines:
+            self.items.append(self.tree.insert("", tk.END, values=()))
+        
+        selected_item = None
+        for line, item in enumerate(self.items):
+            position = self.top + line
+            if line < self.lines and position < count:
+                row = self.store.row_at(position)
+                self.tree.item(item, values=self.store.values(row) + ("👁️ Click to View",))
+                self.tree.move(item, "", line)
+                if row == self.selected:
+                    selected_item = item
+            else:
+                self.tree.detach(item)
+        if selected_item is not None:
+            self.tree.selection_set(selected_item)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+        
+        if count:
+            self.scrollbar.set(self.top / count, min(1.0, (self.top + self.lines) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def scroll(self, lines):
+        """Scroll by a number of lines"""
+        self.top += lines
+        self.refresh()
+        return "break"
+    
+    def toggle_sort(self, column):
+        """Sort by a column; a second click reverses the order and a third restores it"""
+        if self.store.sort_column != column:
+            self.store.sort(column)
+        elif not self.store.sort_reverse:
+            self.store.sort(column, reverse=True)
+        else:
+            self.store.sort(None)
+        for col, name in zip(self.columns, RESULT_COLUMNS):
+            arrow = ""
+            if name == self.store.sort_column:
+                arrow = " ▼" if self.store.sort_reverse else " ▲"
+            self.tree.heading(col, text=col + arrow)
+        self.show_selected()
+    
+    def show_selected(self):
+        """Refresh, scrolled so the selected row is in sight if it is in the view"""
+        position = self.store.position_of(self.selected) if self.selected is not None else None
+        if position is not None and not self.top <= position < self.top + self.lines:
+            self.top = position - self.lines // 2
+        self.refresh()
+    
+    def move_selection(self, step):
+        """Select the row `step` lines from the selected one and scroll to it"""
+        count = self.store.visible_count()
+        if not count:
+            return "break"
+        position = self.store.position_of(self.selected) if self.selected is not None else None
+        position = self.top if position is None else max(0, min(count - 1, position + step))
+        self.selected = self.store.row_at(position)
+        if position < self.top:
+            self.top = position
+        elif position >= self.top + self.lines:
+            self.top = position - self.lines + 1
+        self.refresh()
+        return "break"
+    
+    def selected_row(self):
+        """Row number of the selected row in the store, or None"""
+        return self.selected
+    
+    def _on_select(self, event):
+        """Remember the clicked row by its row number"""
+        selection = self.tree.selection()
+        if selection and selection[0] in self.items:
+            position = self.top + self.items.index(selection[0])
+            if position < self.store.visible_count():
+                self.selected = self.store.row_at(position)
+    
+    def _on_scrollbar(self, action, amount, unit=None):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units' or 'pages')"""
+        if action == "moveto":
+            self.top = int(float(amount) * self.store.visible_count())
+        elif unit == "pages":
+            self.top += int(amount) * self.lines
+        else:
+            self.top += int(amount)
+        self.refresh()
+    
+    def _on_configure(self, event):
+        """Fit the number of tree items to the window height"""
+        bbox = self.tree.bbox(self.items[0]) if self.items and self.tree.exists(self.items[0]) else None
+        heading = bbox[1] if bbox else self.ROW_HEIGHT + 3
+        lines = max(1, (event.height - heading) // self.ROW_HEIGHT)
+        if lines != self.lines:
+            self.lines = lines
+            self.refresh()
+
+class CoordinateExtractor:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Lat Long Extractor by Irfan Khaliq")
+        self.root.geometry("1000x750")
+        self.root.minsize(900, 650)
+        
+        # Configure style
+        style = ttk.Style()
+        style.theme_use('clam')
+        
+        # Variables
+        self.image_path = None
+        self.image_paths = ImageIndex()  # For batch processing, in the order added
+        self.image_paths_dict = {}  # Map image names to paths for batch processing
+        self.extracted_coords = []
+        self.all_results = []  # Store all batch results
+        self.batch_rows = ResultStore()  # Every row of the results table, errors included
+        self.processing = False  # Flag to prevent multiple simultaneous processing
+        self.paused = False  # Flag for pause/resume functionality
+        self.output_path = None  # Batch results are streamed here when set
+        self.manifest = JobManifest()  # Status of every batch image; on disk next to the output file
+        self.scanning = False  # A folder scan is still adding images
+        self.batch_feed = None  # Hands images found by a running scan to a running batch
+        self.batch_metrics = Metrics()  # Stage timings of the current batch, UI updates included
+        self.batch_updates = queue.Queue()  # Rows and progress from the batch worker, applied on the Tk thread
+        self.ocr_backends = {}  # OCR backends by name, reused so in-process engines stay loaded
+        self.coordinate_mode_var = tk.BooleanVar(value=False)  # Shared by both tabs
+        
+        # Create main container
+        main_container = tk.Frame(root, bg="#f0f0f0")
+        main_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        # Header frame
+        header_frame = tk.Frame(main_container, bg="#2c3e50", height=80)
+        header_frame.pack(fill=tk.X, pady=(0, 10))
+        header_frame.pack_propagate(False)
+        
+        title_label = tk.Label(header_frame, 
+                              text="📍 Lat Long Extractor by Irfan Khaliq", 
+                              font=("Arial", 18, "bold"),
+                              bg="#2c3e50", fg="white")
+        title_label.pack(pady=20)
+        
+        # Create notebook for tabs
+        notebook = ttk.Notebook(main_container)
+        notebook.pack(fill=tk.BOTH, expand=True)
+        
+        # Single Image Tab
+        single_tab = tk.Frame(notebook, bg="#f0f0f0")
+        notebook.add(single_tab, text="Single Image")
+        self.setup_single_image_tab(single_tab)
+        
+        # Batch Processing Tab
+        batch_tab = tk.Frame(notebook, bg="#f0f0f0")
+        notebook.add(batch_tab, text="Batch Processing")
+        self.setup_batch_tab(batch_tab)
+        
+        # Status bar
+        self.status_frame = tk.Frame(main_container, bg="#34495e", height=30)
+        self.status_frame.pack(fill=tk.X, pady=(10, 0))
+        self.status_frame.pack_propagate(False)
+        
+        self.status_label = tk.Label(self.status_frame, text="Ready", 
+                                     fg="white", bg="#34495e", 
+                                     font=("Arial", 9),
+                                     anchor=tk.W, padx=10)
+        self.status_label.pack(fill=tk.X, side=tk.LEFT)
+        
+    def setup_single_image_tab(self, parent):
+        """Setup the single image processing tab"""
+        # Left panel for image preview
+        left_panel = tk.Frame(parent, bg="#f0f0f0", width=400)
+        left_panel.pack(side=tk.LEFT, fill=tk.BOTH, expand=False, padx=(10, 5), pady=10)
+        left_panel.pack_propagate(False)
+        
+        # Image preview frame
+        preview_frame = tk.LabelFrame(left_panel, text="Image Preview", 
+                                     font=("Arial", 11, "bold"),
+                                     bg="#f0f0f0", padx=10, pady=10)
+        preview_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        
+        self.preview_label = tk.Label(preview_frame, 
+                                      text="No image selected",
+                                      bg="white", 
+                                      fg="gray",
+                                      font=("Arial", 10),
+                                      width=45, height=15,
+                                      relief=tk.SUNKEN)
+        self.preview_label.pack(fill=tk.BOTH, expand=True)
+        
+        # Image info label
+        self.image_info_label = tk.Label(left_panel, 
+                                         text="No image selected", 
+                                         fg="gray", 
+                                         bg="#f0f0f0",
+                                         font=("Arial", 9),
+                                         wraplength=380,
+                                         justify=tk.LEFT)
+        self.image_info_label.pack(pady=5, anchor=tk.W)
+        
+        # Buttons frame
+        btn_frame = tk.Frame(left_panel, bg="#f0f0f0")
+        btn_frame.pack(fill=tk.X, pady=5)
+        
+        select_btn = tk.Button(btn_frame, text="📁 Select Image", 
+                              command=self.select_image, 
+                              font=("Arial", 11, "bold"),
+                              bg="#3498db", fg="white",
+                              padx=15, pady=8,
+                              cursor="hand2",
+                              relief=tk.RAISED,
+                              bd=2)
+        select_btn.pack(fill=tk.X, pady=2)
+        
+        extract_btn = tk.Button(btn_frame, text="🔍 Extract Coordinates", 
+                               command=self.extract_coordinates,
+                               font=("Arial", 11, "bold"),
+                               bg="#27ae60", fg="white",
+                               padx=15, pady=8,
+                               cursor="hand2",
+                               relief=tk.RAISED,
+                               bd=2,
+                               state=tk.DISABLED)
+        extract_btn.pack(fill=tk.X, pady=2)
+        self.extract_btn = extract_btn
+        
+        save_btn = tk.Button(btn_frame, text="💾 Save to Text File", 
+                            command=self.save_to_file,
+                            font=("Arial", 11, "bold"),
+                            bg="#e67e22", fg="white",
+                            padx=15, pady=8,
+                            cursor="hand2",
+                            relief=tk.RAISED,
+                            bd=2,
+                            state=tk.DISABLED)
+        save_btn.pack(fill=tk.X, pady=2)
+        self.save_btn = save_btn
+        
+        # Coordinate mode: Tesseract only looks for coordinate characters
+        coordinate_mode_check = tk.Checkbutton(btn_frame, text="Coordinate mode (digits, °, NSEW, Lat/Long only)",
+                                               variable=self.coordinate_mode_var,
+                                               bg="#f0f0f0", font=("Arial", 9))
+        coordinate_mode_check.pack(anchor=tk.W, pady=2)
+        
+        # Right panel for results
+        right_panel = tk.Frame(parent, bg="#f0f0f0")
+        right_panel.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 10), pady=10)
+        
+        results_label = tk.Label(right_panel, text="Extracted Coordinates", 
+                                font=("Arial", 12, "bold"),
+                                bg="#f0f0f0")
+        results_label.pack(pady=(0, 5), anchor=tk.W)
+        
+        self.results_text = scrolledtext.ScrolledText(right_panel, 
+                                                      height=25, 
+                                                      width=50,
+                                                      font=("Courier", 10),
+                                                      wrap=tk.WORD,
+                                                      bg="white",
+                                                      relief=tk.SUNKEN,
+                                                      bd=2)
+        self.results_text.pack(fill=tk.BOTH, expand=True)
+        
+    def setup_batch_tab(self, parent):
+        """Setup the batch processing tab"""
+        # Top frame for controls
+        control_frame = tk.Frame(parent, bg="#f0f0f0")
+        control_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        select_batch_btn = tk.Button(control_frame, text="📁 Select Multiple Images", 
+                                     command=self.select_batch_images,
+                                     font=("Arial", 11, "bold"),
+                                     bg="#3498db", fg="white",
+                                     padx=20, pady=10,
+                                     cursor="hand2")
+        select_batch_btn.pack(side=tk.LEFT, padx=5)
+        
+        select_folder_btn = tk.Button(control_frame, text="📂 Add Folder", 
+                                      command=self.select_batch_folder,
+                                      font=("Arial", 11, "bold"),
+                                      bg="#3498db", fg="white",
+                                      padx=20, pady=10,
+                                      cursor="hand2")
+        select_folder_btn.pack(side=tk.LEFT, padx=5)
+        
+        process_batch_btn = tk.Button(control_frame, text="⚡ Process All Images", 
+                                      command=self.process_batch,
+                                      font=("Arial", 11, "bold"),
+                                      bg="#27ae60", fg="white",
+                                      padx=20, pady=10,
+                                      cursor="hand2",
+                                      state=tk.DISABLED)
+        process_batch_btn.pack(side=tk.LEFT, padx=5)
+        self.process_batch_btn = process_batch_btn
+        
+        save_batch_btn = tk.Button(control_frame, text="💾 Save All Results", 
+                                   command=self.save_batch_results,
+                                   font=("Arial", 11, "bold"),
+                                   bg="#e67e22", fg="white",
+                                   padx=20, pady=10,
+                                   cursor="hand2",
+                                   state=tk.DISABLED)
+        save_batch_btn.pack(side=tk.LEFT, padx=5)
+        self.save_batch_btn = save_batch_btn
+        
+        pause_batch_btn = tk.Button(control_frame, text="⏸️ Pause", 
+                                    command=self.toggle_pause,
+                                    font=("Arial", 11, "bold"),
+                                    bg="#f39c12", fg="white",
+                                    padx=20, pady=10,
+                                    cursor="hand2",
+                                    state=tk.DISABLED)
+        pause_batch_btn.pack(side=tk.LEFT, padx=5)
+        self.pause_batch_btn = pause_batch_btn
+        
+        retry_batch_btn = tk.Button(control_frame, text="🔁 Retry Failed", 
+                                    command=self.retry_failed,
+                                    font=("Arial", 11, "bold"),
+                                    bg="#16a085", fg="white",
+                                    padx=20, pady=10,
+                                    cursor="hand2",
+                                    state=tk.DISABLED)
+        retry_batch_btn.pack(side=tk.LEFT, padx=5)
+        self.retry_batch_btn = retry_batch_btn
+        
+        remove_duplicates_btn = tk.Button(control_frame, text="🔄 Remove Duplicates", 
+                                         command=self.remove_duplicates,
+                                         font=("Arial", 11, "bold"),
+                                         bg="#9b59b6", fg="white",
+                                         padx=20, pady=10,
+                                         cursor="hand2",
+                                         state=tk.DISABLED)
+        remove_duplicates_btn.pack(side=tk.LEFT, padx=5)
+        self.remove_duplicates_btn = remove_duplicates_btn
+        
+        clear_batch_btn = tk.Button(control_frame, text="🗑️ Clear List", 
+                                    command=self.clear_batch,
+                                    font=("Arial", 11),
+                                    bg="#e74c3c", fg="white",
+                                    padx=20, pady=10,
+                                    cursor="hand2")
+        clear_batch_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Options frame for batch engine settings
+        options_frame = tk.Frame(parent, bg="#f0f0f0")
+        options_frame.pack(fill=tk.X, padx=10)
+        
+        # Number of images OCR'd in parallel
+        workers_label = tk.Label(options_frame, text="Workers:",
+                                 bg="#f0f0f0", font=("Arial", 10))
+        workers_label.pack(side=tk.LEFT)
+        self.workers_var = tk.IntVar(value=default_worker_count())
+        workers_spinbox = tk.Spinbox(options_frame, from_=1, to=64,
+                                     textvariable=self.workers_var,
+                                     width=4, font=("Arial", 10))
+        workers_spinbox.pack(side=tk.LEFT, padx=(5, 15))
+        
+        # Persistent OCR cache, so re-running a folder skips images already read
+        self.use_cache_var = tk.BooleanVar(value=True)
+        use_cache_check = tk.Checkbutton(options_frame, text="Use OCR cache",
+                                         variable=self.use_cache_var,
+                                         bg="#f0f0f0", font=("Arial", 10))
+        use_cache_check.pack(side=tk.LEFT, padx=5)
+        
+        self.refresh_cache_var = tk.BooleanVar(value=False)
+        refresh_cache_check = tk.Checkbutton(options_frame, text="Refresh cache",
+                                             variable=self.refresh_cache_var,
+                                             bg="#f0f0f0", font=("Arial", 10))
+        refresh_cache_check.pack(side=tk.LEFT, padx=5)
+        
+        # Region of interest: OCR the likely overlay area before the full frame
+        roi_label = tk.Label(options_frame, text="OCR region:",
+                             bg="#f0f0f0", font=("Arial", 10))
+        roi_label.pack(side=tk.LEFT, padx=(15, 0))
+        self.roi_var = tk.StringVar(value=ROI_CHOICES[0][0])
+        roi_combo = ttk.Combobox(options_frame, textvariable=self.roi_var,
+                                 values=[label for label, _ in ROI_CHOICES],
+                                 state="readonly", width=22)
+        roi_combo.pack(side=tk.LEFT, padx=5)
+        
+        # EXIF/XMP GPS position: phone photos often carry one, and reading it needs no OCR
+        gps_label = tk.Label(options_frame, text="GPS metadata:",
+                             bg="#f0f0f0", font=("Arial", 10))
+        gps_label.pack(side=tk.LEFT, padx=(15, 0))
+        self.gps_var = tk.StringVar(value=GPS_CHOICES[0][0])
+        gps_combo = ttk.Combobox(options_frame, textvariable=self.gps_var,
+                                 values=[label for label, _ in GPS_CHOICES],
+                                 state="readonly", width=20)
+        gps_combo.pack(side=tk.LEFT, padx=5)
+        
+        # How Tesseract is called; the in-process engine only shows up when installed
+        backend_label = tk.Label(options_frame, text="OCR engine:",
+                                 bg="#f0f0f0", font=("Arial", 10))
+        backend_label.pack(side=tk.LEFT, padx=(15, 0))
+        self.backend_var = tk.StringVar(value=DEFAULT_BACKEND)
+        backend_combo = ttk.Combobox(options_frame, textvariable=self.backend_var,
+                                     values=available_backends() or [DEFAULT_BACKEND],
+                                     state="readonly", width=12)
+        backend_combo.pack(side=tk.LEFT, padx=5)
+        
+        # Preprocessing engine; NumPy only shows up when installed
+        preprocess_label = tk.Label(options_frame, text="Preprocessing:",
+                                    bg="#f0f0f0", font=("Arial", 10))
+        preprocess_label.pack(side=tk.LEFT, padx=(15, 0))
+        self.preprocess_var = tk.StringVar(value=DEFAULT_ENGINE)
+        preprocess_combo = ttk.Combobox(options_frame, textvariable=self.preprocess_var,
+                                        values=available_engines(), state="readonly", width=7)
+        preprocess_combo.pack(side=tk.LEFT, padx=5)
+        
+        coordinate_mode_check = tk.Checkbutton(options_frame, text="Coordinate mode",
+                                               variable=self.coordinate_mode_var,
+                                               bg="#f0f0f0", font=("Arial", 10))
+        coordinate_mode_check.pack(side=tk.LEFT, padx=5)
+        
+        # Burst shots and re-saved copies take the result of the first look-alike
+        self.skip_near_duplicates_var = tk.BooleanVar(value=False)
+        near_duplicates_check = tk.Checkbutton(options_frame, text="Skip near-duplicates",
+                                               variable=self.skip_near_duplicates_var,
+                                               bg="#f0f0f0", font=("Arial", 10))
+        near_duplicates_check.pack(side=tk.LEFT, padx=5)
+        self.near_duplicate_region_var = tk.StringVar(value=NEAR_DUPLICATE_CHOICES[0][0])
+        near_duplicate_region_combo = ttk.Combobox(options_frame, textvariable=self.near_duplicate_region_var,
+                                                   values=[label for label, _ in NEAR_DUPLICATE_CHOICES],
+                                                   state="readonly", width=13)
+        near_duplicate_region_combo.pack(side=tk.LEFT, padx=5)
+        # Differing hash bits (of 64) up to which two images are compared
+        near_duplicate_distance_label = tk.Label(options_frame, text="Distance:",
+                                                 bg="#f0f0f0", font=("Arial", 10))
+        near_duplicate_distance_label.pack(side=tk.LEFT)
+        self.near_duplicate_distance_var = tk.IntVar(value=DEFAULT_MAX_DISTANCE)
+        near_duplicate_distance_spinbox = tk.Spinbox(options_frame, from_=0, to=16,
+                                                     textvariable=self.near_duplicate_distance_var,
+                                                     width=3, font=("Arial", 10))
+        near_duplicate_distance_spinbox.pack(side=tk.LEFT, padx=(5, 15))
+        
+        # Remove Duplicates mode: exact rows, or nearby coordinates from any image
+        self.dedupe_across_images_var = tk.BooleanVar(value=False)
+        dedupe_check = tk.Checkbutton(options_frame, text="Duplicates across images",
+                                      variable=self.dedupe_across_images_var,
+                                      bg="#f0f0f0", font=("Arial", 10))
+        dedupe_check.pack(side=tk.LEFT, padx=(15, 5))
+        
+        # Stream results to a file as they come in; an existing file is resumed
+        output_btn = tk.Button(options_frame, text="📄 Output File...",
+                               command=self.select_output_file,
+                               bg="#607D8B", fg="white",
+                               font=("Arial", 9), padx=8, pady=2)
+        output_btn.pack(side=tk.LEFT, padx=(15, 5))
+        self.output_label = tk.Label(options_frame, text="(none)",
+                                     bg="#f0f0f0", font=("Arial", 9))
+        self.output_label.pack(side=tk.LEFT, padx=5)
+        
+        # Filters for Add Folder, which scans subfolders too
+        folder_frame = tk.Frame(parent, bg="#f0f0f0")
+        folder_frame.pack(fill=tk.X, padx=10, pady=(5, 0))
+        
+        include_label = tk.Label(folder_frame, text="Folder include:",
+                                 bg="#f0f0f0", font=("Arial", 10))
+        include_label.pack(side=tk.LEFT)
+        self.include_var = tk.StringVar(value="")
+        include_entry = tk.Entry(folder_frame, textvariable=self.include_var, width=20)
+        include_entry.pack(side=tk.LEFT, padx=5)
+        
+        exclude_label = tk.Label(folder_frame, text="Exclude:",
+                                 bg="#f0f0f0", font=("Arial", 10))
+        exclude_label.pack(side=tk.LEFT, padx=(15, 0))
+        self.exclude_var = tk.StringVar(value="")
+        exclude_entry = tk.Entry(folder_frame, textvariable=self.exclude_var, width=20)
+        exclude_entry.pack(side=tk.LEFT, padx=5)
+        
+        filter_hint = tk.Label(folder_frame, text="(patterns such as *GPS* or */thumbs/*, separated by spaces)",
+                               bg="#f0f0f0", fg="gray", font=("Arial", 9))
+        filter_hint.pack(side=tk.LEFT, padx=5)
+        
+        # Progress frame
+        progress_frame = tk.Frame(parent, bg="#f0f0f0")
+        progress_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.progress_label = tk.Label(progress_frame, text="", 
+                                       bg="#f0f0f0",
+                                       font=("Arial", 9))
+        self.progress_label.pack(anchor=tk.W)
+        
+        self.progress_bar = ttk.Progressbar(progress_frame, mode='determinate')
+        self.progress_bar.pack(fill=tk.X, pady=5)
+        
+        # Results frame with treeview
+        results_frame = tk.LabelFrame(parent, text="Batch Results", 
+                                      font=("Arial", 11, "bold"),
+                                      bg="#f0f0f0", padx=10, pady=10)
+        results_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        # Filter rows by image name and status
+        filter_frame = tk.Frame(results_frame, bg="#f0f0f0")
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        name_filter_label = tk.Label(filter_frame, text="Image name:",
+                                     bg="#f0f0f0", font=("Arial", 10))
+        name_filter_label.pack(side=tk.LEFT)
+        self.name_filter_var = tk.StringVar(value="")
+        name_filter_entry = tk.Entry(filter_frame, textvariable=self.name_filter_var, width=25)
+        name_filter_entry.pack(side=tk.LEFT, padx=5)
+        
+        status_filter_label = tk.Label(filter_frame, text="Status:",
+                                       bg="#f0f0f0", font=("Arial", 10))
+        status_filter_label.pack(side=tk.LEFT, padx=(15, 0))
+        self.status_filter_var = tk.StringVar(value="All")
+        # The statuses seen so far are listed when the list opens
+        status_filter_combo = ttk.Combobox(filter_frame, textvariable=self.status_filter_var,
+                                           state="readonly", width=20, values=["All"])
+        status_filter_combo.configure(
+            postcommand=lambda: status_filter_combo.configure(values=["All"] + self.batch_rows.status_kinds()))
+        status_filter_combo.pack(side=tk.LEFT, padx=5)
+        
+        self.name_filter_var.trace_add("write", lambda *args: self.apply_batch_filter())
+        self.status_filter_var.trace_add("write", lambda *args: self.apply_batch_filter())
+        
+        sort_hint = tk.Label(filter_frame, text="(click a column heading to sort)",
+                             bg="#f0f0f0", fg="gray", font=("Arial", 9))
+        sort_hint.pack(side=tk.LEFT, padx=5)
+        
+        # Treeview for results; only the rows on screen exist as tree items
+        columns = ("Serial", "Image Name", "Latitude", "Longitude", "Status", "View Image")
+        self.batch_table = ResultsTable(results_frame, self.batch_rows, columns, height=20)
+        self.batch_tree = self.batch_table.tree
+        
+        for col in columns:
+            self.batch_tree.column(col, width=120, anchor=tk.CENTER)
+        
+        self.batch_tree.column("Image Name", width=200)
+        self.batch_tree.column("Status", width=150)
+        self.batch_tree.column("View Image", width=100)
+        
+        # Bind double-click event to view image
+        self.batch_tree.bind("<Double-1>", self.on_tree_double_click)
+        
+        self.batch_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.batch_table.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.batch_table.refresh()
+        
+    def select_image(self):
+        """Open file dialog to select an image"""
+        file_path = filedialog.askopenfilename(
+            title="Select Image",
+            filetypes=IMAGE_FILETYPES
+        )
+        
+        if file_path:
+            self.image_path = file_path
+            self.load_image_preview(file_path)
+            filename = os.path.basename(file_path)
+            self.image_info_label.config(text=f"File: {filename}", fg="black")
+            self.extract_btn.config(state=tk.NORMAL)
+            self.update_status("Image selected. Click 'Extract Coordinates' to proceed.")
+    
+    def load_image_preview(self, image_path):
+        """Load and display image preview"""
+        try:
+            image = Image.open(image_path)
+            # Resize for preview
+            image.thumbnail((350, 300), Image.Resampling.LANCZOS)
+            photo = ImageTk.PhotoImage(image)
+            self.preview_label.config(image=photo, text="")
+            self.preview_label.image = photo  # Keep a reference
+        except Exception as e:
+            self.preview_label.config(image="", text=f"Error loading image:\n{str(e)}")
+    
+    def select_batch_images(self):
+        """Select multiple images for batch processing"""
+        file_paths = filedialog.askopenfilenames(
+            title="Select Multiple Images",
+            filetypes=IMAGE_FILETYPES
+        )
+        
+        if file_paths:
+            # Add new images to existing list (avoid duplicates); every page of a multi-page file is an image
+            new_paths = self.add_batch_paths(list(iter_frames(file_paths)))
+            
+            if new_paths:
+                self.process_batch_btn.config(state=tk.NORMAL)
+                self.update_status(f"Added {len(new_paths)} new image(s). Total: {len(self.image_paths)} image(s) ready for processing.")
+            else:
+                messagebox.showinfo("Info", "All selected images are already in the list.")
+
+    def add_batch_paths(self, paths):
+        """Add images to the batch list, skipping ones already in it; returns the new ones"""
+        new_paths = self.image_paths.add_many(paths)
+        for path in new_paths:
+            # Add to mapping
+            img_name = image_name(path)
+            self.image_paths_dict[img_name] = path
+        if new_paths and self.batch_feed is not None:
+            # A batch is running; queue the new images onto it
+            for path in new_paths:
+                self.batch_feed.put(path)
+        return new_paths
+    
+    def select_batch_folder(self):
+        """Add every image in a folder and its subfolders (scanned in the background)"""
+        if self.scanning:
+            messagebox.showwarning("Warning", "A folder is still being scanned. Please wait.")
+            return
+        folder = filedialog.askdirectory(title="Select Folder of Images")
+        if not folder:
+            return
+        
+        include = self.include_var.get().split() or None
+        exclude = self.exclude_var.get().split() or None
+        self.scanning = True
+        self.update_status(f"Scanning {folder}...")
+        thread = threading.Thread(target=self._scan_folder_worker, args=(folder, include, exclude), daemon=True)
+        thread.start()
+    
+    def _scan_folder_worker(self, folder, include, exclude):
+        """Walk a folder and hand the images found to the main thread in chunks"""
+        chunk = []
+        last_sent = time.monotonic()
+        try:
+            for path in iter_frames(iter_image_paths([folder], recursive=True, include=include, exclude=exclude)):
+                chunk.append(path)
+                # Send often enough that a running batch never waits long for work
+                if len(chunk) >= 500 or time.monotonic() - last_sent >= 0.2:
+                    self.root.after(0, self._add_scanned_paths, chunk)
+                    chunk = []
+                    last_sent = time.monotonic()
+        finally:
+            self.root.after(0, self._add_scanned_paths, chunk, True)
+    
+    def _add_scanned_paths(self, paths, finished=False):
+        """Add a chunk of images from the folder scan"""
+        self.add_batch_paths(paths)
+        if self.image_paths:
+            self.process_batch_btn.config(state=tk.NORMAL if not self.processing else tk.DISABLED)
+        if finished:
+            self.scanning = False
+            if self.batch_feed is not None:
+                self.batch_feed.put(None)
+            self.update_status(f"Folder scan complete. Total: {len(self.image_paths)} image(s) ready for processing.")
+        else:
+            self.update_status(f"Scanning... {len(self.image_paths)} image(s) found so far.")
+    
+    def select_output_file(self):
+        """Choose the file batch results are streamed to"""
+        file_path = filedialog.asksaveasfilename(
+            title="Stream Batch Results To",
+            defaultextension=".txt",
+            confirmoverwrite=False,  # An existing file is resumed, not replaced
+            filetypes=[("Text files", "*.txt"), ("CSV files", "*.csv"), ("JSON Lines", "*.jsonl"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+
+        self.output_path = file_path
+        self.output_label.config(text=os.path.basename(file_path))
+        
+        # Keep the job manifest next to the output so a restarted app can resume
+        self.manifest.close()
+        self.manifest = JobManifest(manifest_path_for(file_path))
+        self.add_batch_paths(record.path for record in self.manifest.records())
+        if self.image_paths:
+            self.process_batch_btn.config(state=tk.NORMAL)
+        self._update_retry_button()
+
+        # Show rows from an earlier (possibly interrupted) run
+        try:
+            existing = ResultSink(file_path, resume=True).load()
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to read output file:\n{str(e)}")
+            return
+        known_names = {result['img_name'] for result in self.all_results}
+        loaded = 0
+        for result in existing:
+            if result['img_name'] in known_names:
+                continue
+            self.all_results.append(result)
+            self._add_batch_result(result['serial'], result['img_name'], result['lat'], result['lon'], "✓ Resumed")
+            loaded += 1
+        if loaded:
+            self.save_batch_btn.config(state=tk.NORMAL)
+            self.remove_duplicates_btn.config(state=tk.NORMAL)
+            self.update_status(f"Loaded {loaded} result(s) from {os.path.basename(file_path)}. Finished images will be skipped.")
+        else:
+            self.update_status(f"Batch results will be streamed to {os.path.basename(file_path)}.")
+
+    def clear_batch(self):
+        """Clear batch processing list"""
+        if self.processing or self.scanning:
+            messagebox.showwarning("Warning", "Please wait for processing or the folder scan to finish.")
+            return
+        self.image_paths = ImageIndex()
+        self.image_paths_dict = {}
+        self.all_results = []
+        self.manifest.close()
+        self.manifest = JobManifest()
+        self.output_path = None
+        self.output_label.config(text="(none)")
+        self.retry_batch_btn.config(state=tk.DISABLED)
+        self.batch_rows.clear()
+        self.batch_table.selected = None
+        self.batch_table.refresh()
+        self.process_batch_btn.config(state=tk.DISABLED)
+        self.save_batch_btn.config(state=tk.DISABLED)
+        self.update_status("Batch list cleared.")
+    
+    def on_tree_double_click(self, event):
+        """Handle double-click on tree item to view image"""
+        row = self.batch_table.selected_row()
+        if row is not None and self.batch_tree.selection():
+            img_name = self.batch_rows.names[row]
+            # Find the image path
+            image_path = self.image_paths_dict.get(img_name)
+            if image_path and os.path.exists(split_frame_item(image_path)[0]):
+                self.view_image(image_path, img_name)
+            else:
+                messagebox.showwarning("Image Not Found", f"Could not find image: {img_name}")
+    
+    def apply_batch_filter(self):
+        """Show only the result rows matching the name and status filters"""
+        status = self.status_filter_var.get()
+        self.batch_rows.set_filter(self.name_filter_var.get(), None if status == "All" else status)
+        self.batch_table.show_selected()
+    
+    def view_image(self, image_path, image_name):
+        """Open image in a new window for verification"""
+        try:
+            # Create new window
+            image_window = tk.Toplevel(self.root)
+            image_window.title(f"View Image: {image_name}")
+            image_window.geometry("800x600")
+            
+            # Load and display image (just the page, for a page of a multi-page file)
+            image = open_frame(*split_frame_item(image_path))
+            
+            # Calculate display size (fit to window)
+            max_width = 750
+            max_height = 550
+            
+            width, height = image.size
+            scale = min(max_width / width, max_height / height, 1.0)
+            new_width = int(width * scale)
+            new_height = int(height * scale)
+            
+            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            photo = ImageTk.PhotoImage(image)
+            
+            # Create frame with scrollbar
+            canvas_frame = tk.Frame(image_window)
+            canvas_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+            
+            canvas = tk.Canvas(canvas_frame, bg="white")
+            canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            
+            # Add scrollbars
+            v_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=canvas.yview)
+            h_scrollbar = ttk.Scrollbar(image_window, orient=tk.HORIZONTAL, command=canvas.xview)
+            
+            canvas.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+            
+            v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+            
+            # Add image to canvas
+            canvas.create_image(0, 0, anchor=tk.NW, image=photo)
+            canvas.image = photo  # Keep a reference
+            
+            # Update scroll region
+            canvas.update_idletasks()
+            canvas.config(scrollregion=canvas.bbox("all"))
+            
+            # Add info label
+            info_label = tk.Label(image_window, 
+                                 text=f"Image: {os.path.basename(image_path)} | Size: {width}x{height}",
+                                 font=("Arial", 9),
+                                 bg="#f0f0f0")
+            info_label.pack(pady=5)
+            
+            # Add close button
+            close_btn = tk.Button(image_window, 
+                                 text="Close", 
+                                 command=image_window.destroy,
+                                 font=("Arial", 10),
+                                 bg="#3498db", fg="white",
+                                 padx=20, pady=5)
+            close_btn.pack(pady=5)
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open image:\n{str(e)}")
+    
+    def preprocess_image(self, image):
+        """Preprocess image to improve OCR accuracy"""
+        return preprocess_image(image)
+    
+    def extract_coordinates(self):
+        """Extract latitude and longitude from image using OCR (threaded)"""
+        if not self.image_path:
+            messagebox.showerror("Error", "Please select an image first.")
+            return
+        
+        if self.processing:
+            messagebox.showwarning("Warning", "Processing already in progress. Please wait.")
+            return
+        
+        # Disable button and set processing flag
+        self.processing = True
+        self.extract_btn.config(state=tk.DISABLED)
+        self.update_status("Processing image with OCR... Please wait.", "info")
+        
+        # Start processing in separate thread
+        cascade = OcrCascade(backend=self.get_ocr_backend(), profile=self.get_ocr_profile(),
+                             preprocess=self.preprocess_var.get())
+        thread = threading.Thread(target=self._extract_coordinates_worker, args=(cascade,), daemon=True)
+        thread.start()
+    
+    def _extract_coordinates_worker(self, cascade=None):
+        """Worker method that runs OCR processing in background thread"""
+        try:
+            # Load image and run the OCR cascade, with the default pass as a last resort
+            with open_image(self.image_path) as original_image:
+                result = run_ocr(original_image, default_pass=True, cascade=cascade)
+            
+            # Update UI in main thread
+            self.root.after(0, self._extract_coordinates_callback, result.coordinates, result.texts,
+                            result.combined_text, result.hit_stage)
+            
+        except Exception as e:
+            error_msg = f"Failed to process image:\n{str(e)}"
+            self.root.after(0, self._extract_coordinates_error_callback, error_msg)
+    
+    def _extract_coordinates_callback(self, unique_coords, all_texts, combined_text, hit_stage=None):
+        """Callback to update UI after processing completes"""
+        self.processing = False
+        self.extract_btn.config(state=tk.NORMAL)
+        
+        if unique_coords:
+            self.extracted_coords = unique_coords
+            self.display_results(unique_coords)
+            self.save_btn.config(state=tk.NORMAL)
+            self.update_status(f"Found {len(unique_coords)} coordinate(s)! (matched on {hit_stage})", "success")
+        else:
+            self.extracted_coords = []
+            self.results_text.delete(1.0, tk.END)
+            self.results_text.insert(tk.END, "No coordinates found in the image.\n\n")
+            self.results_text.insert(tk.END, "=" * 70 + "\n")
+            self.results_text.insert(tk.END, "DEBUG: OCR Text Extracted:\n")
+            self.results_text.insert(tk.END, "=" * 70 + "\n\n")
+            
+            # Show all OCR attempts
+            for i, (text, source) in enumerate(all_texts, 1):
+                self.results_text.insert(tk.END, f"--- Attempt {i} ({source}) ---\n")
+                self.results_text.insert(tk.END, text[:500] + ("..." if len(text) > 500 else "") + "\n\n")
+            
+            if combined_text:
+                self.results_text.insert(tk.END, "--- Combined Text ---\n")
+                self.results_text.insert(tk.END, combined_text[:1000] + ("..." if len(combined_text) > 1000 else "") + "\n\n")
+            
+            self.results_text.insert(tk.END, "=" * 70 + "\n")
+            self.results_text.insert(tk.END, "Tip: Check the OCR text above. If coordinates are visible, the pattern matching may need adjustment.\n")
+            self.save_btn.config(state=tk.DISABLED)
+            self.update_status("No coordinates found. Check OCR text above.", "warning")
+    
+    def _extract_coordinates_error_callback(self, error_msg):
+        """Callback to handle errors"""
+        self.processing = False
+        self.extract_btn.config(state=tk.NORMAL)
+        messagebox.showerror("Error", error_msg)
+        self.update_status("Error occurred", "error")
+    
+    def retry_failed(self):
+        """Run the images that failed or had no coordinates again with the current options"""
+        self.process_batch(retry=True)
+    
+    def process_batch(self, retry=False):
+        """Process all selected images in batch (threaded)"""
+        if not self.image_paths:
+            messagebox.showwarning("Warning", "Please select images first.")
+            return
+        
+        if self.processing:
+            messagebox.showwarning("Warning", "Processing already in progress. Please wait.")
+            return
+        
+        # Disable button and set processing flag
+        self.processing = True
+        self.paused = False
+        self.process_batch_btn.config(state=tk.DISABLED)
+        self.retry_batch_btn.config(state=tk.DISABLED)
+        self.pause_batch_btn.config(state=tk.NORMAL, text="⏸️ Pause")
+        
+        # Don't clear previous results - append to existing
+        # Get current serial number to continue from
+        current_serial = len(self.all_results) if self.all_results else 0
+        
+        # The manifest knows which images are still pending, by full path
+        self.manifest.add(self.image_paths)
+        statuses = RETRY_STATUSES if retry else ("pending",)
+        if retry and not self.skip_near_duplicates_var.get():
+            # With near-duplicate skipping off, a retry OCRs the images that took a look-alike's result
+            statuses += ("duplicate",)
+        unprocessed_paths = [path for path in self.manifest.paths(statuses) if path in self.image_paths]
+        # A folder scan that is still running will feed more images to this batch
+        follow_scan = self.scanning and not retry
+        
+        if not unprocessed_paths and not follow_scan:
+            messagebox.showinfo("Info", "No failed images to retry." if retry else "All images have already been processed.")
+            self.processing = False
+            self.process_batch_btn.config(state=tk.NORMAL)
+            self.pause_batch_btn.config(state=tk.DISABLED)
+            return
+        
+        total_processed = len(self.all_results)
+        total_to_process = len(unprocessed_paths)
+        total = len(self.image_paths)
+        
+        self.progress_bar['maximum'] = total
+        self.progress_bar['value'] = total_processed
+        
+        # Open the output file here so errors are reported before the thread starts
+        sink = None
+        if self.output_path:
+            try:
+                sink = ResultSink(self.output_path, resume=True).open()
+            except OSError as e:
+                messagebox.showerror("Error", f"Failed to open output file:\n{str(e)}")
+                self.processing = False
+                self.process_batch_btn.config(state=tk.NORMAL)
+                self.pause_batch_btn.config(state=tk.DISABLED)
+                return
+            if not retry:
+                unprocessed_paths = [path for path in unprocessed_paths if not self._written_before(path, sink)]
+            current_serial = max(current_serial, sink.last_serial)
+        
+        batch_paths = unprocessed_paths
+        if follow_scan:
+            self.batch_feed = queue.Queue()
+            batch_paths = itertools.chain(unprocessed_paths, self._scanned_batch_paths(self.batch_feed, sink))
+        
+        # Start processing in separate thread with unprocessed paths
+        engine = self.create_batch_engine(sink)
+        self.batch_metrics = engine.metrics
+        self.batch_updates = queue.Queue()
+        thread = threading.Thread(target=self._process_batch_worker, args=(batch_paths, current_serial, total, engine, sink), daemon=True)
+        thread.start()
+        self.root.after(UI_UPDATE_MS, self._apply_batch_updates)
+    
+    def _scanned_batch_paths(self, feed, sink):
+        """Yield images a running folder scan adds, until the scan ends or the batch stops"""
+        while self.processing:
+            try:
+                path = feed.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if path is None:
+                return
+            self.manifest.add([path])
+            if self.manifest.status(path) != "pending" or self._written_before(path, sink):
+                continue
+            yield path
+    
+    def _written_before(self, path, sink):
+        """True if the output file has rows stored under this image's full path, which the manifest is then told about
+        
+        Only JSONL rows carry the path; image names are never matched, as
+        a.jpg and a.png share one. Such rows belong to images that reached
+        the file just before a crash, ahead of their manifest record.
+        """
+        if sink is None or not sink.is_done(path):
+            return False
+        self.manifest.record(path, sink.done_status(path))
+        return True
+    
+    def get_ocr_backend(self):
+        """The OCR backend chosen on the batch tab, created once and then reused"""
+        name = self.backend_var.get()
+        if name not in self.ocr_backends:
+            self.ocr_backends[name] = get_backend(name)
+        return self.ocr_backends[name]
+    
+    def get_ocr_profile(self):
+        """The OCR profile picked by the Coordinate mode option"""
+        return get_profile("coordinates" if self.coordinate_mode_var.get() else "general")
+    
+    def create_batch_engine(self, sink=None):
+        """Build a BatchEngine from the batch tab options; images are marked done once `sink` has their rows on disk"""
+        try:
+            workers = int(self.workers_var.get())
+        except (tk.TclError, ValueError):
+            workers = default_worker_count()
+        
+        if not self.use_cache_var.get():
+            cache_mode = "off"
+        elif self.refresh_cache_var.get():
+            cache_mode = "refresh"
+        else:
+            cache_mode = "use"
+        
+        # Map the OCR region choice to a RoiLocator
+        roi = dict(ROI_CHOICES).get(self.roi_var.get())
+        cascade = OcrCascade(roi=roi, backend=self.get_ocr_backend(), profile=self.get_ocr_profile(),
+                             preprocess=self.preprocess_var.get(),
+                             gps_policy=dict(GPS_CHOICES).get(self.gps_var.get(), "off"))
+        
+        near_duplicates = None
+        if self.skip_near_duplicates_var.get():
+            try:
+                distance = int(self.near_duplicate_distance_var.get())
+            except (tk.TclError, ValueError):
+                distance = DEFAULT_MAX_DISTANCE
+            region = dict(NEAR_DUPLICATE_CHOICES).get(self.near_duplicate_region_var.get(), "overlay")
+            near_duplicates = NearDuplicateIndex(region, distance, roi)
+        
+        return BatchEngine(workers=workers, cascade=cascade, cache=OcrCache(mode=cache_mode), manifest=self.manifest,
+                           near_duplicates=near_duplicates, defer_record=sink.after_flush if sink is not None else None)
+    
+    def _process_batch_worker(self, unprocessed_paths, start_serial, total, engine, sink=None):
+        """Worker method for batch processing"""
+        serial_no = start_serial + 1
+        current_processed = len(self.all_results)
+        updates = self.batch_updates
+        completed = False
+        failure = None
+        
+        try:
+            results = engine.run(unprocessed_paths,
+                                 is_paused=lambda: self.paused,
+                                 is_cancelled=lambda: not self.processing)
+            
+            # Results arrive in input order, so serial numbers stay deterministic
+            # no matter which worker finishes first. The UI changes are queued and
+            # applied by the Tk thread in batches (see _apply_batch_updates)
+            for image_path, coordinates, error in results:
+                current_processed += 1
+                updates.put(("progress", current_processed, total, os.path.basename(image_path)))
+                
+                img_name = image_name(image_path)
+                duplicate_of = engine.duplicates.get(image_path)
+                
+                if error is not None:
+                    updates.put(("row", "-", img_name, None, None, f"✗ Error: {str(error)[:20]}"))
+                    if sink is not None:
+                        sink.write_status(img_name, f"error: {error}", image_path)
+                elif coordinates:
+                    # Update UI in main thread; the best coordinate comes first
+                    for rank, (format_type, lat, lon) in enumerate(coordinates):
+                        result = {
+                            'serial': serial_no,
+                            'img_name': img_name,
+                            'lat': lat,
+                            'lon': lon
+                        }
+                        self.all_results.append(result)
+                        if sink is not None:
+                            sink.write_result(serial_no, img_name, lat, lon, image_path, format_type,
+                                              duplicate_of and duplicate_of[0])
+                        if rank:
+                            status = "✓ Alternate"
+                        elif duplicate_of is not None:
+                            status = f"✓ Duplicate: {image_name(duplicate_of[0])}"
+                        elif format_type in METADATA_FORMATS:
+                            status = f"✓ {format_type}"
+                        else:
+                            status = "✓ Success"
+                        updates.put(("row", serial_no, img_name, lat, lon, status))
+                        serial_no += 1
+                else:
+                    updates.put(("row", "-", img_name, None, None, "✗ No coordinates"))
+                    if sink is not None:
+                        sink.write_status(img_name, "no coordinates", image_path, duplicate_of and duplicate_of[0])
+            
+            # A cancelled batch keeps its rows in the .partial file to resume from
+            completed = self.processing
+        except Exception as e:
+            # e.g. a full disk, a manifest error or a folder that could not be listed
+            failure = e
+        finally:
+            if sink is not None:
+                try:
+                    sink.close(commit=completed)
+                except OSError as e:
+                    failure = failure or e
+            # Finalize in main thread, after the rows queued above; the
+            # buttons come back even when the batch failed
+            updates.put(("complete", total, engine.stats, engine.memory, engine.metrics, failure))
+    
+    def _apply_batch_updates(self):
+        """Apply the batch worker's queued rows and progress, then check again after UI_UPDATE_MS
+        
+        Rows go into the tree in one go and only the latest progress is
+        shown, so the event loop redraws once per tick however fast results come.
+        """
+        rows = []
+        progress = None
+        complete = None
+        with self.batch_metrics.stage("ui update"):
+            while len(rows) < UI_ROWS_PER_TICK:
+                try:
+                    update = self.batch_updates.get_nowait()
+                except queue.Empty:
+                    break
+                if update[0] == "row":
+                    rows.append(update[1:])
+                elif update[0] == "progress":
+                    progress = update[1:]
+                else:
+                    complete = update[1:]
+                    break
+            for row in rows:
+                self._add_batch_result(*row)
+            if progress is not None:
+                self._update_batch_progress(*progress)
+            # Any coordinate found enables Remove Duplicates
+            if any(lat is not None for _, _, lat, _, _ in rows):
+                self.remove_duplicates_btn.config(state=tk.NORMAL)
+        if complete is not None:
+            self._process_batch_complete(*complete)
+        else:
+            self.root.after(UI_UPDATE_MS, self._apply_batch_updates)
+    
+    def _update_batch_progress(self, current, total, filename):
+        """Update progress bar and label"""
+        # A folder scan may still be adding images
+        total = max(total, len(self.image_paths))
+        self.progress_bar['maximum'] = total
+        self.progress_label.config(text=f"Processing {current}/{total}: {filename}")
+        self.progress_bar['value'] = current
+    
+    def _add_batch_result(self, serial_no, img_name, lat, lon, status):
+        """Add result to batch tree"""
+        self.batch_rows.append(serial_no, img_name, lat, lon, status)
+        self.batch_table.refresh_later()
+    
+    def _process_batch_complete(self, total, stats=None, memory=None, metrics=None, failure=None):
+        """Callback when batch processing completes"""
+        self.batch_feed = None
+        total = max(total, len(self.image_paths))
+        self.processing = False
+        self.paused = False
+        self.process_batch_btn.config(state=tk.NORMAL)
+        self.pause_batch_btn.config(state=tk.DISABLED, text="⏸️ Pause")
+        self.remove_duplicates_btn.config(state=tk.NORMAL if self.all_results else tk.DISABLED)
+        completed_text = f"Completed: {len(self.all_results)} coordinates found from {total} images"
+        if stats is not None and stats.images:
+            completed_text += f" ({stats.calls_per_image():.1f} OCR calls per image"
+            if stats.cache_hits:
+                completed_text += f", {stats.cache_hits} from cache"
+            peak = memory.max_peak() if memory is not None else None
+            if peak:
+                completed_text += f", peak memory {format_bytes(peak)}"
+            completed_text += ")"
+        if metrics is not None and metrics.brief():
+            # Where the time went, e.g. "ocr 81%, variant processed 12%, decode 4%"
+            completed_text += f"\nTime: {metrics.brief()}"
+        self.progress_label.config(text=completed_text)
+        self.save_batch_btn.config(state=tk.NORMAL if self.all_results else tk.DISABLED)
+        self._update_retry_button()
+        if failure is not None:
+            self.update_status(f"Batch processing stopped: {failure}", "error")
+            messagebox.showerror("Error", f"Batch processing stopped:\n{failure}")
+            return
+        status = f"Batch processing complete! Found {len(self.all_results)} coordinate(s)."
+        if self.output_path:
+            status += f" Saved to {os.path.basename(self.output_path)}"
+        self.update_status(status, "success")
+    
+    def _update_retry_button(self):
+        """Enable Retry Failed when the manifest has failed or empty images"""
+        counts = self.manifest.counts()
+        failed = sum(counts[status] for status in RETRY_STATUSES)
+        self.retry_batch_btn.config(state=tk.NORMAL if failed and not self.processing else tk.DISABLED,
+                                    text=f"🔁 Retry Failed ({failed})" if failed else "🔁 Retry Failed")
+    
+    def toggle_pause(self):
+        """Toggle pause/resume for batch processing"""
+        if not self.processing:
+            return
+        
+        if self.paused:
+            self.paused = False
+            self.pause_batch_btn.config(text="⏸️ Pause")
+            self.update_status("Processing resumed...", "info")
+        else:
+            self.paused = True
+            self.pause_batch_btn.config(text="▶️ Resume")
+            self.update_status("Processing paused. Click Resume to continue.", "warning")
+    
+    def remove_duplicates(self):
+        """Remove duplicate rows from batch results"""
+        if not self.all_results:
+            messagebox.showwarning("Warning", "No results to check for duplicates.")
+            return
+        
+        if self.dedupe_across_images_var.get():
+            # Any row within tolerance of an earlier row, whichever image it came from
+            deduplicator = CoordinateDeduplicator()
+            unique_results, duplicates = deduplicator.duplicates(
+                self.all_results, key=lambda result: (result['lat'], result['lon']))
+        else:
+            # Find duplicates by checking entire row (serial, img_name, lat, lon)
+            seen = {}
+            duplicates = []
+            unique_results = []
+            
+            for result in self.all_results:
+                # Create a key from all fields
+                key = (result['serial'], result['img_name'], 
+                       round(result['lat'], 6), round(result['lon'], 6))
+                
+                if key in seen:
+                    duplicates.append(result)
+                else:
+                    seen[key] = result
+                    unique_results.append(result)
+        
+        if not duplicates:
+            messagebox.showinfo("No Duplicates", "No duplicate rows found.")
+            return
+        
+        # Show duplicates to user
+        dup_count = len(duplicates)
+        dup_text = f"Found {dup_count} duplicate row(s):\n\n"
+        for i, dup in enumerate(duplicates[:10], 1):  # Show first 10
+            dup_text += f"{i}. Serial: {dup['serial']}, Image: {dup['img_name']}, "
+            dup_text += f"Lat: {dup['lat']:.6f}, Lon: {dup['lon']:.6f}\n"
+        
+        if dup_count > 10:
+            dup_text += f"\n... and {dup_count - 10} more duplicate(s)"
+        
+        dup_text += f"\n\nTotal unique rows: {len(unique_results)}\n"
+        dup_text += f"Total duplicate rows: {dup_count}\n\n"
+        dup_text += "Do you want to remove these duplicates?"
+        
+        # Ask for confirmation
+        response = messagebox.askyesno("Remove Duplicates", dup_text)
+        
+        if response:
+            # Update results
+            self.all_results = unique_results
+            
+            # Update serial numbers to be sequential
+            for idx, result in enumerate(self.all_results, 1):
+                result['serial'] = idx
+            
+            # Rebuild the table once with the renumbered rows; only the
+            # rows on screen are redrawn
+            self.batch_rows.replace(
+                (result['serial'], result['img_name'], result['lat'], result['lon'], "✓ Success")
+                for result in self.all_results)
+            self.batch_table.selected = None
+            self.batch_table.refresh()
+            
+            messagebox.showinfo("Success", f"Removed {dup_count} duplicate row(s).\n{len(unique_results)} unique row(s) remaining.")
+            self.update_status(f"Removed {dup_count} duplicate(s). {len(unique_results)} unique row(s) remaining.", "success")
+    
+    def find_coordinates(self, text):
+        """Find latitude and longitude coordinates in text using various patterns"""
+        return find_coordinates(text)
+    
+    def display_results(self, coordinates):
+        """Display extracted coordinates in the text area"""
+        self.results_text.delete(1.0, tk.END)
+        
+        if not coordinates:
+            self.results_text.insert(tk.END, "No coordinates found.")
+            return
+        
+        self.results_text.insert(tk.END, f"Found {len(coordinates)} coordinate(s):\n\n")
+        
+        for i, (format_type, lat, lon) in enumerate(coordinates, 1):
+            self.results_text.insert(tk.END, f"Coordinate {i} ({format_type}):\n")
+            self.results_text.insert(tk.END, f"  Latitude:  {lat:.6f}\n")
+            self.results_text.insert(tk.END, f"  Longitude: {lon:.6f}\n")
+            self.results_text.insert(tk.END, f"  Format:    {lat:.6f}, {lon:.6f}\n\n")
+    
+    def save_to_file(self):
+        """Save extracted coordinates to a text file"""
+        if not self.extracted_coords:
+            messagebox.showwarning("Warning", "No coordinates to save.")
+            return
+        
+        # Generate default filename with timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        default_filename = f"coordinates_{timestamp}.txt"
+        
+        file_path = filedialog.asksaveasfilename(
+            title="Save Coordinates",
+            defaultextension=".txt",
+            initialfile=default_filename,
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        
+        if file_path:
+            try:
+                # Get image name without extension
+                img_name = os.path.splitext(os.path.basename(self.image_path))[0]
+                
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    # Write header
+                    f.write(CSV_HEADER)
+                    
+                    # Write data rows
+                    for i, (format_type, lat, lon) in enumerate(self.extracted_coords, 1):
+                        f.write(format_row(i, img_name, lat, lon))
+                
+                messagebox.showinfo("Success", f"Coordinates saved to:\n{file_path}")
+                self.update_status(f"Saved to: {os.path.basename(file_path)}", "success")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to save file:\n{str(e)}")
+                self.update_status("Save failed", "error")
+    
+    def save_batch_results(self):
+        """Save all batch processing results to a text file"""
+        if not self.all_results:
+            messagebox.showwarning("Warning", "No results to save.")
+            return
+        
+        # Generate default filename with timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        default_filename = f"batch_coordinates_{timestamp}.txt"
+        
+        file_path = filedialog.asksaveasfilename(
+            title="Save Batch Results",
+            defaultextension=".txt",
+            initialfile=default_filename,
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        
+        if file_path:
+            try:
+                write_results(file_path, self.all_results)
+                
+                messagebox.showinfo("Success", 
+                                  f"Saved {len(self.all_results)} coordinates to:\n{file_path}")
+                self.update_status(f"Batch results saved: {len(self.all_results)} coordinates", "success")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to save file:\n{str(e)}")
+                self.update_status("Save failed", "error")
+    
+    def update_status(self, message, status_type="info"):
+        """Update status bar with message and color"""
+        color_map = {
+            "info": "white",
+            "success": "#2ecc71",
+            "warning": "#f39c12",
+            "error": "#e74c3c"
+        }
+        color = color_map.get(status_type, "white")
+        self.status_label.config(text=message, fg=color)
+
+def main():
+    """Launch the desktop application"""
+    # Check if Tesseract is installed
+    if not tesseract_available():
+        root = tk.Tk()
+        root.withdraw()  # Hide main window
+        messagebox.showerror(
+            "Tesseract OCR Not Found",
+            "Tesseract OCR is not installed or not in PATH.\n\n"
+            "Please install Tesseract OCR:\n"
+            "1. Download from: https://github.com/UB-Mannheim/tesseract/wiki\n"
+            "2. Install it and add to PATH\n"
+            "3. Restart this application"
+        )
+        root.destroy()
+        return
+    
+    root = tk.Tk()
+    app = CoordinateExtractor(root)
+    root.mainloop()
@@ -0,0 +1,165 @@
+"""Turn user-supplied files, folders and glob patterns into image paths"""
+import fnmatch
+import glob
+import os
+
+from PIL import Image
+
+from .manifest import job_key
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.gif')
+
+# Formats that can hold several pages (TIFF) or animation frames (GIF)
+MULTI_FRAME_EXTENSIONS = ('.tiff', '.tif', '.gif')
+
+# One page of a multi-page file as a work item: 'scan.tif#page=3', pages
+# counting from 1. Such items are OCR'd, cached and recorded in the
+# manifest like image files of their own.
+FRAME_MARK = "#page="
+
+# File dialog filter matching IMAGE_EXTENSIONS
+IMAGE_FILETYPES = [
+    ("Image files", "*.png *.jpg *.jpeg *.bmp *.tiff *.tif *.gif"),
+    ("All files", "*.*")
+]
+
+def is_image_file(path):
+    """Check the file extension against the supported image formats"""
+    return os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+
+def frame_item(path, page):
+    """Work item for one page (counting from 1) of a multi-page file"""
+    return f"{path}{FRAME_MARK}{page}"
+
+def split_frame_item(item):
+    """(file path, page) of a work item; page is None for a plain image file"""
+    path, mark, page = item.rpartition(FRAME_MARK)
+    if not mark or not page.isdigit():
+        return item, None
+    return path, int(page)
+
+def image_name(item):
+    """Name of an image in results: the file name without extension, tagged '#page=N' for a page"""
+    path, page = split_frame_item(item)
+    name = os.path.splitext(os.path.basename(path))[0]
+    return name if page is None else f"{name}{FRAME_MARK}{page}"
+
+def _frame_items(path):
+    """The path itself, or one work item per page of a multi-page TIFF or animated GIF"""
+    if os.path.splitext(path)[1].lower() not in MULTI_FRAME_EXTENSIONS:
+        yield path
+        return
+    try:
+        image = Image.open(path)
+    except (OSError, SyntaxError, ValueError):
+        # Unreadable: the worker reports it
+        yield path
+        return
+    with image:
+        # Counted from the page headers; no page is decoded here
+        pages = getattr(image, 'n_frames', 1)
+    if pages <= 1:
+        yield path
+        return
+    for page in range(1, pages + 1):
+        yield frame_item(path, page)
+
+def iter_frames(paths):
+    """Lazily yield the work items for image paths: multi-page files become one item per page"""
+    for path in paths:
+        yield from _frame_items(path)
+
+def matches_patterns(path, patterns):
+    """True if the file name or the full path matches any of the fnmatch patterns"""
+    name = os.path.basename(path)
+    full_path = path.replace(os.sep, '/')
+    return any(fnmatch.fnmatch(name, p) or fnmatch.fnmatch(full_path, p) for p in patterns)
+
+def _walk(folder, recursive):
+    """Yield the files in a folder, sorted per directory, descending lazily"""
+    try:
+        with os.scandir(folder) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return
+    subfolders = []
+    for entry in entries:
+        try:
+            if entry.is_file():
+                yield entry.path
+            elif recursive and entry.is_dir(follow_symlinks=False):
+                subfolders.append(entry.path)
+        except OSError:
+            continue
+    for subfolder in subfolders:
+        yield from _walk(subfolder, recursive)
+
+def iter_image_paths(paths, recursive=False, include=None, exclude=None):
+    """Lazily yield the image files named by files, folders and glob patterns
+
+    Folders yield the images they contain (and those in subfolders when
+    `recursive`); glob patterns such as 'photos/**/*.jpg' are expanded,
+    in file-system order.
+    `include` and `exclude` are fnmatch patterns tested against the file
+    name and the full path. Files named directly are yielded as given.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            candidates = (p for p in _walk(path, recursive) if is_image_file(p))
+        elif glob.has_magic(path):
+            candidates = _expand_glob(path, recursive)
+        else:
+            candidates = (path,)
+        for candidate in candidates:
+            if include and not matches_patterns(candidate, include):
+                continue
+            if exclude and matches_patterns(candidate, exclude):
+                continue
+            yield candidate
+
+def _expand_glob(pattern, recursive):
+    """Images matched by a glob pattern; matched folders are walked as well
+
+    Matches are yielded as the file system lists them, not sorted: sorting
+    would have to finish the whole walk before the first image is OCR'd.
+    """
+    for match in glob.iglob(pattern, recursive=True):
+        if os.path.isdir(match):
+            yield from (p for p in _walk(match, recursive) if is_image_file(p))
+        elif is_image_file(match):
+            yield match
+
+def expand_paths(paths, recursive=False, include=None, exclude=None):
+    """Expand folders and glob patterns to the images they contain; files are kept as given"""
+    return list(iter_image_paths(paths, recursive, include, exclude))
+
+class ImageIndex:
+    """Ordered set of image paths keyed by full path, for O(1) duplicate checks"""
+
+    def __init__(self, paths=()):
+        self._paths = {}
+        self.add_many(paths)
+
+    def add(self, path):
+        """Add a path; returns False if it was already present"""
+        key = job_key(path)
+        if key in self._paths:
+            return False
+        self._paths[key] = path
+        return True
+
+    def add_many(self, paths):
+        """Add paths and return the ones that were new"""
+        return [path for path in paths if self.add(path)]
+
+    def clear(self):
+        self._paths.clear()
+
+    def __contains__(self, path):
+        return job_key(path) in self._paths
+
+    def __iter__(self):
+        return iter(list(self._paths.values()))
+
+    def __len__(self):
+        return len(self._paths)
@@ -0,0 +1,166 @@
+"""Persistent job manifest: the status of every image in a batch, so runs can be resumed"""
+import collections
+import os
+import sqlite3
+import threading
+import time
+
+# pending: not run yet; success: produced coordinates; no-coords: OCR ran but
+# matched nothing; error: the image could not be read or OCR'd; duplicate:
+# took the result of a near-duplicate image earlier in the batch
+JOB_STATUSES = ("pending", "success", "no-coords", "error", "duplicate")
+
+# Statuses worth another attempt with a different OCR profile
+RETRY_STATUSES = ("no-coords", "error")
+
+JobRecord = collections.namedtuple('JobRecord', ['path', 'status', 'attempts', 'coordinates', 'profile',
+                                                 'error', 'seconds', 'updated'])
+
+def job_status(coordinates, error):
+    """Manifest status for one image's outcome"""
+    if error is not None:
+        return "error"
+    return "success" if coordinates else "no-coords"
+
+def manifest_path_for(output_path):
+    """Manifest file kept next to a batch output file"""
+    return output_path + '.jobs.sqlite3'
+
+def job_key(image_path):
+    """Identity of an image in the manifest: its full path, so a.jpg and a.png stay apart"""
+    return os.path.normcase(os.path.abspath(image_path))
+
+class JobManifest:
+    """SQLite-backed record of each input image's status, attempts and timing
+
+    Images are keyed by full path. `path=None` keeps the manifest in memory
+    for the length of a session. Safe to share between threads.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path or ":memory:", timeout=30, check_same_thread=False)
+        if path is not None:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                key TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                coordinates INTEGER NOT NULL DEFAULT 0,
+                profile TEXT,
+                error TEXT,
+                seconds REAL,
+                updated REAL
+            )""")
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add(self, image_paths):
+        """Register images as pending; images already in the manifest keep their status"""
+        rows = [(job_key(p), p, time.time()) for p in image_paths]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (key, path, status, updated) VALUES (?, ?, 'pending', ?)", rows)
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def record(self, image_path, status, seconds=None, coordinates=0, error=None, profile=None):
+        """Store the outcome of one attempt at an image"""
+        if status not in JOB_STATUSES:
+            raise ValueError(f"Unknown job status '{status}' (expected one of: {', '.join(JOB_STATUSES)})")
+        error_text = str(error) if error is not None else None
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO jobs (key, path, status, attempts, coordinates, profile, error, seconds, updated)
+                VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    status = excluded.status, attempts = attempts + 1,
+                    coordinates = excluded.coordinates, profile = excluded.profile,
+                    error = excluded.error, seconds = excluded.seconds, updated = excluded.updated""",
+                (job_key(image_path), image_path, status, coordinates, profile, error_text, seconds, time.time()))
+            self._conn.commit()
+
+    def get(self, image_path):
+        """JobRecord for an image, or None if it is not in the manifest"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, status, attempts, coordinates, profile, error, seconds, updated "
+                "FROM jobs WHERE key = ?", (job_key(image_path),)).fetchone()
+        return JobRecord(*row) if row else None
+
+    def status(self, image_path):
+        """Status of an image, or None if it is not in the manifest"""
+        record = self.get(image_path)
+        return record.status if record else None
+
+    def paths(self, statuses=("pending",)):
+        """Paths of the images with one of the given statuses, in the order they were added"""
+        statuses = tuple(statuses)
+        marks = ", ".join("?" * len(statuses))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT path FROM jobs WHERE status IN ({marks}) ORDER BY rowid", statuses).fetchall()
+        return [row[0] for row in rows]
+
+    def select(self, image_paths, statuses=("pending",), chunk_size=64):
+        """Register paths from a (possibly lazy) iterable and yield those with one of the given statuses
+
+        Paths are handled in small chunks, so the first ones are yielded
+        while a directory walk feeding the iterable is still running.
+        """
+        statuses = tuple(statuses)
+        chunk = []
+        for path in image_paths:
+            chunk.append(path)
+            if len(chunk) >= chunk_size:
+                yield from self._select_chunk(chunk, statuses)
+                chunk = []
+        if chunk:
+            yield from self._select_chunk(chunk, statuses)
+
+    def _select_chunk(self, image_paths, statuses):
+        """Paths of one chunk whose status is wanted, in the order given"""
+        self.add(image_paths)
+        keys = [job_key(p) for p in image_paths]
+        marks = ", ".join("?" * len(keys))
+        with self._lock:
+            found = dict(self._conn.execute(
+                f"SELECT key, status FROM jobs WHERE key IN ({marks})", keys).fetchall())
+        return [path for path, key in zip(image_paths, keys) if found.get(key) in statuses]
+
+    def records(self):
+        """Every JobRecord, in the order the images were added"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, status, attempts, coordinates, profile, error, seconds, updated "
+                "FROM jobs ORDER BY rowid").fetchall()
+        return [JobRecord(*row) for row in rows]
+
+    def counts(self):
+        """Counter of images per status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return collections.Counter(dict(rows))
+
+    def summary(self):
+        """One-line report of the images per status"""
+        counts = self.counts()
+        return ", ".join(f"{status}: {counts[status]}" for status in JOB_STATUSES if counts[status])
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
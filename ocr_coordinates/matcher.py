@@ -0,0 +1,182 @@
+"""Regex patterns that pull latitude/longitude pairs out of OCR text"""
+import re
+from collections import namedtuple
+
+from .dedup import dedupe_coordinates
+
+# One coordinate found in OCR text; unpacks like the old (format, lat, lon) tuples
+Coordinate = namedtuple('Coordinate', ['format_type', 'lat', 'lon'])
+
+# All patterns are compiled once at import; find_coordinates runs on every
+# OCR pass and again on the combined text, so this adds up over a batch.
+
+# Pattern 1: "Lat X° Long Y°" format - Handle same line and multi-line
+# Handle variations: Lat/Latitude, Long/Longitude/Lon/Lng, with/without degree symbol
+LAT_LONG_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    # "Lat 30.045977° Long 73.604948°" - same line
+    r'(?:Lat|Latitude|Lal)[:\s]*(\d+\.\d+)[°\s]*(?:Long|Longitude|Lon|Lng|L0ng)[:\s]*(\d+\.\d+)',
+    # "Lat: 30.045977 Long: 73.604948" - same line
+    r'(?:Lat|Latitude)[:\s]+(\d+\.\d+)[\s]+(?:Long|Longitude|Lon|Lng)[:\s]+(\d+\.\d+)',
+    # "Latitude 30.045977 Longitude 73.604948" - same line
+    r'(?:Lat|Latitude)[\s]+(\d+\.\d+)[\s]+(?:Long|Longitude|Lon|Lng)[\s]+(\d+\.\d+)',
+    # More flexible - any text between numbers
+    r'[Ll][Aa][Tt][:\s]*(\d+\.\d+)[°\s]*[Ll][Oo0][Nn][Gg][:\s]*(\d+\.\d+)',
+)]
+
+# Pattern 1b: Multi-line format - "Lat X°" on one line, "Long Y°" on next line
+LAT_PATTERN = re.compile(r'(?:Lat|Latitude|Lal)[:\s]*(\d+\.\d+)[°\s]*', re.IGNORECASE)
+LON_PATTERN = re.compile(r'(?:Long|Longitude|Lon|Lng|L0ng)[:\s]*(\d+\.\d+)[°\s]*', re.IGNORECASE)
+
+# How far after a Lat value to look for the Long value
+MULTILINE_WINDOW = 200
+NORMALIZED_WINDOW = 100
+
+# Pattern 2: "Latitude: X, Longitude: Y" or "Lat: X, Lon: Y"
+LABELED_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(?:Latitude|Lat)[:\s]+(-?\d+\.?\d*)[,\s]+(?:Longitude|Long|Lon|Lng)[:\s]+(-?\d+\.?\d*)',
+    r'(?:Latitude|Lat)[:\s]+(-?\d+\.?\d*)[\s]+(?:Longitude|Long|Lon|Lng)[:\s]+(-?\d+\.?\d*)',
+)]
+
+# Pattern 3: Look for pairs of decimal numbers that look like coordinates
+# Format: number with 4+ decimal places (typical for GPS coordinates).
+# The old "Pattern 6" fallback was identical to the first entry and could
+# only ever produce duplicates, so it is gone.
+COORD_PAIR_PATTERNS = [re.compile(pattern) for pattern in (
+    r'(\d{1,2}\.\d{4,})\s+(\d{1,3}\.\d{4,})',  # Two numbers with 4+ decimals
+    r'(\d{1,2}\.\d{3,})[,\s]+(\d{1,3}\.\d{3,})',  # With comma
+    r'(-?\d{1,2}\.\d{4,})[,\s]+(-?\d{1,3}\.\d{4,})',  # With negatives
+)]
+
+# Pattern 4: Decimal degrees separated by comma/space
+DECIMAL_PATTERN = re.compile(r'(-?\d{1,2}\.\d{3,})[,\s]+(-?\d{1,3}\.\d{3,})')
+
+# Pattern 5: Degrees, minutes, seconds (e.g., 40°42'46"N 74°00'22"W)
+DMS_PATTERN = re.compile(r'(\d+)[°\s]+(\d+)[\'\s]+(\d+)[\"\s]*([NS])\s+(\d+)[°\s]+(\d+)[\'\s]+(\d+)[\"\s]*([EW])', re.IGNORECASE)
+
+# Pattern 6: Degrees and decimal minutes (e.g., 40°42.767'N 74°00.367'W)
+DDM_PATTERN = re.compile(r'(\d+)[°\s]+(\d+\.\d+)[\'\s]*([NS])\s+(\d+)[°\s]+(\d+\.\d+)[\'\s]*([EW])', re.IGNORECASE)
+
+WHITESPACE = re.compile(r'\s+')
+DIGIT = re.compile(r'\d')
+
+def _in_range(lat, lon):
+    """Check latitude/longitude bounds"""
+    return -90 <= lat <= 90 and -180 <= lon <= 180
+
+def find_coordinates(text):
+    """Find latitude and longitude coordinates in text using various patterns"""
+    coordinates = []
+    
+    # Every pattern needs digits; most OCR passes over photos have none
+    if not DIGIT.search(text):
+        return coordinates
+    
+    # Every labeled pattern needs "la" (Lat/Latitude/Lal) and every decimal
+    # pattern needs a '.', so whole groups can be skipped cheaply
+    has_label = 'la' in text.lower()
+    has_decimal = '.' in text
+    
+    # Replace newlines with spaces for easier matching
+    text_normalized = WHITESPACE.sub(' ', text) if has_label and has_decimal else None
+    
+    if has_label and has_decimal:
+        # Pattern 1: "Lat X° Long Y°"
+        for pattern in LAT_LONG_PATTERNS:
+            for match in pattern.findall(text_normalized):
+                try:
+                    lat, lon = float(match[0]), float(match[1])
+                    if _in_range(lat, lon):
+                        coordinates.append(Coordinate("Lat/Long", lat, lon))
+                except:
+                    pass
+        
+        # Pattern 1b: "Lat X°" on one line, "Long Y°" within the next 200
+        # characters, then the same on normalized text (spaces instead of
+        # newlines) within 100. search(pos, endpos) scans in place instead of
+        # slicing the text for every Lat hit.
+        for source, format_type, window in ((text, "Lat/Long (multi-line)", MULTILINE_WINDOW),
+                                            (text_normalized, "Lat/Long (normalized)", NORMALIZED_WINDOW)):
+            for lat_match in LAT_PATTERN.finditer(source):
+                lat_value = float(lat_match.group(1))
+                lat_end = lat_match.end()
+                lon_match = LON_PATTERN.search(source, lat_end, lat_end + window)
+                if lon_match:
+                    lon_value = float(lon_match.group(1))
+                    if _in_range(lat_value, lon_value):
+                        coordinates.append(Coordinate(format_type, lat_value, lon_value))
+    
+    if has_label:
+        # Pattern 2: "Latitude: X, Longitude: Y" or "Lat: X, Lon: Y"
+        for pattern in LABELED_PATTERNS:
+            for match in pattern.findall(text):
+                try:
+                    lat, lon = float(match[0]), float(match[1])
+                    if _in_range(lat, lon):
+                        coordinates.append(Coordinate("Labeled", lat, lon))
+                except:
+                    pass
+    
+    if has_decimal:
+        # Pattern 3: any two decimal numbers near each other
+        for pattern in COORD_PAIR_PATTERNS:
+            for match in pattern.findall(text):
+                try:
+                    num1, num2 = float(match[0]), float(match[1])
+                    # Try both orders
+                    for lat, lon in [(num1, num2), (num2, num1)]:
+                        if _in_range(lat, lon):
+                            coordinates.append(Coordinate("Auto-detected", lat, lon))
+                            break
+                except:
+                    pass
+        
+        # Pattern 4: Decimal degrees separated by comma/space
+        for match in DECIMAL_PATTERN.findall(text):
+            try:
+                lat, lon = float(match[0]), float(match[1])
+                if _in_range(lat, lon):
+                    coordinates.append(Coordinate("Decimal", lat, lon))
+            except:
+                pass
+    
+    # Pattern 5: Degrees, minutes, seconds
+    for match in DMS_PATTERN.findall(text):
+        try:
+            lat_d, lat_m, lat_s, lat_dir = int(match[0]), int(match[1]), int(match[2]), match[3].upper()
+            lon_d, lon_m, lon_s, lon_dir = int(match[4]), int(match[5]), int(match[6]), match[7].upper()
+            
+            lat = lat_d + lat_m/60 + lat_s/3600
+            if lat_dir == 'S':
+                lat = -lat
+            
+            lon = lon_d + lon_m/60 + lon_s/3600
+            if lon_dir == 'W':
+                lon = -lon
+            
+            if _in_range(lat, lon):
+                coordinates.append(Coordinate("DMS", lat, lon))
+        except:
+            pass
+    
+    # Pattern 6: Degrees and decimal minutes
+    if has_decimal:
+        for match in DDM_PATTERN.findall(text):
+            try:
+                lat_d, lat_m, lat_dir = int(match[0]), float(match[1]), match[2].upper()
+                lon_d, lon_m, lon_dir = int(match[3]), float(match[4]), match[5].upper()
+                
+                lat = lat_d + lat_m/60
+                if lat_dir == 'S':
+                    lat = -lat
+                
+                lon = lon_d + lon_m/60
+                if lon_dir == 'W':
+                    lon = -lon
+                
+                if _in_range(lat, lon):
+                    coordinates.append(Coordinate("DDM", lat, lon))
+            except:
+                pass
+    
+    # Remove duplicates (same coordinates within small tolerance)
+    return dedupe_coordinates(coordinates)
@@ -0,0 +1,78 @@
+"""Peak memory use of OCR workers"""
+import os
+import sys
+import threading
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None where it cannot be read"""
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux and the BSDs kilobytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def worker_peak_rss():
+    """(process id, peak RSS in bytes) of the calling worker"""
+    return os.getpid(), peak_rss()
+
+def format_bytes(size):
+    """Human readable size, e.g. '182.4 MB'"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024.0
+    return f"{size:.2f} GB"
+
+class MemoryStats:
+    """Thread-safe record of the highest peak RSS reported by each worker process
+
+    Thread workers share one process, so a thread pool shows up as a single
+    entry; with a process pool every worker process has its own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.peaks = {}
+
+    def record(self, pid, peak):
+        """Note a worker's peak RSS (None is ignored)"""
+        if peak is None:
+            return
+        with self._lock:
+            self.peaks[pid] = max(peak, self.peaks.get(pid, 0))
+
+    def max_peak(self):
+        """Highest peak RSS of any worker, or None if nothing was recorded"""
+        with self._lock:
+            return max(self.peaks.values()) if self.peaks else None
+
+    def summary(self):
+        """One-line report, e.g. 'Peak memory: 182.4 MB'"""
+        with self._lock:
+            peaks = list(self.peaks.values())
+        if not peaks:
+            return "Peak memory: unknown"
+        if len(peaks) == 1:
+            return f"Peak memory: {format_bytes(peaks[0])}"
+        mean = sum(peaks) / len(peaks)
+        return (f"Peak memory per worker process: max {format_bytes(max(peaks))}, "
+                f"mean {format_bytes(mean)} ({len(peaks)} processes)")
@@ -0,0 +1,135 @@
+"""GPS position stored in an image's metadata: the EXIF GPSInfo block or XMP
+
+Phones and most cameras write the position they had when the photo was
+taken. Pillow parses both blocks when the file is opened, so reading them
+costs no decoding of pixels. (PNG EXIF stored after the pixels is not
+read for that reason.)
+
+What a batch does with the position is its GPS policy:
+
+- "off": ignore metadata and OCR every image
+- "skip": use the metadata position and skip OCR for images that have one
+- "cross-check": OCR every image too; the metadata position comes first,
+  OCR readings of the same point count as agreeing with it and other
+  points are kept as alternates
+"""
+import math
+import re
+
+from .matcher import Coordinate
+from .scoring import Candidate
+
+GPS_POLICIES = ("off", "skip", "cross-check")
+
+# format_type of coordinates read from metadata
+EXIF_FORMAT = "EXIF GPS"
+XMP_FORMAT = "XMP GPS"
+METADATA_FORMATS = frozenset((EXIF_FORMAT, XMP_FORMAT))
+
+# Score of a metadata position: above anything read by OCR (see scoring.score)
+METADATA_SCORE = 1.0
+
+# EXIF tags: the GPS IFD, and in it the status and the position
+GPS_IFD = 0x8825
+GPS_LATITUDE_REF, GPS_LATITUDE = 1, 2
+GPS_LONGITUDE_REF, GPS_LONGITUDE = 3, 4
+GPS_STATUS = 9
+
+# XMP attribute or element, e.g. exif:GPSLatitude="37,46.1234N"
+XMP_VALUE = r'exif:{0}\s*=\s*"([^"]*)"|<exif:{0}>([^<]*)</exif:{0}>'
+
+def coordinate_origin(format_type):
+    """Where a coordinate came from: 'exif', 'xmp' or 'ocr'"""
+    if format_type == EXIF_FORMAT:
+        return "exif"
+    if format_type == XMP_FORMAT:
+        return "xmp"
+    return "ocr"
+
+def dms_to_decimal(values, ref):
+    """Degrees, minutes, seconds (EXIF rationals or numbers) and 'N'/'S'/'E'/'W' to signed degrees, or None"""
+    if not isinstance(values, (tuple, list)):
+        values = (values,)
+    try:
+        # A zero denominator comes out as NaN, which the checks below reject
+        parts = [float(value) for value in values[:3]]
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    if not parts or any(math.isnan(part) for part in parts) or any(part < 0 for part in parts[1:]):
+        return None
+    # Some writers sign the degrees instead of giving a reference letter
+    sign = -1 if parts[0] < 0 else 1
+    degrees = abs(parts[0]) + sum(part / 60 ** i for i, part in enumerate(parts[1:], 1))
+    if isinstance(ref, bytes):
+        ref = ref.decode('ascii', 'replace')
+    ref = str(ref or "").strip('\x00 ').upper()
+    return -degrees if ref in ("S", "W") else sign * degrees
+
+def _valid(lat, lon):
+    """Whether a position is on the globe and not the 0, 0 some phones write without a fix"""
+    return (lat is not None and lon is not None and abs(lat) <= 90 and abs(lon) <= 180
+            and (lat, lon) != (0.0, 0.0))
+
+def exif_gps(image):
+    """Coordinate from the EXIF GPSInfo block of an opened image, or None"""
+    if image.format == 'PNG' and 'exif' not in image.info:
+        return None  # getexif() would decode the pixels to look for it
+    try:
+        gps = image.getexif().get_ifd(GPS_IFD)
+    except Exception:
+        return None
+    if not gps or GPS_LATITUDE not in gps or GPS_LONGITUDE not in gps:
+        return None
+    status = gps.get(GPS_STATUS)
+    if isinstance(status, bytes):
+        status = status.decode('ascii', 'replace')
+    if str(status or "").strip('\x00 ').upper() == "V":
+        return None  # Void: the receiver had no fix
+    lat = dms_to_decimal(gps[GPS_LATITUDE], gps.get(GPS_LATITUDE_REF))
+    lon = dms_to_decimal(gps[GPS_LONGITUDE], gps.get(GPS_LONGITUDE_REF))
+    if not _valid(lat, lon):
+        return None
+    return Coordinate(EXIF_FORMAT, lat, lon)
+
+def _xmp_packet(image):
+    """The XMP packet of an opened image as text, or ''"""
+    packet = image.info.get('xmp') or image.info.get('XML:com.adobe.xmp')
+    if packet is None and hasattr(image, 'tag_v2'):
+        packet = image.tag_v2.get(700)  # TIFF XMLPacket
+    if isinstance(packet, (bytes, bytearray)):
+        packet = bytes(packet).decode('utf-8', 'replace')
+    return packet or ""
+
+def _xmp_value(packet, name):
+    """Degrees from an XMP GPS value such as '37,46.1234N' or '37,46,7.4N', or None"""
+    match = re.search(XMP_VALUE.format(name), packet)
+    if match is None:
+        return None
+    value = (match.group(1) or match.group(2) or "").strip()
+    if not value:
+        return None
+    ref = value[-1] if value[-1].upper() in "NSEW" else ""
+    try:
+        parts = [float(part) for part in value.rstrip("NSEWnsew").split(',')]
+    except ValueError:
+        return None
+    return dms_to_decimal(parts, ref)
+
+def xmp_gps(image):
+    """Coordinate from the exif:GPSLatitude/GPSLongitude XMP properties, or None"""
+    packet = _xmp_packet(image)
+    if 'GPSLatitude' not in packet:
+        return None
+    lat = _xmp_value(packet, "GPSLatitude")
+    lon = _xmp_value(packet, "GPSLongitude")
+    if not _valid(lat, lon):
+        return None
+    return Coordinate(XMP_FORMAT, lat, lon)
+
+def read_gps(image):
+    """The GPS position in an opened (not necessarily loaded) image's metadata, EXIF first; or None"""
+    return exif_gps(image) or xmp_gps(image)
+
+def metadata_candidate(coordinate, votes=1):
+    """Candidate for a metadata position"""
+    return Candidate(coordinate.format_type, coordinate.lat, coordinate.lon, METADATA_SCORE, None, votes)
@@ -0,0 +1,173 @@
+"""Per-stage timing of the OCR pipeline: wall and CPU time, call and event counts
+
+Stages are named after what they do: "read", "decode", "cache lookup",
+"roi", "variant processed", "ocr Processed PSM6", "match", "ui update", ...
+Recording one costs two clock reads and a dict update, so the metrics stay
+on for every batch. CPU time is that of the recording thread: it includes
+in-process OCR (tesserocr) but not the tesseract program pytesseract starts.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+
+# Prometheus metric name prefix
+PROMETHEUS_PREFIX = "ocr_coordinates"
+
+class Metrics:
+    """Thread-safe totals per stage plus event counters
+
+    A worker fills one Metrics per image and hands it back with the
+    result; BatchEngine merges those into its own, so nothing is shared
+    between workers (or processes) while an image is being OCR'd.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}  # name -> [calls, wall seconds, cpu seconds, slowest call]
+        self.counters = {}  # name -> count
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add(self, stage, wall, cpu=0.0, calls=1):
+        """Add time spent in a stage"""
+        with self._lock:
+            totals = self.stages.get(stage)
+            if totals is None:
+                self.stages[stage] = [calls, wall, cpu, wall]
+            else:
+                totals[0] += calls
+                totals[1] += wall
+                totals[2] += cpu
+                if wall > totals[3]:
+                    totals[3] = wall
+
+    @contextlib.contextmanager
+    def stage(self, stage):
+        """Time the body of a with-block as one call of `stage`"""
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def count(self, counter, n=1):
+        """Increase an event counter, e.g. 'tesseract calls' or 'cache hits'"""
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def merge(self, other):
+        """Add another Metrics' totals to these"""
+        with other._lock:
+            stages = {name: list(totals) for name, totals in other.stages.items()}
+            counters = dict(other.counters)
+        with self._lock:
+            for name, (calls, wall, cpu, slowest) in stages.items():
+                totals = self.stages.get(name)
+                if totals is None:
+                    self.stages[name] = [calls, wall, cpu, slowest]
+                else:
+                    totals[0] += calls
+                    totals[1] += wall
+                    totals[2] += cpu
+                    totals[3] = max(totals[3], slowest)
+            for name, n in counters.items():
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        """Plain copy of the totals: {'stages': {...}, 'counters': {...}}"""
+        with self._lock:
+            return {
+                'stages': {name: {'calls': calls, 'wall_seconds': wall, 'cpu_seconds': cpu, 'max_seconds': slowest}
+                           for name, (calls, wall, cpu, slowest) in self.stages.items()},
+                'counters': dict(self.counters),
+            }
+
+    def cache_hit_rate(self):
+        """Share of cache lookups that hit, or None without lookups"""
+        with self._lock:
+            hits = self.counters.get('cache hits', 0)
+            lookups = hits + self.counters.get('cache misses', 0)
+        return hits / lookups if lookups else None
+
+    def brief(self, top=3):
+        """Where the time went in a few words, e.g. 'ocr 81%, variant processed 12%, decode 4%'"""
+        snapshot = self.snapshot()['stages']
+        # All OCR passes together; the full summary lists them one by one
+        groups = {}
+        for name, totals in snapshot.items():
+            group = "ocr" if name.startswith("ocr ") else name
+            groups[group] = groups.get(group, 0.0) + totals['wall_seconds']
+        total = sum(groups.values())
+        if not total:
+            return ""
+        ranked = sorted(groups.items(), key=lambda item: -item[1])[:top]
+        return ", ".join(f"{name} {100.0 * wall / total:.0f}%" for name, wall in ranked)
+
+    def summary(self):
+        """Multi-line text report, slowest stages first"""
+        snapshot = self.snapshot()
+        stages = snapshot['stages']
+        total = sum(totals['wall_seconds'] for totals in stages.values()) or 1.0
+        lines = []
+        for name, totals in sorted(stages.items(), key=lambda item: -item[1]['wall_seconds']):
+            calls = totals['calls']
+            lines.append(f"  {name}: {totals['wall_seconds']:.2f}s wall ({100.0 * totals['wall_seconds'] / total:.1f}%), "
+                         f"{totals['cpu_seconds']:.2f}s CPU, {calls} call(s), "
+                         f"{1000.0 * totals['wall_seconds'] / calls:.1f} ms mean, "
+                         f"{1000.0 * totals['max_seconds']:.1f} ms max")
+        counters = snapshot['counters']
+        if counters:
+            lines.append("  " + ", ".join(f"{name}: {n}" for name, n in sorted(counters.items())))
+        hit_rate = self.cache_hit_rate()
+        if hit_rate is not None:
+            lines.append(f"  cache hit rate: {100.0 * hit_rate:.1f}%")
+        return "\n".join(lines)
+
+    def to_prometheus(self):
+        """The totals in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        for metric, key, help_text in (
+                ("stage_seconds_total", 'wall_seconds', "Wall-clock seconds spent in each pipeline stage"),
+                ("stage_cpu_seconds_total", 'cpu_seconds', "CPU seconds of the recording thread in each stage"),
+                ("stage_calls_total", 'calls', "Times each pipeline stage ran")):
+            name = f"{PROMETHEUS_PREFIX}_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for stage, totals in sorted(snapshot['stages'].items()):
+                lines.append(f'{name}{{stage="{_label(stage)}"}} {totals[key]}')
+        name = f"{PROMETHEUS_PREFIX}_events_total"
+        lines.append(f"# HELP {name} Pipeline events such as images, Tesseract calls and cache hits")
+        lines.append(f"# TYPE {name} counter")
+        for counter, n in sorted(snapshot['counters'].items()):
+            lines.append(f'{name}{{event="{_label(counter)}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Export to `path`: JSON for .json files, the Prometheus text format otherwise
+
+        The file is replaced atomically, as the node_exporter textfile
+        collector expects.
+        """
+        if path.lower().endswith('.json'):
+            content = json.dumps(self.snapshot(), indent=2, sort_keys=True)
+        else:
+            content = self.to_prometheus()
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+def _label(value):
+    """Escape a Prometheus label value"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
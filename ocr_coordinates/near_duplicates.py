@@ -0,0 +1,211 @@
+"""Near-duplicate images in a batch: perceptual hashes and a BK-tree to look them up
+
+Burst shots, re-saved copies and re-exported screenshots differ byte for
+byte but look the same. A difference hash (dHash) captures how an image
+looks: the image is shrunk to 9x8 gray pixels and every bit says whether
+a pixel is brighter than its right-hand neighbour. Images whose hashes
+differ in at most a few of the 64 bits are near-duplicates, and the batch
+engine hands them the OCR result of the first one instead of OCR'ing them
+again.
+
+The hash can cover the overlay band the coordinates are stamped in (the
+default), or the whole frame. The overlay band is hashed at 17x4 pixels,
+so the text layout gets more bits than the height.
+
+A 64-bit hash cannot tell one digit from another: photos of the same site
+whose stamps differ in a few digits hash alike. So a hash match is only a
+candidate. Its stamp is then compared with the earlier image's, block by
+block at a scale where the text is legible, and only images whose stamps
+match in every block count as near-duplicates. Both files are read again
+for this, so no pixels are kept per image.
+"""
+from PIL import Image, ImageChops, ImageOps
+
+from .roi import BUILTIN_TEMPLATES, template_box
+
+# What is hashed: the whole image, or the overlay band (the cascade's
+# first ROI crop, or the bottom quarter)
+HASH_REGIONS = ("frame", "overlay")
+
+# Differing bits (of 64) up to which two images are compared as candidates
+DEFAULT_MAX_DISTANCE = 3
+
+# Height in pixels the overlay band is compared at, and the blocks it is
+# split into (band height / block size); overlay text is then ~30 pixels
+# tall and a block about a character
+STAMP_HEIGHT = 320
+STAMP_BLOCKS = 24
+
+# Largest mean gray difference (0-255) of any block between the stamps of
+# near-duplicates: re-encoded and brightened copies of synthetic photos
+# stay below 30, stamps differing in one digit reach 45 and more
+DEFAULT_STAMP_TOLERANCE = 36
+
+# Size the JPEG decoder is asked to scale down to when hashing a file; the
+# draft is at least this big, so the hash is taken from a 1/8-scale decode
+DRAFT_SIZE = (128, 128)
+
+def dhash(image, box=None, width=8, height=8):
+    """Difference hash of an image (or of a pixel box in it) as a width*height-bit int"""
+    if box is not None:
+        image = image.crop(box)
+    # Shrinking before the gray conversion keeps this cheap on large images
+    small = image.resize((width + 1, height), Image.Resampling.BOX)
+    if small.mode != 'L':
+        small = small.convert('L')
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(height):
+        offset = row * (width + 1)
+        for column in range(width):
+            value = (value << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+    return value
+
+def hamming(a, b):
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count('1')
+
+def stamp_band(image, box, size=None):
+    """Gray, contrast-stretched overlay band for stamp comparison, reduced to about STAMP_HEIGHT rows
+
+    With `size` the band is brought to that size instead, to compare
+    with a band taken from a differently decoded copy.
+    """
+    band = image.crop(box).convert('L')
+    if size is not None:
+        if band.size != size:
+            band = band.resize(size, Image.Resampling.BOX)
+    elif band.height > 2 * STAMP_HEIGHT:
+        band = band.reduce(band.height // STAMP_HEIGHT)
+    # Brightness and contrast changes of a copy are evened out
+    return ImageOps.autocontrast(band, cutoff=1)
+
+def stamp_difference(band, other):
+    """Mean gray difference of the most different block between two stamp bands of the same size"""
+    block = max(2, band.height // STAMP_BLOCKS)
+    # reduce() averages each block x block square
+    blocks = ImageChops.difference(band, other).reduce(block)
+    return max(blocks.getdata())
+
+class BKTree:
+    """Burkhard-Keller tree over hashes, for lookups within a Hamming distance
+
+    Every child of a node sits under the distance from its hash to the
+    node's, so a lookup only descends into children whose distance is
+    within `max_distance` of the query's: a few nodes out of thousands.
+    """
+
+    def __init__(self):
+        self._root = None  # [hash, value, {distance: child node}, insertion number]
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, value_hash, value):
+        """Insert a hash with the value to return for it"""
+        new_node = [value_hash, value, {}, self._size]
+        self._size += 1
+        if self._root is None:
+            self._root = new_node
+            return
+        node = self._root
+        while True:
+            distance = hamming(value_hash, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = new_node
+                return
+            node = child
+
+    def nearest(self, value_hash, max_distance):
+        """(distance, value) of the closest hash within `max_distance`, the first added on ties; or None"""
+        best = None
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value_hash, node[0])
+            if distance <= max_distance and (best is None or (distance, node[3]) < best[:2]):
+                best = (distance, node[3], node[1])
+            for child_distance, child in node[2].items():
+                if abs(child_distance - distance) <= max_distance:
+                    stack.append(child)
+        return (best[0], best[2]) if best is not None else None
+
+class NearDuplicateIndex:
+    """The hashes of a batch's images so far, and the image each one stands for
+
+    `region` is one of HASH_REGIONS; `roi` the cascade's RoiLocator, whose
+    first crop is the overlay band when set. Candidates within
+    `max_distance` are confirmed with same_stamp() against
+    `stamp_tolerance`.
+    """
+
+    def __init__(self, region="overlay", max_distance=DEFAULT_MAX_DISTANCE, roi=None,
+                 stamp_tolerance=DEFAULT_STAMP_TOLERANCE):
+        if region not in HASH_REGIONS:
+            raise ValueError(f"Unknown hash region '{region}' (expected one of: {', '.join(HASH_REGIONS)})")
+        self.region = region
+        self.max_distance = max_distance
+        self.roi = roi
+        self.stamp_tolerance = stamp_tolerance
+        self._tree = BKTree()
+
+    def __len__(self):
+        return len(self._tree)
+
+    def overlay_box(self, image):
+        """Pixel box of the overlay band: the first ROI crop, or the bottom quarter"""
+        regions = self.roi.regions(image) if self.roi is not None and self.roi.enabled else []
+        return regions[0][1] if regions else template_box(BUILTIN_TEMPLATES["bottom"], image.size)
+
+    def image_hash(self, image):
+        """Perceptual hash of an opened image under this index's region"""
+        if self.region == "frame":
+            return dhash(image)
+        return dhash(image, self.overlay_box(image), width=16, height=4)
+
+    def file_hash(self, fp):
+        """Perceptual hash of an image file, decoded at reduced scale; None if it cannot be read"""
+        try:
+            with Image.open(fp) as image:
+                if image.format == 'JPEG':
+                    image.draft('RGB', DRAFT_SIZE)
+                image.load()
+                return self.image_hash(image)
+        except (OSError, SyntaxError, ValueError):
+            # The worker reports the error when it reads the file
+            return None
+
+    def same_stamp(self, fp, earlier_fp):
+        """Whether an image's overlay band matches an earlier image's, block by block
+
+        Images of different sizes never match. JPEGs are decoded at the
+        smallest scale that keeps the band STAMP_HEIGHT rows high.
+        """
+        try:
+            with Image.open(earlier_fp) as earlier, Image.open(fp) as image:
+                if image.size != earlier.size:
+                    return False
+                box = template_box(BUILTIN_TEMPLATES["bottom"], image.size)
+                scale = max(1, (box[3] - box[1]) // STAMP_HEIGHT)
+                for opened in (earlier, image):
+                    if opened.format == 'JPEG' and scale > 1:
+                        opened.draft('L', (image.width // scale, image.height // scale))
+                    opened.load()
+                # Both bands come from the same box, scaled to the earlier image's decode
+                earlier_box = self.overlay_box(earlier)
+                band = stamp_band(earlier, earlier_box)
+                factor = image.width / earlier.width
+                other = stamp_band(image, tuple(round(v * factor) for v in earlier_box), band.size)
+        except (OSError, SyntaxError, ValueError):
+            return False
+        return stamp_difference(band, other) <= self.stamp_tolerance
+
+    def find(self, value_hash):
+        """(distance, value) of the closest earlier image within max_distance, or None"""
+        return self._tree.nearest(value_hash, self.max_distance)
+
+    def add(self, value_hash, value):
+        """Remember an image's hash, e.g. with its path and pending OCR result"""
+        self._tree.add(value_hash, value)
@@ -0,0 +1,109 @@
+"""Read-ahead stage: load the next images while the OCR workers are busy"""
+import concurrent.futures
+import queue
+import threading
+
+# Default cap on the memory held by read-ahead and in-flight images
+DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024
+
+# Marks the end of the input in the ready queue
+_DONE = object()
+
+# Returned by Prefetcher.get(block=False) when the next image is still loading
+NOT_READY = object()
+
+class Prefetcher:
+    """Load images on a few reader threads ahead of the consumer, in input order
+
+    `load(path)` does the actual work (read the file, decode it, ...) and
+    returns (payload, nbytes), `nbytes` being the memory the payload holds.
+    get() hands out (path, payload, nbytes, error) in the order of `paths`.
+
+    At most `depth` images are loaded ahead of the consumer. A new read also
+    waits while the loaded images hold more than `memory_budget` bytes; they
+    count until the consumer calls release(nbytes), e.g. once OCR is done
+    with them. One image is always let through, so a file bigger than the
+    budget cannot stall the pipeline.
+    """
+
+    def __init__(self, paths, load, depth=4, memory_budget=DEFAULT_MEMORY_BUDGET, readers=2):
+        self._paths = paths
+        self._load = load
+        self.depth = max(1, int(depth))
+        self.memory_budget = memory_budget
+        self.held = 0
+        self._slots = threading.Semaphore(self.depth)
+        self._memory = threading.Condition()
+        self._ready = queue.Queue()
+        self._next = None  # Taken from the queue but not handed out yet
+        self._stop = threading.Event()
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, int(readers)))
+        self._feeder = threading.Thread(target=self._feed, daemon=True)
+        self._feeder.start()
+
+    def _feed(self):
+        """Start a read for every path as slots and memory allow"""
+        try:
+            for path in self._paths:
+                while not self._slots.acquire(timeout=0.1):
+                    if self._stop.is_set():
+                        return
+                with self._memory:
+                    while self.held >= self.memory_budget and self.held > 0 and not self._stop.is_set():
+                        self._memory.wait(0.1)
+                if self._stop.is_set():
+                    return
+                self._ready.put((path, self._pool.submit(self._load_one, path)))
+        except Exception as e:
+            # Listing the inputs failed; the consumer sees it after the images before
+            self._ready.put((None, e))
+        finally:
+            self._ready.put(_DONE)
+
+    def _load_one(self, path):
+        """Run `load` on a reader thread and count the memory it holds"""
+        payload, nbytes = self._load(path)
+        with self._memory:
+            self.held += nbytes
+        return payload, nbytes
+
+    def get(self, block=True):
+        """Next (path, payload, nbytes, error), None at the end, or NOT_READY
+
+        NOT_READY is only returned with block=False, when the next image is
+        still being read. A failed load comes back with its exception as
+        `error`; a failure while listing the inputs is raised.
+        """
+        if self._next is None:
+            try:
+                self._next = self._ready.get(block=block)
+            except queue.Empty:
+                return NOT_READY
+        if self._next is _DONE:
+            return None
+        path, future = self._next
+        if path is None:
+            raise future
+        if not block and not future.done():
+            return NOT_READY
+
+        self._next = None
+        self._slots.release()
+        try:
+            payload, nbytes = future.result()
+        except Exception as e:
+            return path, None, 0, e
+        return path, payload, nbytes, None
+
+    def release(self, nbytes):
+        """The consumer is done with a payload of `nbytes`"""
+        with self._memory:
+            self.held -= nbytes
+            self._memory.notify_all()
+
+    def close(self):
+        """Stop reading ahead and drop whatever was loaded but not handed out"""
+        self._stop.set()
+        with self._memory:
+            self._memory.notify_all()
+        self._pool.shutdown(wait=False, cancel_futures=True)
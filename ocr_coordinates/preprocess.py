@@ -0,0 +1,327 @@
+"""Image preprocessing applied before OCR"""
+import collections
+import importlib.util
+import statistics
+import threading
+
+from PIL import Image, ImageChops, ImageEnhance, ImageFilter
+
+from .roi import true_runs
+
+# Tunable parameters; they are also part of the OCR cache key, so changing
+# any of them invalidates cached results
+PREPROCESS_PARAMS = {
+    'contrast': 2.0,
+    'sharpness': 2.0,
+    'median_size': 3,
+    'min_width': 800,
+    'min_height': 600,
+    # JPEGs are decoded at a reduced scale until their long side is at most this
+    'decode_max_side': 2000,
+    # Text is scaled to about this many pixels per line before filtering
+    'target_text_height': 36,
+    # Sauvola binarization: window side in pixels and sensitivity
+    'sauvola_window': 31,
+    'sauvola_k': 0.2,
+}
+
+# Preprocessing engines: "pil" filters Pillow images step by step, "numpy"
+# runs the same chain on one array and needs the optional numpy package
+PREPROCESS_ENGINES = ("pil", "numpy")
+DEFAULT_ENGINE = "pil"
+
+# Binarization methods for the "otsu" and "sauvola" variants (need numpy)
+BINARIZE_METHODS = ("otsu", "sauvola")
+
+# Width the text height estimator works at
+ESTIMATE_WIDTH = 1000
+
+# Horizontal gradient in both directions: glyph strokes are mostly vertical,
+# while the edges of blocks and horizons in a photo are mostly not
+STROKE_KERNELS = (
+    ImageFilter.Kernel((3, 3), [-1, 0, 1, -2, 0, 2, -1, 0, 1], scale=1),
+    ImageFilter.Kernel((3, 3), [1, 0, -1, 2, 0, -2, 1, 0, -1], scale=1),
+)
+STROKE_THRESHOLD = 48
+
+# Multi-page files kept open for their next page (see FrameReader)
+FRAME_READERS = 4
+
+def open_image(fp):
+    """Open an image, letting large JPEGs decode at 1/2, 1/4 or 1/8 scale
+
+    The JPEG decoder can scale in the DCT domain, which is much cheaper than
+    decoding every pixel and resizing afterwards. The image is never made
+    smaller than `decode_max_side` on its long side.
+    """
+    image = Image.open(fp)
+    if image.format == 'JPEG':
+        width, height = image.size
+        max_side = PREPROCESS_PARAMS['decode_max_side']
+        if max(width, height) > max_side:
+            scale = max_side / float(max(width, height))
+            image.draft(image.mode, (int(width * scale), int(height * scale)))
+    return image
+
+class FrameReader:
+    """Pages of one multi-page file, read through a single open handle
+
+    A GIF frame is drawn over the frames before it, so seeking to page N
+    on a fresh handle decodes pages 1 to N-1 as well. Pages are mostly
+    asked for in order, and moving the handle forward decodes each page
+    once; only going back reopens the file. Thread-safe.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._image = None
+        # Reentrant: read() closes a handle it cannot move back
+        self._lock = threading.RLock()
+
+    def read(self, page):
+        """A decoded copy of a page, counting from 1"""
+        with self._lock:
+            if self._image is None or self._image.tell() > page - 1:
+                self.close()
+                self._image = Image.open(self.path)
+            try:
+                self._image.seek(page - 1)
+            except EOFError:
+                raise ValueError(f"{self.path!r} has no page {page}")
+            return self._image.copy()
+
+    def close(self):
+        """Close the file handle; the next read() opens it again"""
+        with self._lock:
+            if self._image is not None:
+                self._image.close()
+                self._image = None
+
+# Open FrameReaders by path, least recently used first
+_frame_readers = collections.OrderedDict()
+_frame_readers_lock = threading.Lock()
+
+def _frame_reader(path):
+    """The FrameReader for a path, opening one (and closing the oldest) as needed"""
+    with _frame_readers_lock:
+        reader = _frame_readers.get(path)
+        if reader is None:
+            reader = _frame_readers[path] = FrameReader(path)
+            if len(_frame_readers) > FRAME_READERS:
+                _frame_readers.popitem(last=False)[1].close()
+        else:
+            _frame_readers.move_to_end(path)
+        return reader
+
+def close_frame_readers():
+    """Close the file handles kept open for multi-page files"""
+    with _frame_readers_lock:
+        while _frame_readers:
+            _frame_readers.popitem()[1].close()
+
+def open_frame(path, page=None):
+    """Open an image file without decoding it, or decode one page (counting from 1) of a multi-page file"""
+    if page is None:
+        return Image.open(path)
+    return _frame_reader(path).read(page)
+
+def to_grayscale(image):
+    """Convert to 8-bit grayscale in one step"""
+    if image.mode == 'L':
+        return image
+    try:
+        return image.convert('L')
+    except ValueError:
+        # Modes Pillow cannot take straight to L
+        return image.convert('RGB').convert('L')
+
+def estimate_text_height(gray):
+    """Typical height in pixels of the text lines in a grayscale image, or None
+
+    On a reduced copy, pixels on a vertical stroke are counted per row; rows
+    with many strokes form one run per text line. The median height of the
+    strongest runs, scaled back up, approximates the ink height of a line.
+    """
+    width, height = gray.size
+    scale = min(1.0, ESTIMATE_WIDTH / float(width))
+    small = gray.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.Resampling.BILINEAR)
+    if small.size[1] < 8:
+        return None
+    left, right = (small.filter(kernel) for kernel in STROKE_KERNELS)
+    strokes = ImageChops.lighter(left, right).point(lambda v: 255 if v >= STROKE_THRESHOLD else 0)
+    # The kernel leaves the outermost pixels unfiltered, so a bright border
+    # would read as a stroke in every row
+    strokes_width, strokes_height = strokes.size
+    for box in ((0, 0, strokes_width, 1), (0, strokes_height - 1, strokes_width, strokes_height),
+                (0, 0, 1, strokes_height), (strokes_width - 1, 0, strokes_width, strokes_height)):
+        strokes.paste(0, box)
+
+    # Stroke density of every row
+    row_profile = list(strokes.resize((1, strokes_height), Image.Resampling.BOX).getdata())
+    peak = max(row_profile)
+    if peak < 2:
+        return None
+
+    lines = [(end - start, sum(row_profile[start:end]))
+             for start, end in true_runs([v >= peak * 0.25 for v in row_profile]) if end - start >= 2]
+    if not lines:
+        return None
+    strongest = max(weight for _, weight in lines)
+    return statistics.median(h for h, weight in lines if weight >= strongest * 0.5) / scale
+
+def text_scale(gray):
+    """Resize factor that brings the text to the target height (1.0 to leave as is)"""
+    params = PREPROCESS_PARAMS
+    text_height = estimate_text_height(gray)
+    if text_height is None:
+        # No text found to measure; fall back to the minimum page size
+        width, height = gray.size
+        if width < params['min_width'] or height < params['min_height']:
+            return max(params['min_width'] / width, params['min_height'] / height)
+        return 1.0
+    scale = min(3.0, max(0.25, params['target_text_height'] / text_height))
+    # Small differences are not worth a resample
+    return 1.0 if 0.8 <= scale <= 1.25 else scale
+
+def _resize(image, scale):
+    """Scale an image by a factor"""
+    width, height = image.size
+    new_size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    resample = Image.Resampling.LANCZOS if scale > 1 else Image.Resampling.BOX
+    return image.resize(new_size, resample)
+
+def preprocess_image(image):
+    """Preprocess image to improve OCR accuracy
+
+    Size first: the image goes to grayscale in one conversion and its text
+    is brought to about `target_text_height` pixels. Shrinking happens before
+    the contrast, sharpness and median filters, so big camera photos are
+    filtered at a fraction of their size; enlarging happens after them.
+    """
+    params = PREPROCESS_PARAMS
+
+    image = to_grayscale(image)
+
+    scale = text_scale(image)
+    if scale < 1.0:
+        image = _resize(image, scale)
+
+    image = ImageEnhance.Contrast(image).enhance(params['contrast'])
+    image = ImageEnhance.Sharpness(image).enhance(params['sharpness'])
+    image = image.filter(ImageFilter.MedianFilter(size=params['median_size']))
+
+    if scale > 1.0:
+        image = _resize(image, scale)
+    return image
+
+def preprocess_image_legacy(image):
+    """The original full-resolution pipeline, kept as the "processed-legacy" variant"""
+    params = PREPROCESS_PARAMS
+    
+    # Convert to RGB if needed
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    
+    # Convert to grayscale for better OCR
+    if image.mode == 'RGB':
+        image = image.convert('L')
+    
+    # Enhance contrast
+    enhancer = ImageEnhance.Contrast(image)
+    image = enhancer.enhance(params['contrast'])
+    
+    # Enhance sharpness
+    enhancer = ImageEnhance.Sharpness(image)
+    image = enhancer.enhance(params['sharpness'])
+    
+    # Apply filter to reduce noise
+    image = image.filter(ImageFilter.MedianFilter(size=params['median_size']))
+    
+    # Resize if too small (OCR works better on larger images)
+    width, height = image.size
+    min_width, min_height = params['min_width'], params['min_height']
+    if width < min_width or height < min_height:
+        scale = max(min_width/width, min_height/height)
+        new_size = (int(width * scale), int(height * scale))
+        image = image.resize(new_size, Image.Resampling.LANCZOS)
+    
+    return image
+
+def numpy_available():
+    """True if the optional numpy package is installed"""
+    return importlib.util.find_spec("numpy") is not None
+
+def available_engines():
+    """Names of the preprocessing engines that can run here"""
+    return [name for name in PREPROCESS_ENGINES if name != "numpy" or numpy_available()]
+
+def check_engine(name):
+    """Return `name` if it is a known preprocessing engine, else raise ValueError"""
+    if name not in PREPROCESS_ENGINES:
+        raise ValueError(f"Unknown preprocessing engine '{name}' (expected one of: {', '.join(PREPROCESS_ENGINES)})")
+    return name
+
+def preprocess_image_numpy(image):
+    """preprocess_image on a single NumPy working buffer instead of one image per filter"""
+    from . import preprocess_numpy
+    params = PREPROCESS_PARAMS
+
+    image = to_grayscale(image)
+
+    scale = text_scale(image)
+    if scale < 1.0:
+        image = _resize(image, scale)
+
+    array = preprocess_numpy.to_array(image)
+    preprocess_numpy.enhance_contrast(array, params['contrast'])
+    preprocess_numpy.sharpen(array, params['sharpness'])
+    preprocess_numpy.median3(array)
+    image = preprocess_numpy.to_image(array)
+
+    if scale > 1.0:
+        image = _resize(image, scale)
+    return image
+
+class ImageVariants:
+    """Preprocessed versions of one decoded image, each built on first use
+
+    The processed image is filtered once with the chosen engine; the
+    binarized variants threshold that same result, so OCR passes over
+    several variants never decode or filter the image twice. None of the
+    variants copies the decoded image: the preprocessing steps never modify
+    their input. Call release() once no remaining pass needs the processed
+    image so its memory can be reclaimed before the later passes run.
+    """
+
+    def __init__(self, image, engine=DEFAULT_ENGINE):
+        self.image = image
+        self.engine = check_engine(engine)
+        self._processed = None
+
+    def processed(self):
+        """The image after the size, contrast, sharpness and noise steps"""
+        if self._processed is None:
+            preprocess = preprocess_image_numpy if self.engine == "numpy" else preprocess_image
+            self._processed = preprocess(self.image)
+        return self._processed
+
+    def rgb(self):
+        """The decoded image as RGB, converted only if it is in another mode"""
+        return self.image if self.image.mode == 'RGB' else self.image.convert('RGB')
+
+    def release(self):
+        """Drop the cached processed image"""
+        self._processed = None
+
+    def binarized(self, method):
+        """Two-level copy of the processed image, split by Otsu's global or Sauvola's local threshold"""
+        from . import preprocess_numpy
+        params = PREPROCESS_PARAMS
+        array = preprocess_numpy.to_array(self.processed())
+        if method == "otsu":
+            array = preprocess_numpy.binarize_otsu(array)
+        elif method == "sauvola":
+            array = preprocess_numpy.binarize_sauvola(array, params['sauvola_window'], params['sauvola_k'])
+        else:
+            raise ValueError(f"Unknown binarization method '{method}' (expected one of: {', '.join(BINARIZE_METHODS)})")
+        return preprocess_numpy.to_image(array)
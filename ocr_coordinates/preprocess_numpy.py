@@ -0,0 +1,144 @@
+"""NumPy preprocessing: the filter chain on one grayscale array, plus adaptive binarization
+
+Needs the optional numpy package; ocr_coordinates.preprocess only imports
+this module when the "numpy" preprocessing engine or a binarized variant is
+used. Every filter works on a single float32 working buffer in place
+instead of creating a new image per step.
+"""
+import numpy as np
+
+def to_array(image):
+    """Writable float32 copy of an 8-bit grayscale PIL image"""
+    # The dtype conversion already makes the one copy
+    return np.asarray(image, dtype=np.float32)
+
+def to_image(array):
+    """8-bit grayscale PIL image from an array (float values are clipped to 0-255)"""
+    from PIL import Image
+    if array.dtype != np.uint8:
+        np.clip(array, 0, 255, out=array)
+        np.rint(array, out=array)
+        array = array.astype(np.uint8)
+    return Image.fromarray(array, 'L')
+
+def _two_level(mask):
+    """0/255 uint8 array from a boolean mask"""
+    out = mask.view(np.uint8)
+    out *= 255
+    return out
+
+def enhance_contrast(array, factor):
+    """Scale the distance from the mean gray level, like ImageEnhance.Contrast"""
+    mean = float(int(array.mean() + 0.5))
+    array -= mean
+    array *= factor
+    array += mean
+    np.clip(array, 0, 255, out=array)
+    return array
+
+def _neighbour_sum(array):
+    """Sum of the 3x3 neighbourhood of every pixel, edges repeated"""
+    padded = np.pad(array, 1, mode='edge')
+    height, width = array.shape
+    total = np.zeros_like(array)
+    for dy in range(3):
+        for dx in range(3):
+            total += padded[dy:dy + height, dx:dx + width]
+    return total
+
+def sharpen(array, factor):
+    """Blend away from a 3x3 smoothed copy, like ImageEnhance.Sharpness"""
+    # Pillow's SMOOTH kernel: centre weight 5, neighbours 1, divided by 13
+    smooth = _neighbour_sum(array)
+    smooth += 4 * array
+    smooth /= 13
+    # result = smooth + factor * (array - smooth)
+    array *= factor
+    smooth *= 1 - factor
+    array += smooth
+    np.clip(array, 0, 255, out=array)
+    return array
+
+def _sort_pair(values, i, j):
+    """Order two planes so values[i] <= values[j] element-wise"""
+    low = np.minimum(values[i], values[j])
+    np.maximum(values[i], values[j], out=values[j])
+    values[i] = low
+
+# Exchange network that leaves the median of nine values in position 4
+MEDIAN9_NETWORK = ((1, 2), (4, 5), (7, 8), (0, 1), (3, 4), (6, 7), (1, 2), (4, 5), (7, 8),
+                   (0, 3), (5, 8), (4, 7), (3, 6), (1, 4), (2, 5), (4, 7), (4, 2), (6, 4), (4, 2))
+
+def median3(array):
+    """3x3 median filter, edges repeated"""
+    padded = np.pad(array, 1, mode='edge')
+    height, width = array.shape
+    values = [padded[dy:dy + height, dx:dx + width].copy() for dy in range(3) for dx in range(3)]
+    for i, j in MEDIAN9_NETWORK:
+        _sort_pair(values, i, j)
+    array[...] = values[4]
+    return array
+
+def otsu_threshold(array):
+    """Gray level that best separates the histogram into two classes (Otsu's method)"""
+    histogram = np.bincount(np.clip(array, 0, 255).astype(np.uint8).ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_low = np.cumsum(histogram)
+    weight_high = weight_low[-1] - weight_low
+    sum_low = np.cumsum(histogram * levels)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_low = sum_low / weight_low
+        mean_high = (sum_low[-1] - sum_low) / weight_high
+        variance = weight_low * weight_high * (mean_low - mean_high) ** 2
+    return int(np.nanargmax(variance)) if np.any(np.isfinite(variance)) else 127
+
+def binarize_otsu(array):
+    """Black and white uint8 copy of an array, split at the Otsu threshold"""
+    return _two_level(array > otsu_threshold(array))
+
+def _window_sums(array, window):
+    """Sum over a window x window box around every pixel, via an integral image"""
+    half = window // 2
+    integral = np.pad(array.astype(np.float64), half + 1, mode='edge')
+    integral.cumsum(0, out=integral)
+    integral.cumsum(1, out=integral)
+    height, width = array.shape
+    return (integral[window:window + height, window:window + width]
+            - integral[:height, window:window + width]
+            - integral[window:window + height, :width]
+            + integral[:height, :width])
+
+def binarize_sauvola(array, window=31, k=0.2, dynamic_range=128.0):
+    """Black and white uint8 copy of an array with a Sauvola local threshold
+
+    The threshold follows the local mean and standard deviation, so text
+    on a shaded or gradient overlay survives where one global level fails.
+    Sauvola assumes dark text on a light ground; when the high-contrast
+    pixels are mostly brighter than their surroundings (light overlay text)
+    the array is inverted first. Text is always black on white in the result.
+    """
+    window = max(3, window | 1)
+    count = float(window * window)
+    # Local mean and standard deviation; `std` is reused for the threshold
+    mean = _window_sums(array, window)
+    mean /= count
+    std = _window_sums(np.square(array), window)
+    std /= count
+    std -= np.square(mean)
+    np.maximum(std, 0, out=std)
+    np.sqrt(std, out=std)
+
+    # Polarity: in busy windows, is the ink the bright minority?
+    busy = std > dynamic_range * 0.25
+    if busy.any() and np.count_nonzero(array[busy] > mean[busy]) < 0.5 * np.count_nonzero(busy):
+        array = 255 - array
+        np.subtract(255, mean, out=mean)
+    del busy
+
+    # threshold = mean * (1 + k * (std / R - 1))
+    std /= dynamic_range
+    std -= 1
+    std *= k
+    std += 1
+    std *= mean
+    return _two_level(array > std)
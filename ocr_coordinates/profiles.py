@@ -0,0 +1,78 @@
+"""OCR profiles: Tesseract settings tuned to what the image is expected to contain"""
+import collections
+import functools
+import os
+import shlex
+import sys
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# name: profile name; config: Tesseract config file (whitelist, dictionaries);
+# user_words / user_patterns: vocabulary files. None leaves Tesseract's default.
+OcrProfile = collections.namedtuple('OcrProfile', ['name', 'config', 'user_words', 'user_patterns'])
+
+PROFILES = {
+    # Tesseract's stock settings: full dictionary, any character
+    "general": OcrProfile("general", None, None, None),
+    # Only the characters a coordinate overlay uses (digits, . , : - ° ' ",
+    # NSEW and the Lat/Long label letters), no dictionaries, and the label
+    # words and number shapes as user vocabulary. Misreads such as "Lal" or
+    # a "7" read as "/" cannot happen, and Tesseract has fewer classes to try.
+    "coordinates": OcrProfile("coordinates",
+                              os.path.join(DATA_DIR, 'coordinates.config'),
+                              os.path.join(DATA_DIR, 'coordinates.user-words'),
+                              os.path.join(DATA_DIR, 'coordinates.user-patterns')),
+}
+
+DEFAULT_PROFILE = "general"
+
+def get_profile(name=DEFAULT_PROFILE):
+    """The OcrProfile registered under `name`"""
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown OCR profile '{name}' (expected one of: {', '.join(PROFILES)})")
+
+def _path_arg(path):
+    """Quote a file path for pytesseract's config string"""
+    if sys.platform != 'win32':
+        return shlex.quote(path)
+    # pytesseract splits the config without removing quotes on Windows, so
+    # a path with spaces is passed by its short (8.3) name instead
+    if ' ' in path:
+        import ctypes
+        buffer = ctypes.create_unicode_buffer(1024)
+        if ctypes.windll.kernel32.GetShortPathNameW(path, buffer, len(buffer)):
+            return buffer.value
+    return path
+
+def tesseract_config(profile, psm=None):
+    """pytesseract config string for one pass; '' for the default configuration"""
+    args = [] if psm is None else [f'--oem 3 --psm {psm}']
+    if profile.user_words:
+        args.append('--user-words ' + _path_arg(profile.user_words))
+    if profile.user_patterns:
+        args.append('--user-patterns ' + _path_arg(profile.user_patterns))
+    if profile.config:
+        # Config files go last on the tesseract command line
+        args.append(_path_arg(profile.config))
+    return ' '.join(args)
+
+def init_variables(profile):
+    """Tesseract variables for the vocabulary files, for in-process engines"""
+    variables = {}
+    if profile.user_words:
+        variables['user_words_file'] = profile.user_words
+    if profile.user_patterns:
+        variables['user_patterns_file'] = profile.user_patterns
+    return variables
+
+@functools.lru_cache(maxsize=None)
+def profile_key(profile):
+    """Stable description of a profile for the OCR cache key, independent of install location"""
+    contents = []
+    for path in (profile.config, profile.user_words, profile.user_patterns):
+        if path:
+            with open(path, encoding='utf-8') as f:
+                contents.append(f.read())
+    return tuple([profile.name] + contents)
@@ -0,0 +1,174 @@
+"""Column-wise store of batch result rows, with a sorted and filtered view
+
+The GUI's results table draws from this store: it only ever shows the rows
+that fit on screen, asking the view for rows by position, so the number of
+rows costs memory here but no Tk widgets.
+"""
+import bisect
+import math
+from array import array
+
+# Column names, in the order values() returns them
+COLUMNS = ("serial", "img_name", "lat", "lon", "status")
+
+def status_kind(status):
+    """A status without its details, used for filtering: '✗ Error: x' -> '✗ Error'"""
+    return status.split(':', 1)[0]
+
+class ResultStore:
+    """Batch result rows kept column by column
+
+    Serial numbers and coordinates live in typed arrays and statuses are
+    interned, so a row costs little more than its image name. The view is
+    the list of rows shown, in order: the ones matching the name and status
+    filters, sorted by `sort_column`. It is kept up to date as rows are
+    appended and rebuilt only when the filters or the sort order change.
+    """
+
+    def __init__(self):
+        self.name_filter = ""
+        self.status_filter = None
+        self.sort_column = None  # None: the order rows were added in
+        self.sort_reverse = False
+        self._clear_rows()
+
+    def _clear_rows(self):
+        self.serials = array('q')  # 0 for rows without a serial number
+        self.names = []
+        self.lats = array('d')  # NaN for rows without coordinates
+        self.lons = array('d')
+        self.status_codes = array('I')
+        self.statuses = []  # Distinct status texts, indexed by status_codes
+        self._status_codes = {}
+        self._view = None  # Row numbers shown; None while that is every row in order
+        self._view_keys = None  # Sort keys of the rows in _view, when sorted
+
+    def __len__(self):
+        return len(self.names)
+
+    def clear(self):
+        """Drop every row, keeping the filters and sort order"""
+        self._clear_rows()
+        self._rebuild_view()
+
+    def append(self, serial, img_name, lat, lon, status):
+        """Add a row; `serial`, `lat` and `lon` may be None or '-'. Returns the row number"""
+        code = self._status_codes.get(status)
+        if code is None:
+            code = self._status_codes[status] = len(self.statuses)
+            self.statuses.append(status)
+        row = len(self.names)
+        self.serials.append(serial if isinstance(serial, int) else 0)
+        self.names.append(img_name)
+        self.lats.append(math.nan if lat is None else lat)
+        self.lons.append(math.nan if lon is None else lon)
+        self.status_codes.append(code)
+
+        if self._view is not None and self._matches(row):
+            if self.sort_column is None:
+                self._view.append(row)
+            else:
+                key = self._sort_key(row)
+                position = bisect.bisect(self._view_keys, key)
+                self._view_keys.insert(position, key)
+                self._view.insert(position, row)
+        return row
+
+    def replace(self, rows):
+        """Swap in new rows, e.g. after removing duplicates and renumbering"""
+        # The view stays unset while appending and is built once at the end
+        self._clear_rows()
+        for row in rows:
+            self.append(*row)
+        self._rebuild_view()
+
+    def set_filter(self, name="", status=None):
+        """Show only rows whose image name contains `name` and whose status kind is `status`"""
+        self.name_filter = name.strip().lower()
+        self.status_filter = status or None
+        self._rebuild_view()
+
+    def sort(self, column=None, reverse=False):
+        """Order the view by one of COLUMNS, or by insertion order for None"""
+        if column is not None and column not in COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+        self.sort_column = column
+        self.sort_reverse = reverse and column is not None
+        self._rebuild_view()
+
+    def status_kinds(self):
+        """The status kinds present, for the status filter"""
+        return sorted({status_kind(status) for status in self.statuses})
+
+    def visible_count(self):
+        """Rows in the view"""
+        return len(self.names) if self._view is None else len(self._view)
+
+    def row_at(self, position):
+        """Row number shown at a position of the view"""
+        if self._view is None:
+            return position
+        if self.sort_reverse:
+            position = len(self._view) - 1 - position
+        return self._view[position]
+
+    def position_of(self, row):
+        """Position of a row in the view, or None if it is filtered out"""
+        if self._view is None:
+            return row if 0 <= row < len(self.names) else None
+        if self.sort_column is not None:
+            key = self._sort_key(row)
+            position = bisect.bisect_left(self._view_keys, key)
+            if position == len(self._view) or self._view[position] != row:
+                return None
+        else:
+            position = bisect.bisect_left(self._view, row)
+            if position == len(self._view) or self._view[position] != row:
+                return None
+        return len(self._view) - 1 - position if self.sort_reverse else position
+
+    def values(self, row):
+        """Display values of a row: (serial, image name, latitude, longitude, status)"""
+        serial = self.serials[row]
+        lat, lon = self.lats[row], self.lons[row]
+        has_coordinates = not math.isnan(lat)
+        return (serial if serial else "-",
+                self.names[row],
+                f"{lat:.6f}" if has_coordinates else "-",
+                f"{lon:.6f}" if has_coordinates else "-",
+                self.statuses[self.status_codes[row]])
+
+    def _matches(self, row):
+        """Whether a row passes the name and status filters"""
+        if self.status_filter is not None and status_kind(self.statuses[self.status_codes[row]]) != self.status_filter:
+            return False
+        return not self.name_filter or self.name_filter in self.names[row].lower()
+
+    def _sort_key(self, row):
+        """Sort key of a row for the current sort column; ties keep insertion order"""
+        column = self.sort_column
+        if column == "serial":
+            serial = self.serials[row]
+            # Rows without a serial number go last
+            return (serial == 0, serial, row)
+        if column == "img_name":
+            return (self.names[row].lower(), row)
+        if column in ("lat", "lon"):
+            value = (self.lats if column == "lat" else self.lons)[row]
+            return (math.isnan(value), 0.0 if math.isnan(value) else value, row)
+        return (self.statuses[self.status_codes[row]], row)
+
+    def _rebuild_view(self):
+        """Recompute the view after the filters, the sort order or the rows changed"""
+        if not self.name_filter and self.status_filter is None and self.sort_column is None:
+            self._view = None
+            self._view_keys = None
+            return
+        rows = [row for row in range(len(self.names)) if self._matches(row)]
+        if self.sort_column is None:
+            self._view = rows
+            self._view_keys = None
+            return
+        keyed = sorted((self._sort_key(row), row) for row in rows)
+        self._view_keys = [key for key, _ in keyed]
+        self._view = [row for _, row in keyed]
@@ -0,0 +1,257 @@
+"""Output format shared by the GUI save buttons and the command line"""
+import json
+import os
+import shutil
+import time
+
+from .ingest import image_name
+from .manifest import job_key
+from .metadata import coordinate_origin
+
+CSV_HEADER = "serial no, Img name, lat, long\n"
+
+def format_row(serial, img_name, lat, lon):
+    """Format one result as a line of the coordinates file"""
+    return f"{serial}, {img_name}, {lat:.6f}, {lon:.6f}\n"
+
+def write_results(file_path, results):
+    """Write result dicts (serial, img_name, lat, lon) to a coordinates file"""
+    # Write next to the target and rename, so a failed save never leaves a half file
+    temp_path = file_path + '.partial'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        # Write header
+        f.write(CSV_HEADER)
+        
+        # Write data rows
+        for result in results:
+            f.write(format_row(result['serial'], result['img_name'], result['lat'], result['lon']))
+    os.replace(temp_path, file_path)
+
+def parse_row(line):
+    """Parse a coordinates file line back into (serial, img_name, lat, lon), or None"""
+    parts = line.rstrip('\r\n').split(', ')
+    if len(parts) < 4:
+        return None
+    try:
+        serial = int(parts[0])
+        lat, lon = float(parts[-2]), float(parts[-1])
+    except ValueError:
+        return None
+    # Image names may themselves contain ", "
+    return serial, ', '.join(parts[1:-2]), lat, lon
+
+def _job_status(record):
+    """Job manifest status of a JSONL row"""
+    if record.get('duplicate_of'):
+        return "duplicate"
+    if record.get('lat') is not None:
+        return "success"
+    return "error" if str(record.get('status', '')).startswith("error") else "no-coords"
+
+class ResultSink:
+    """Append batch results to a file as they are produced
+
+    Rows go to `<path>.partial`, which is flushed every `flush_every` rows or
+    `flush_interval` seconds and atomically renamed to `path` once the batch
+    completes (close(commit=True)). A crash, an error or a cancelled batch
+    leaves the .partial file behind; opening the sink with resume=True
+    picks it up (or the finished file) and reports which images are already
+    done so they can be skipped. Callbacks given to after_flush() run once
+    the rows written before them are on disk, so a job manifest never marks
+    an image done whose rows a crash could still lose.
+
+    The format follows the extension: `.jsonl` writes one JSON object per
+    image or coordinate, including images with no coordinates or errors,
+    with the coordinate's `source` ("exif", "xmp" or "ocr"); anything else
+    writes the usual `serial no, Img name, lat, long` CSV.
+    """
+
+    def __init__(self, path, resume=False, flush_every=50, flush_interval=5.0):
+        self.path = path
+        self.partial_path = path + '.partial'
+        self.jsonl = path.lower().endswith('.jsonl')
+        self.resume = resume
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        # Job manifest status of the images in the file by full path, as far
+        # as the rows tell; only JSONL rows carry the path
+        self.done_paths = {}
+        # Image names in the file, all a CSV row has to go by
+        self.done_names = set()
+        # Rows already in the file when resuming, as result dicts
+        self.existing_results = []
+        self.last_serial = 0
+        self._file = None
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+        self._after_flush = []
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
+    def _existing_source(self):
+        """File to resume from: an unfinished .partial first, then the finished file"""
+        if os.path.exists(self.partial_path):
+            # Left over from a run that did not finish
+            return self.partial_path
+        if os.path.exists(self.path):
+            return self.path
+        return None
+
+    def load(self):
+        """Read the rows already on disk without opening for writing"""
+        source = self._existing_source()
+        if source is not None:
+            self._load(source)
+        return self.existing_results
+
+    def open(self):
+        """Open the output, loading what is already there when resuming"""
+        source = self._existing_source() if self.resume else None
+
+        if source is not None:
+            self._load(source)
+            if source != self.partial_path:
+                shutil.copyfile(source, self.partial_path)
+            self._truncate_partial_line()
+            self._file = open(self.partial_path, 'a', encoding='utf-8', newline='')
+        else:
+            self._file = open(self.partial_path, 'w', encoding='utf-8', newline='')
+            if not self.jsonl:
+                self._file.write(CSV_HEADER)
+        return self
+
+    def _load(self, source):
+        """Read existing rows so finished images can be skipped"""
+        self.done_paths = {}
+        self.done_names = set()
+        self.existing_results = []
+        self.last_serial = 0
+        with open(source, encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    # Half-written last line from a crash
+                    break
+                if self.jsonl:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.done_names.add(record.get('img_name'))
+                    if record.get('path'):
+                        self._add_done_path(record['path'], _job_status(record))
+                    if record.get('lat') is not None and record.get('serial') is not None:
+                        self.existing_results.append({
+                            'serial': record['serial'],
+                            'img_name': record['img_name'],
+                            'lat': record['lat'],
+                            'lon': record['lon'],
+                        })
+                        self.last_serial = max(self.last_serial, record['serial'])
+                else:
+                    row = parse_row(line)
+                    if row is None:
+                        continue
+                    serial, img_name, lat, lon = row
+                    self.done_names.add(img_name)
+                    self.existing_results.append({'serial': serial, 'img_name': img_name, 'lat': lat, 'lon': lon})
+                    self.last_serial = max(self.last_serial, serial)
+
+    def _truncate_partial_line(self):
+        """Drop a half-written last line so appends start on a fresh line"""
+        with open(self.partial_path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+
+    def _add_done_path(self, image_path, status):
+        """Note rows for an image; one coordinate row makes it a success"""
+        key = job_key(image_path)
+        if self.done_paths.get(key) not in ("success", "duplicate"):
+            self.done_paths[key] = status
+
+    def has_rows(self):
+        """True if the file already has rows"""
+        return bool(self.done_paths or self.done_names)
+
+    def is_done(self, image_path, by_name=False):
+        """True if the file already has rows stored under this image's full path
+
+        With `by_name`, a row with the same image name counts as well. That
+        is all a CSV row can be matched by, but a.jpg and a.png share it,
+        so it is only for runs without a job manifest.
+        """
+        return job_key(image_path) in self.done_paths or (by_name and image_name(image_path) in self.done_names)
+
+    def done_status(self, image_path):
+        """Job manifest status of an image the file has rows for under its full path, or None"""
+        return self.done_paths.get(job_key(image_path))
+
+    def write_result(self, serial, img_name, lat, lon, image_path=None, format_type=None, duplicate_of=None):
+        """Append one coordinate row; `duplicate_of` is the image whose result a near-duplicate took"""
+        if self.jsonl:
+            self._write(json.dumps({
+                'serial': serial, 'img_name': img_name, 'path': image_path,
+                'lat': lat, 'lon': lon, 'format': format_type,
+                'source': coordinate_origin(format_type) if format_type else None, 'status': 'success',
+                'duplicate_of': duplicate_of,
+            }, ensure_ascii=False) + '\n')
+        else:
+            self._write(format_row(serial, img_name, lat, lon))
+        self.last_serial = max(self.last_serial, serial)
+        self.done_names.add(img_name)
+        if self.jsonl and image_path:
+            self._add_done_path(image_path, "duplicate" if duplicate_of else "success")
+
+    def write_status(self, img_name, status, image_path=None, duplicate_of=None):
+        """Record an image that produced no coordinate rows (JSONL only)"""
+        if self.jsonl:
+            self._write(json.dumps({
+                'serial': None, 'img_name': img_name, 'path': image_path,
+                'lat': None, 'lon': None, 'format': None, 'source': None, 'status': status,
+                'duplicate_of': duplicate_of,
+            }, ensure_ascii=False) + '\n')
+            self.done_names.add(img_name)
+            if image_path:
+                self._add_done_path(image_path, _job_status({'status': status, 'duplicate_of': duplicate_of}))
+
+    def _write(self, line):
+        """Append a line, flushing when enough rows or time have gone by"""
+        self._file.write(line)
+        self._unflushed += 1
+        if (self._unflushed >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def after_flush(self, callback):
+        """Call `callback` once the rows written so far are on disk"""
+        self._after_flush.append(callback)
+
+    def flush(self):
+        """Push buffered rows to disk, then run the after_flush callbacks"""
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+        callbacks, self._after_flush = self._after_flush, []
+        for callback in callbacks:
+            callback()
+
+    def close(self, commit=True):
+        """Flush, and with `commit` atomically move the finished file into place
+
+        An unfinished batch closes with commit=False, so its rows stay in
+        the .partial file for resuming instead of passing for a finished file.
+        """
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+        if commit:
+            os.replace(self.partial_path, self.path)
@@ -0,0 +1,151 @@
+"""Region-of-interest stage: find the GPS overlay band so only that crop is OCR'd"""
+import collections
+import json
+
+from PIL import Image, ImageFilter
+
+# A crop template in fractions of the image size: (left, top, right, bottom)
+CropTemplate = collections.namedtuple('CropTemplate', ['name', 'box'])
+
+# GPS camera apps mostly stamp the overlay along the bottom edge
+BUILTIN_TEMPLATES = {
+    "bottom": CropTemplate("bottom", (0.0, 0.75, 1.0, 1.0)),
+    "bottom-left": CropTemplate("bottom-left", (0.0, 0.6, 0.6, 1.0)),
+    "bottom-right": CropTemplate("bottom-right", (0.4, 0.6, 1.0, 1.0)),
+    "top": CropTemplate("top", (0.0, 0.0, 1.0, 0.25)),
+}
+
+ROI_MODES = ("off", "templates", "auto")
+
+# Width the text detector works at; overlay text survives this much shrinking
+DETECT_WIDTH = 400
+
+def parse_template(spec):
+    """Parse a built-in template name or 'name=left,top,right,bottom' (fractions 0-1)"""
+    spec = spec.strip()
+    if spec in BUILTIN_TEMPLATES:
+        return BUILTIN_TEMPLATES[spec]
+    name, sep, values = spec.partition('=')
+    if not sep:
+        raise ValueError(f"Unknown crop template '{spec}' (built-in: {', '.join(BUILTIN_TEMPLATES)})")
+    try:
+        box = tuple(float(v) for v in values.split(','))
+    except ValueError:
+        raise ValueError(f"Crop template '{spec}' must be name=left,top,right,bottom")
+    if len(box) != 4 or not (0 <= box[0] < box[2] <= 1 and 0 <= box[1] < box[3] <= 1):
+        raise ValueError(f"Crop template '{spec}' must be name=left,top,right,bottom with fractions between 0 and 1")
+    return CropTemplate(name.strip(), box)
+
+def template_box(template, size):
+    """Pixel box of a template on an image of the given size"""
+    width, height = size
+    left, top, right, bottom = template.box
+    return (int(left * width), int(top * height), int(round(right * width)), int(round(bottom * height)))
+
+def true_runs(flags):
+    """(start, end) index pairs of consecutive True values"""
+    runs = []
+    start = None
+    for i, flag in enumerate(flags):
+        if flag and start is None:
+            start = i
+        elif not flag and start is not None:
+            runs.append((start, i))
+            start = None
+    if start is not None:
+        runs.append((start, len(flags)))
+    return runs
+
+def find_text_bands(image, max_regions=3):
+    """Locate horizontal bands dense with text edges
+
+    Works on a small grayscale copy: the edge map is averaged per row, rows
+    well above the image's typical edge density are grouped into bands, and
+    each band is trimmed to the columns that carry edges. Returns up to
+    `max_regions` pixel boxes in the original image, densest first.
+    """
+    width, height = image.size
+    scale = min(1.0, DETECT_WIDTH / float(width))
+    small_size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    small = image.convert('L').resize(small_size, Image.Resampling.BILINEAR)
+    edges = small.filter(ImageFilter.FIND_EDGES)
+    small_width, small_height = edges.size
+    if small_height < 8:
+        return []
+
+    # Mean edge strength of every row
+    row_profile = list(edges.resize((1, small_height), Image.Resampling.BOX).getdata())
+    ordered = sorted(row_profile)
+    median = ordered[len(ordered) // 2]
+    threshold = max(median * 2.0, ordered[int(len(ordered) * 0.9)] * 0.5, 4)
+
+    # Close small gaps between text lines so a two-line overlay is one band
+    flags = [v >= threshold for v in row_profile]
+    gap = max(1, small_height // 30)
+    for start, end in true_runs([not f for f in flags]):
+        if start > 0 and end < small_height and end - start <= gap:
+            for i in range(start, end):
+                flags[i] = True
+
+    bands = []
+    min_rows = max(2, small_height // 100)
+    for start, end in true_runs(flags):
+        if end - start < min_rows or end - start > small_height * 0.6:
+            continue
+        score = sum(row_profile[start:end])
+
+        # Trim the band to the columns that actually carry text
+        band = edges.crop((0, start, small_width, end))
+        col_profile = list(band.resize((small_width, 1), Image.Resampling.BOX).getdata())
+        col_threshold = max(col_profile) * 0.2
+        columns = [i for i, v in enumerate(col_profile) if v >= col_threshold]
+        left, right = (columns[0], columns[-1] + 1) if columns else (0, small_width)
+
+        # Pad so ascenders, descenders and the first/last glyph are not cut
+        pad_y = max(2, (end - start) // 2)
+        pad_x = max(4, small_width // 50)
+        box = (max(0, left - pad_x), max(0, start - pad_y),
+               min(small_width, right + pad_x), min(small_height, end + pad_y))
+        bands.append((score, box))
+
+    bands.sort(key=lambda b: b[0], reverse=True)
+    boxes = []
+    for _, (left, top, right, bottom) in bands[:max_regions]:
+        boxes.append((int(left / scale), int(top / scale),
+                      min(width, int(round(right / scale))), min(height, int(round(bottom / scale)))))
+    return boxes
+
+class RoiLocator:
+    """Pick candidate crops of an image to OCR before falling back to the full frame
+
+    mode "templates" uses fixed crop templates, "auto" runs the text-band
+    detector, "off" disables the stage.
+    """
+
+    def __init__(self, mode="auto", templates=None, max_regions=3):
+        if mode not in ROI_MODES:
+            raise ValueError(f"Unknown ROI mode '{mode}' (expected one of: {', '.join(ROI_MODES)})")
+        self.mode = mode
+        self.templates = tuple(templates or (BUILTIN_TEMPLATES["bottom"],))
+        self.max_regions = max_regions
+
+    @property
+    def enabled(self):
+        """False when the full frame should be OCR'd directly"""
+        return self.mode != "off"
+
+    def regions(self, image):
+        """List of (label, pixel box) candidate crops for an image"""
+        if self.mode == "templates":
+            return [(template.name, template_box(template, image.size)) for template in self.templates]
+        if self.mode == "auto":
+            return [(f"band {i}", box) for i, box in enumerate(find_text_bands(image, self.max_regions), 1)]
+        return []
+
+    def config_key(self):
+        """Stable description of the settings, for the OCR cache key"""
+        return json.dumps({
+            'mode': self.mode,
+            'templates': [[t.name, list(t.box)] for t in self.templates] if self.mode == "templates" else [],
+            'max_regions': self.max_regions if self.mode == "auto" else 0,
+        }, sort_keys=True)
@@ -0,0 +1,238 @@
+"""Adaptive pass order: learn which variant and PSM find coordinates, per image source
+
+The cascade tries its stages in a fixed order, and within a stage the PSM
+modes in a fixed order. A PassScheduler keeps, for every image source
+(all images, a folder, an image size or a camera model), how often each
+pass (variant x PSM) was tried, how often it found a trusted coordinate
+and how long it took, and reorders the cascade so the passes most likely
+to hit per second of OCR come first. With the cascade stopping at the
+first hit, that order minimizes the expected OCR time per image.
+
+A pass that comes late in the order is rarely reached, so every
+EXPLORE_EVERY-th image tries the least-tried pass first; otherwise a pass
+the default order never gets to could not prove itself.
+
+The statistics are saved as JSON and picked up by the next run.
+"""
+import collections
+import json
+import os
+import threading
+
+from .cache import default_cache_path
+
+# What images are grouped by
+SCHEDULE_MODES = ("global", "folder", "size", "camera")
+
+# Images a source needs before its own statistics are trusted; until then
+# the statistics of all images are used, and before that the default order
+SCHEDULE_MIN_IMAGES = 20
+
+# Statistics are halved once a pass has been tried this often, so the order
+# follows changes in the images (a new camera, a new app) within a few
+# hundred images
+SCHEDULE_HISTORY = 1000
+
+# Prior hit rate of a pass, as (hits, attempts): a pass tried once or twice
+# counts as rarely hitting, so one lucky or cheap try does not move it ahead
+PRIOR = (0.0, 2.0)
+
+# One image in this many runs the least-tried pass first
+EXPLORE_EVERY = 20
+
+# Key of the statistics over all images
+ALL_SOURCES = "*"
+
+# One OCR pass run on an image: variant, PSM, seconds and whether it found
+# a trusted coordinate
+PassAttempt = collections.namedtuple('PassAttempt', ['variant', 'psm', 'seconds', 'hit'])
+
+def default_schedule_path():
+    """Per-user location of the scheduler statistics, next to the OCR cache"""
+    return os.path.join(os.path.dirname(default_cache_path()), 'pass_schedule.json')
+
+def pass_key(variant, psm):
+    """Name of a pass in the statistics, e.g. 'original:11'"""
+    return f"{variant}:{'default' if psm is None else psm}"
+
+def camera_model(image):
+    """'Make Model' from an image's EXIF data, or None"""
+    try:
+        exif = image.getexif()
+    except Exception:
+        return None
+    make = str(exif.get(0x010F, "")).strip().strip('\x00')
+    model = str(exif.get(0x0110, "")).strip().strip('\x00')
+    if model.startswith(make):
+        make = ""  # Many cameras repeat the make in the model
+    return " ".join(part for part in (make, model) if part) or None
+
+class PassScheduler:
+    """Hit rate and cost per pass and image source, and the stage order they suggest
+
+    Thread-safe. `mode` is one of SCHEDULE_MODES; `path` the JSON file the
+    statistics are loaded from and saved to (None keeps them in memory).
+    """
+
+    def __init__(self, mode="global", path=None):
+        if mode not in SCHEDULE_MODES:
+            raise ValueError(f"Unknown schedule mode '{mode}' (expected one of: {', '.join(SCHEDULE_MODES)})")
+        self.mode = mode
+        self.path = path
+        self._lock = threading.Lock()
+        # source -> {'images': n, 'passes': {pass key: [attempts, hits, seconds]}}
+        self.sources = {}
+        # Learned orders handed out, for picking the images that explore
+        self._orders = 0
+        if path and os.path.exists(path):
+            self.load()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def source_key(self, image, path=None):
+        """The source an image belongs to under this scheduler's mode"""
+        if self.mode == "folder" and path:
+            return os.path.dirname(os.path.abspath(path))
+        if self.mode == "size":
+            width, height = image.size
+            return f"{width}x{height}"
+        if self.mode == "camera":
+            return camera_model(image) or "unknown camera"
+        return ALL_SOURCES
+
+    def record(self, source, attempts):
+        """Add one image's PassAttempts under its source (and under all images)"""
+        if not attempts:
+            return
+        with self._lock:
+            for key in {source, ALL_SOURCES}:
+                entry = self.sources.setdefault(key, {'images': 0, 'passes': {}})
+                entry['images'] += 1
+                for variant, psm, seconds, hit in attempts:
+                    totals = entry['passes'].setdefault(pass_key(variant, psm), [0, 0, 0.0])
+                    totals[0] += 1
+                    totals[1] += 1 if hit else 0
+                    totals[2] += seconds
+                    if totals[0] >= SCHEDULE_HISTORY:
+                        totals[:] = [totals[0] / 2, totals[1] / 2, totals[2] / 2]
+
+    def _passes(self, source):
+        """Statistics to order by for a source: its own, all images', or None"""
+        for key in (source, ALL_SOURCES):
+            entry = self.sources.get(key)
+            if entry is not None and entry['images'] >= SCHEDULE_MIN_IMAGES:
+                return entry['passes']
+        return None
+
+    @staticmethod
+    def _value(passes, key, mean_seconds):
+        """Expected hits per second of OCR for a pass (hit rate / mean cost)"""
+        attempts, hits, seconds = passes.get(key, (0, 0, 0.0))
+        hit_rate = (hits + PRIOR[0]) / (attempts + PRIOR[1])
+        cost = seconds / attempts if attempts else mean_seconds
+        return hit_rate / max(cost, 1e-6)
+
+    @staticmethod
+    def _explore(stages, passes):
+        """The stages with the least-tried pass moved to the very front"""
+        tries = [(passes.get(pass_key(stage.variant, psm), (0,))[0], index, psm)
+                 for index, stage in enumerate(stages) for psm in stage.psm_modes]
+        # min() keeps the first of equals, so ties go to the earlier pass
+        _, index, psm = min(tries, key=lambda item: item[0])
+        stage = stages[index]
+        stage = stage._replace(psm_modes=(psm,) + tuple(m for m in stage.psm_modes if m != psm))
+        return [stage] + stages[:index] + stages[index + 1:]
+
+    def order(self, stages, source, explore=True):
+        """The cascade stages reordered for a source; the default order until enough is known
+
+        PSM modes are sorted within each stage and stages by their first
+        PSM, highest hit rate per second first. Stable sorts keep the
+        configured order between equals. With `explore`, every
+        EXPLORE_EVERY-th order starts with the least-tried pass instead.
+        """
+        with self._lock:
+            passes = self._passes(source)
+            if passes is None:
+                return tuple(stages)
+            passes = {key: tuple(totals) for key, totals in passes.items()}
+            if explore:
+                self._orders += 1
+                explore = self._orders % EXPLORE_EVERY == 0
+        attempts = sum(totals[0] for totals in passes.values())
+        mean_seconds = sum(totals[2] for totals in passes.values()) / attempts if attempts else 1.0
+
+        ordered = []
+        for stage in stages:
+            psm_modes = sorted(stage.psm_modes,
+                               key=lambda psm: -self._value(passes, pass_key(stage.variant, psm), mean_seconds))
+            ordered.append(stage._replace(psm_modes=tuple(psm_modes)))
+        ordered.sort(key=lambda stage: -self._value(passes, pass_key(stage.variant, stage.psm_modes[0]), mean_seconds))
+        if explore:
+            ordered = self._explore(ordered, passes)
+        return tuple(ordered)
+
+    def load(self):
+        """Read the statistics saved at `path`"""
+        with open(self.path, encoding='utf-8') as f:
+            data = json.load(f)
+        with self._lock:
+            self.sources = data.get('sources', {}).get(self.mode, {})
+
+    def save(self):
+        """Write the statistics to `path`, keeping those of the other modes"""
+        if not self.path:
+            return
+        data = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+        with self._lock:
+            data.setdefault('sources', {})[self.mode] = self.sources
+            content = json.dumps(data, indent=1, sort_keys=True)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_path, self.path)
+
+    def reset(self):
+        """Forget everything learned in this mode"""
+        with self._lock:
+            self.sources = {}
+
+    def summary(self, stages=None):
+        """Multi-line report: per source, each pass's hit rate, mean time and attempts
+
+        With `stages`, the order each source currently gets is listed too.
+        """
+        with self._lock:
+            sources = {key: {'images': entry['images'], 'passes': dict(entry['passes'])}
+                       for key, entry in self.sources.items()}
+        if not sources:
+            return "  nothing learned yet"
+        lines = []
+        for key in sorted(sources, key=lambda key: (key != ALL_SOURCES, key)):
+            entry = sources[key]
+            name = "all images" if key == ALL_SOURCES else key
+            lines.append(f"  {name}: {entry['images']:.0f} image(s)")
+            for pass_name, (attempts, hits, seconds) in sorted(entry['passes'].items(),
+                                                               key=lambda item: -item[1][1] / item[1][0]):
+                lines.append(f"    {pass_name}: {100.0 * hits / attempts:.1f}% hits, "
+                             f"{1000.0 * seconds / attempts:.0f} ms, {attempts:.0f} tries")
+            if stages is not None:
+                order = self.order(stages, key, explore=False)
+                lines.append("    order: " + " ".join(
+                    f"{stage.variant}:{','.join('default' if psm is None else str(psm) for psm in stage.psm_modes)}"
+                    for stage in order))
+        return "\n".join(lines)
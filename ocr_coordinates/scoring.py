@@ -0,0 +1,117 @@
+"""Rank the coordinates read from one image by how much they can be trusted
+
+Every OCR pass yields readings: a Coordinate plus the Tesseract confidence
+of the words it was read from. Readings of the same point (within the
+dedupe tolerance) are grouped into a Candidate, scored from
+
+- OCR confidence: the best word confidence among its readings
+- format: labeled and hemisphere-lettered formats over bare number pairs
+  (see dedup.FORMAT_RANK)
+- agreement: how many passes read the same point
+
+The best-scoring candidate is the image's coordinate; the rest are
+alternates.
+"""
+import collections
+
+from .dedup import DEFAULT_TOLERANCE, FORMAT_RANK, SpatialIndex, format_rank
+from .matcher import Coordinate, find_coordinates
+
+# Weights of the score parts; each part is between 0 and 1
+CONFIDENCE_WEIGHT = 0.5
+FORMAT_WEIGHT = 0.3
+AGREEMENT_WEIGHT = 0.2
+
+# Passes that must agree on a point for the full agreement part
+FULL_AGREEMENT = 3
+
+# Confidence assumed for readings without word data (e.g. from the text of
+# several passes combined)
+UNKNOWN_CONFIDENCE = 50.0
+
+# Version of the scoring, part of the OCR cache key
+SCORING_VERSION = 1
+
+# One coordinate read by one pass; `confidence` is 0-100 or None, `source`
+# the pass label or None for the combined text
+Reading = collections.namedtuple('Reading', ['coordinate', 'confidence', 'source'])
+
+# A point read from an image, with its score (0-1), best word confidence
+# (0-100, None if unknown) and the number of passes that read it. Its first
+# three fields match Coordinate.
+Candidate = collections.namedtuple('Candidate', ['format_type', 'lat', 'lon', 'score', 'confidence', 'votes'])
+
+def _digit_confidence(words):
+    """Mean confidence of the words containing digits, or None without any"""
+    confidences = [word.confidence for word in words if any(ch.isdigit() for ch in word.text)]
+    return sum(confidences) / len(confidences) if confidences else None
+
+def page_readings(page, coordinates, source, tolerance=DEFAULT_TOLERANCE):
+    """Readings for the coordinates found in one OcrPage
+
+    A coordinate found on a single text line gets the mean confidence of
+    that line's words with digits; one spread over several lines gets the
+    mean over the whole page. Pages without word data give None.
+    """
+    if not page.lines:
+        return [Reading(coordinate, None, source) for coordinate in coordinates]
+    line_hits = SpatialIndex(tolerance)
+    for line in page.lines:
+        found = find_coordinates(" ".join(word.text for word in line))
+        if found:
+            confidence = _digit_confidence(line)
+            for _, lat, lon in found:
+                line_hits.add(lat, lon, confidence)
+    page_confidence = _digit_confidence([word for line in page.lines for word in line])
+
+    readings = []
+    for coordinate in coordinates:
+        # The first line that read the point gives its confidence
+        hit = line_hits.find(coordinate[1], coordinate[2])
+        readings.append(Reading(coordinate, page_confidence if hit is None else hit[2], source))
+    return readings
+
+def score(format_type, confidence, votes):
+    """Score between 0 and 1 of a point read `votes` times with the given format and confidence"""
+    if confidence is None:
+        confidence = UNKNOWN_CONFIDENCE
+    return (CONFIDENCE_WEIGHT * min(max(confidence, 0.0), 100.0) / 100.0
+            + FORMAT_WEIGHT * format_rank(format_type) / max(FORMAT_RANK.values())
+            + AGREEMENT_WEIGHT * min(votes, FULL_AGREEMENT) / FULL_AGREEMENT)
+
+def rank_candidates(readings, tolerance=DEFAULT_TOLERANCE, keep="first"):
+    """Group readings of the same point into Candidates, best score first
+
+    Within a group the coordinate kept is the first one read, or with
+    keep="best" the one in the most trusted format (as CoordinateDeduplicator
+    does). Equal scores keep the order the points were first read in.
+    """
+    index = SpatialIndex(tolerance)
+    groups = []  # [kept coordinate, best confidence, sources]
+    for coordinate, confidence, source in readings:
+        _, lat, lon = coordinate
+        entry = index.find(lat, lon)
+        if entry is None:
+            index.add(lat, lon, len(groups))
+            groups.append([coordinate, confidence, {source} if source is not None else set()])
+            continue
+        group = groups[entry[2]]
+        if keep == "best" and format_rank(coordinate[0]) > format_rank(group[0][0]):
+            # Matched against the kept point from now on, as CoordinateDeduplicator does
+            group[0] = coordinate
+            index.move(entry, lat, lon)
+        if confidence is not None and (group[1] is None or confidence > group[1]):
+            group[1] = confidence
+        if source is not None:
+            group[2].add(source)
+
+    candidates = []
+    for (format_type, lat, lon), confidence, sources in groups:
+        votes = max(1, len(sources))
+        candidates.append(Candidate(format_type, lat, lon, score(format_type, confidence, votes), confidence, votes))
+    # sorted() is stable, so ties stay in reading order
+    return sorted(candidates, key=lambda candidate: -candidate.score)
+
+def candidate_coordinates(candidates):
+    """Plain Coordinates of ranked candidates, best first"""
+    return [Coordinate(candidate.format_type, candidate.lat, candidate.lon) for candidate in candidates]
@@ -0,0 +1,70 @@
+"""Locate the Tesseract executable used by pytesseract"""
+import os
+import sys
+
+import pytesseract
+
+def check_tesseract_in_path():
+    """Check if tesseract is available in system PATH"""
+    try:
+        import subprocess
+        result = subprocess.run(['tesseract', '--version'], 
+                              capture_output=True, 
+                              timeout=5)
+        return result.returncode == 0
+    except:
+        return False
+
+# Try to set Tesseract path for Windows if not in PATH
+if sys.platform == 'win32':
+    # Get current script/executable directory
+    if getattr(sys, 'frozen', False):
+        # Running as compiled executable
+        script_dir = os.path.dirname(sys.executable)
+    else:
+        # Running from source: look next to the package folder
+        script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    
+    possible_paths = [
+        # Check local folder first (same directory as exe)
+        os.path.join(script_dir, 'tesseract-ocr', 'tesseract.exe'),
+        os.path.join(script_dir, 'tesseract-ocr', 'bin', 'tesseract.exe'),
+        os.path.join(script_dir, 'Tesseract-OCR', 'tesseract.exe'),
+        # Check if bundled with exe (PyInstaller temp folder)
+        os.path.join(sys._MEIPASS, 'tesseract-ocr', 'tesseract.exe') if hasattr(sys, '_MEIPASS') else None,
+        # Standard installation paths
+        r'C:\Program Files\Tesseract-OCR\tesseract.exe',
+        r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe',
+        r'C:\Users\{}\AppData\Local\Tesseract-OCR\tesseract.exe'.format(os.getenv('USERNAME')),
+    ]
+    
+    # Remove None values
+    possible_paths = [p for p in possible_paths if p is not None]
+    
+    tesseract_found = False
+    for path in possible_paths:
+        if os.path.exists(path):
+            pytesseract.pytesseract.tesseract_cmd = path
+            tesseract_found = True
+            break
+    
+    # If not found in paths, check if it's in system PATH
+    if not tesseract_found and check_tesseract_in_path():
+        pytesseract.pytesseract.tesseract_cmd = 'tesseract'
+
+def tesseract_available():
+    """Return True if pytesseract can run the configured Tesseract binary"""
+    try:
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+def tessdata_path():
+    """tessdata folder next to a bundled or explicitly located Tesseract, or None for the default"""
+    cmd = pytesseract.pytesseract.tesseract_cmd
+    if os.path.dirname(cmd):
+        path = os.path.join(os.path.dirname(cmd), 'tessdata')
+        if os.path.isdir(path):
+            return path
+    return None
@@ -1,6 +1,6 @@
 @echo off
 echo Starting Latitude & Longitude OCR Extractor...
-python ocr_coordinates.py
+python -m ocr_coordinates
 pause
 
 
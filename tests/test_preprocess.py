@@ -0,0 +1,15 @@
+"""Tests for the text-height based resizing in ocr_coordinates.preprocess"""
+from PIL import Image
+
+from ocr_coordinates.preprocess import PREPROCESS_PARAMS, estimate_text_height, preprocess_image, text_scale
+
+def test_blank_image_has_no_text_height():
+    # The unfiltered border of a flat image must not read as a text line
+    for shade in (0, 128, 255):
+        assert estimate_text_height(Image.new('L', (300, 200), shade)) is None
+
+def test_blank_image_gets_the_min_size_upscale():
+    image = Image.new('L', (300, 200), 255)
+    assert text_scale(image) == 3.0
+    width, height = preprocess_image(image).size
+    assert width >= PREPROCESS_PARAMS['min_width'] and height >= PREPROCESS_PARAMS['min_height']
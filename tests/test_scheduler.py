@@ -0,0 +1,31 @@
+"""Tests for the adaptive pass order in ocr_coordinates.scheduler"""
+from ocr_coordinates.cascade import DEFAULT_STAGES
+from ocr_coordinates.scheduler import ALL_SOURCES, PassAttempt, PassScheduler
+
+def _run_cascade(stages, winner):
+    """PassAttempts of one image on which every pass reads text and only `winner` finds a coordinate
+
+    Mirrors OcrCascade: the first PSM with text ends a stage, a hit ends the image.
+    """
+    attempts = []
+    for stage in stages:
+        psm = stage.psm_modes[0]
+        hit = (stage.variant, psm) == winner
+        attempts.append(PassAttempt(stage.variant, psm, 0.5, hit))
+        if hit:
+            break
+    return attempts
+
+def test_late_pass_that_wins_is_promoted():
+    scheduler = PassScheduler()
+    for _ in range(300):
+        stages = scheduler.order(DEFAULT_STAGES, ALL_SOURCES)
+        scheduler.record(ALL_SOURCES, _run_cascade(stages, ("original", 11)))
+
+    first = scheduler.order(DEFAULT_STAGES, ALL_SOURCES, explore=False)[0]
+    assert first.variant == "original"
+    assert first.psm_modes[0] == 11
+
+def test_default_order_until_enough_is_known():
+    scheduler = PassScheduler()
+    assert scheduler.order(DEFAULT_STAGES, ALL_SOURCES) == tuple(DEFAULT_STAGES)